@@ -0,0 +1,89 @@
+"""
+Mide los bytes reservados por frame en la ruta captura -> conversión BGR.
+
+Compara la ruta anterior (np.array + cvtColor con salida nueva) con la ruta
+del pool (np.frombuffer sin copia + cvtColor sobre un buffer reutilizado).
+
+Uso:
+    python -m benchmarks.frame_allocation --width 3840 --height 2160 --frames 60
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from logic.frame_pool import FramePool, bgra_to_bgr
+
+
+def _legacy_path(raw: bytearray, width: int, height: int) -> np.ndarray:
+    """Ruta previa: copia del buffer de mss y array nuevo de cvtColor."""
+    frame = np.array(np.frombuffer(raw, dtype=np.uint8).reshape(height, width, 4))
+    return cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+
+
+def _pooled_path(raw: bytearray, width: int, height: int, pool: FramePool) -> np.ndarray:
+    """Ruta actual: vista sin copia y conversión a un buffer del pool."""
+    frame = np.frombuffer(raw, dtype=np.uint8).reshape(height, width, 4)
+    return bgra_to_bgr(frame, pool.acquire())
+
+
+def measure(func, frames: int) -> dict:
+    """Ejecuta `func` `frames` veces midiendo bytes reservados y tiempo por frame."""
+    func()  # Calentamiento fuera de la medición
+    allocated = []
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(frames):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        allocated.append(max(0, peak - before))
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    return {
+        "bytes_per_frame": int(sum(allocated) / frames),
+        "ms_per_frame": round(elapsed * 1000 / frames, 3),
+    }
+
+
+def run(width: int, height: int, frames: int) -> dict:
+    """Ejecuta ambas rutas y retorna los resultados."""
+    # Simula el buffer BGRA que entrega el backend de captura
+    raw = bytearray(np.random.randint(0, 255, width * height * 4, dtype=np.uint8).tobytes())
+    pool = FramePool((height, width, 3), count=4)
+
+    legacy = measure(lambda: _legacy_path(raw, width, height), frames)
+    pooled = measure(lambda: _pooled_path(raw, width, height, pool), frames)
+    return {
+        "resolution": f"{width}x{height}",
+        "frames": frames,
+        "legacy": legacy,
+        "pooled": pooled,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes reservados por frame (antes/después del pool)")
+    parser.add_argument("--width", type=int, default=3840)
+    parser.add_argument("--height", type=int, default=2160)
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--json", help="Ruta donde guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    results = run(args.width, args.height, args.frames)
+    for name in ("legacy", "pooled"):
+        r = results[name]
+        print(f"{name:>7}: {r['bytes_per_frame'] / (1024 * 1024):8.2f} MB/frame  {r['ms_per_frame']:7.2f} ms/frame")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+Suite de benchmarks de captura, conversión, escalado, cursor, superposición,
+codificación y finalización. Funciona sin pantalla usando el backend sintético y audio
+generado, y guarda los resultados en JSON para comparar entre versiones.
+
+Uso:
+    python -m benchmarks.run_benchmarks --output bench_results.json
+    python -m benchmarks.run_benchmarks --resolutions 720p 1080p --frames 60
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+import cv2
+import numpy as np
+
+from logic.capture_backends import CAPTURE_BACKENDS, TestPatternBackend
+from logic.config_manager import ConfigManager
+from logic.encoders import LiveEncoder, XvidFrameWriter
+from logic.frame_pool import FramePool, bgra_to_bgr
+from logic.overlay import WebcamOverlay
+from logic.cursor_overlay import CursorOverlay, CursorSample, CursorStyle
+from logic.recorder import ScreenRecorder
+from logic.scaler import FrameScaler, output_size
+from logic.wav_writer import StreamingWavWriter
+
+RESOLUTIONS = {
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "1440p": (2560, 1440),
+    "4k": (3840, 2160),
+}
+
+ENCODE_BACKENDS = ("pyav", "ffmpeg", "imageio")
+
+FPS = 30
+SAMPLE_RATE = 44100
+CHANNELS = 2
+
+
+def _bbox(width: int, height: int) -> dict:
+    return {'left': 0, 'top': 0, 'width': width, 'height': height}
+
+
+def _time_per_call(func: Callable[[], Any], iterations: int) -> Dict[str, float]:
+    """Mide el tiempo medio y el p95 de `func`."""
+    func()  # Calentamiento
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    mean = sum(samples) / len(samples)
+    return {
+        "mean_ms": round(mean * 1000, 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1] * 1000, 3),
+        "per_second": round(1 / mean, 1) if mean > 0 else 0.0,
+    }
+
+
+def _synthetic_frames(width: int, height: int, count: int, unique: int = 8) -> List[np.ndarray]:
+    """Genera `count` frames BGR sintéticos reutilizando `unique` buffers distintos."""
+    backend = TestPatternBackend()
+    pool = FramePool((height, width, 3), count=min(count, unique))
+    distinct = [bgra_to_bgr(backend.grab(_bbox(width, height)), pool.acquire()) for _ in range(pool.count)]
+    return [distinct[i % len(distinct)] for i in range(count)]
+
+
+def _write_synthetic_wav(path: str, seconds: float) -> None:
+    """Escribe un tono de 440 Hz como WAV de 16 bits."""
+    samples = int(SAMPLE_RATE * seconds)
+    t = np.arange(samples) / SAMPLE_RATE
+    tone = (np.sin(2 * np.pi * 440 * t) * 8000).astype(np.int16)
+    data = np.repeat(tone[:, np.newaxis], CHANNELS, axis=1).tobytes()
+    writer = StreamingWavWriter(path, CHANNELS, SAMPLE_RATE)
+    writer.write(data)
+    writer.close()
+
+
+def bench_grab(width: int, height: int, iterations: int, backends: List[str]) -> Dict[str, Any]:
+    """Capturas por segundo de cada backend."""
+    results = {}
+    for name in backends:
+        backend = CAPTURE_BACKENDS[name]()
+        try:
+            backend.open()
+            results[name] = _time_per_call(lambda: backend.grab(_bbox(width, height)), iterations)
+        except Exception as e:
+            results[name] = {"error": str(e)}
+        finally:
+            try:
+                backend.close()
+            except Exception:
+                pass
+    return results
+
+
+def bench_convert(width: int, height: int, iterations: int) -> Dict[str, float]:
+    """Coste de la conversión BGRA -> BGR sobre un buffer del pool."""
+    raw = TestPatternBackend().grab(_bbox(width, height)).copy()
+    pool = FramePool((height, width, 3), count=2)
+    return _time_per_call(lambda: bgra_to_bgr(raw, pool.acquire()), iterations)
+
+
+def bench_scale(width: int, height: int, iterations: int) -> Dict[str, Dict[str, float]]:
+    """
+    Coste de reducir un frame BGR a la resolución de salida.
+
+    - resize_linear: cv2.resize por defecto reservando un array por frame
+    - <objetivo>: FrameScaler (pyrDown para mitades exactas, INTER_AREA si no)
+    """
+    frame = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+    results = {}
+    for target in ("50%", "720p"):
+        size = output_size(width, height, target)
+        if size == (width, height):
+            continue
+        scaler = FrameScaler((width, height), size)
+        dst = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        results[f"{target}_{scaler.method}"] = _time_per_call(lambda: scaler.scale(frame, dst), iterations)
+        results[f"{target}_resize_linear"] = _time_per_call(lambda: cv2.resize(frame, size), iterations)
+    return results
+
+
+def bench_cursor(width: int, height: int, iterations: int) -> Dict[str, Dict[str, float]]:
+    """
+    Coste de dibujar el cursor (sprite premultiplicado sobre la región bajo el puntero).
+
+    - <estilo>: CursorOverlay con el sprite pre-renderizado
+    - xfixes_image: imagen real de cursor de 32x32 ya decodificada (caché por serie)
+    """
+    frame = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+    sample = CursorSample(width // 2, height // 2)
+    results = {}
+    for style in (CursorStyle.RED_CIRCLE, CursorStyle.CROSS, CursorStyle.DEFAULT):
+        overlay = CursorOverlay(style)
+        results[style] = _time_per_call(lambda: overlay.apply(frame, sample.x, sample.y, sample), iterations)
+
+    image = np.random.randint(0, 255, (32, 32, 4), dtype=np.uint8)
+    image[..., :3] = np.minimum(image[..., :3], image[..., 3:4])  # premultiplicado
+    xfixes = CursorSample(width // 2, height // 2, serial=1, image=image, hotspot=(4, 4))
+    overlay = CursorOverlay(CursorStyle.DEFAULT)
+    results["xfixes_image"] = _time_per_call(lambda: overlay.apply(frame, xfixes.x, xfixes.y, xfixes), iterations)
+    return results
+
+
+def bench_overlay(width: int, height: int, iterations: int) -> Dict[str, Dict[str, float]]:
+    """
+    Coste de superponer un frame de cámara 640x480 en la esquina superior derecha.
+
+    - legacy: redimensionar y recortar en cada frame (implementación anterior)
+    - new_camera_frame: WebcamOverlay cuando llega un frame de cámara nuevo
+    - same_camera_frame: WebcamOverlay entre frames de cámara (solo copia)
+    """
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    camera = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+
+    def legacy():
+        cam_w, cam_h = width // 6, height // 6
+        resized = cv2.resize(camera, (cam_w, cam_h))
+        x_offset = width - cam_w - 10
+        frame[10:10 + cam_h, x_offset:x_offset + cam_w] = resized
+
+    overlay = WebcamOverlay(width, height)
+    sequence = [0]
+
+    def new_camera_frame():
+        sequence[0] += 1
+        overlay.apply(frame, sequence[0], camera)
+
+    return {
+        "legacy": _time_per_call(legacy, iterations),
+        "new_camera_frame": _time_per_call(new_camera_frame, iterations),
+        "same_camera_frame": _time_per_call(lambda: overlay.apply(frame, sequence[0], camera), iterations),
+    }
+
+
+def _encode_pyav(frames: List[np.ndarray], path: str) -> None:
+    height, width = frames[0].shape[:2]
+    encoder = LiveEncoder(path, width, height, FPS)
+    for index, frame in enumerate(frames):
+        encoder.write_frame(frame, index)
+    encoder.close()
+
+
+def _encode_ffmpeg(frames: List[np.ndarray], path: str) -> None:
+    height, width = frames[0].shape[:2]
+    cmd = [
+        ScreenRecorder._find_ffmpeg_tool("ffmpeg"), '-y', '-loglevel', 'error',
+        '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{width}x{height}', '-r', str(FPS),
+        '-i', 'pipe:0',
+        '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '23', '-pix_fmt', 'yuv420p',
+        path
+    ]
+    process = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+    for frame in frames:
+        process.stdin.write(frame.tobytes())
+    process.stdin.close()
+    if process.wait() != 0:
+        raise RuntimeError(f"ffmpeg terminó con código {process.returncode}")
+
+
+def _encode_imageio(frames: List[np.ndarray], path: str) -> None:
+    import imageio
+    writer = imageio.get_writer(path, fps=FPS, codec='libx264', pixelformat='yuv420p')
+    try:
+        for frame in frames:
+            writer.append_data(frame[:, :, ::-1])
+    finally:
+        writer.close()
+
+
+def bench_encode(frames: List[np.ndarray], workdir: str, backends: List[str]) -> Dict[str, Any]:
+    """Frames codificados por segundo con cada backend de H.264."""
+    encoders = {"pyav": _encode_pyav, "ffmpeg": _encode_ffmpeg, "imageio": _encode_imageio}
+    results = {}
+    for name in backends:
+        path = os.path.join(workdir, f"encode_{name}.mp4")
+        try:
+            start = time.perf_counter()
+            encoders[name](frames, path)
+            elapsed = time.perf_counter() - start
+            results[name] = {
+                "fps": round(len(frames) / elapsed, 1),
+                "seconds": round(elapsed, 3),
+                "bytes": os.path.getsize(path),
+            }
+        except Exception as e:
+            results[name] = {"error": str(e)}
+    return results
+
+
+def bench_finalize(frames: List[np.ndarray], workdir: str) -> Dict[str, Any]:
+    """Tiempo de combine_audio_video sobre un XVID temporal y un WAV sintéticos."""
+    height, width = frames[0].shape[:2]
+    video_path = os.path.join(workdir, "tmp_video.avi")
+    audio_path = os.path.join(workdir, "tmp_audio.wav")
+
+    writer = XvidFrameWriter(video_path, width, height, FPS)
+    for index, frame in enumerate(frames):
+        writer.write_frame(frame, index)
+    writer.close()
+    _write_synthetic_wav(audio_path, len(frames) / FPS)
+
+    recorder = ScreenRecorder(None, None, ConfigManager(os.path.join(workdir, "config.json")))
+    results = {}
+    for video_format in (".mp4", ".avi"):
+        output_path = os.path.join(workdir, f"final{video_format}")
+        start = time.perf_counter()
+        ok = recorder.combine_audio_video(video_path, audio_path, output_path, video_format)
+        results[video_format] = {
+            "ok": ok,
+            "seconds": round(time.perf_counter() - start, 3),
+            "path": recorder.last_combine_report.get("path"),
+        }
+    return results
+
+
+def _library_versions() -> Dict[str, str]:
+    versions = {"numpy": np.__version__, "opencv": cv2.__version__}
+    for module in ("av", "mss", "imageio"):
+        try:
+            versions[module] = __import__(module).__version__
+        except Exception:
+            versions[module] = None
+    return versions
+
+
+def run(resolutions: List[str], frames: int, iterations: int,
+        grab_backends: List[str], encode_backends: List[str]) -> Dict[str, Any]:
+    """Ejecuta la suite y retorna los resultados."""
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "python": sys.version.split()[0],
+        "libraries": _library_versions(),
+        "fps": FPS,
+        "frames": frames,
+        "results": {},
+    }
+
+    workdir = tempfile.mkdtemp(prefix="grabador_bench_")
+    try:
+        for name in resolutions:
+            width, height = RESOLUTIONS[name]
+            print(f"== {name} ({width}x{height}) ==")
+            synthetic = _synthetic_frames(width, height, frames)
+            result = {
+                "grab": bench_grab(width, height, iterations, grab_backends),
+                "convert": bench_convert(width, height, iterations),
+                "scale": bench_scale(width, height, iterations),
+                "cursor": bench_cursor(width, height, iterations),
+                "overlay": bench_overlay(width, height, iterations),
+                "encode": bench_encode(synthetic, workdir, encode_backends),
+                "finalize": bench_finalize(synthetic, workdir),
+            }
+            report["results"][name] = result
+            print(json.dumps(result, indent=2))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de captura, codificación y finalización")
+    parser.add_argument("--resolutions", nargs="+", choices=list(RESOLUTIONS), default=list(RESOLUTIONS))
+    parser.add_argument("--frames", type=int, default=90, help="Frames por prueba de codificación")
+    parser.add_argument("--iterations", type=int, default=60, help="Repeticiones por microbenchmark")
+    parser.add_argument("--grab-backends", nargs="+", choices=list(CAPTURE_BACKENDS),
+                        default=[TestPatternBackend.name])
+    parser.add_argument("--encode-backends", nargs="+", choices=ENCODE_BACKENDS, default=list(ENCODE_BACKENDS))
+    parser.add_argument("--output", default="bench_results.json", help="Archivo JSON de resultados")
+    args = parser.parse_args()
+
+    report = run(args.resolutions, args.frames, args.iterations, args.grab_backends, args.encode_backends)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4)
+    print(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,35 @@
 """
 Módulos de lógica de la aplicación.
+
+Las clases se importan al usarlas por primera vez: `python -m logic` ejecuta
+este archivo antes que la línea de comandos, y comandos como `combine` o
+`status` no deben requerir PortAudio, OpenCV ni los backends de captura.
 """
 
-from .config_manager import ConfigManager
-from .screen_handler import ScreenHandler
-from .audio_handler import AudioHandler
-from .recorder import ScreenRecorder, RecorderState
-
-__all__ = [
-    "ConfigManager",
-    "ScreenHandler",
-    "AudioHandler",
-    "ScreenRecorder",
-    "RecorderState",
-]
+import importlib
+
+# Nombre exportado -> submódulo que lo define
+_EXPORTS = {
+    "ConfigManager": "config_manager",
+    "ScreenHandler": "screen_handler",
+    "AudioHandler": "audio_handler",
+    "ScreenRecorder": "recorder",
+    "RecorderState": "recorder",
+    "CaptureBackend": "capture_backends",
+    "create_capture_backend": "capture_backends",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,13 @@
+"""
+Permite ejecutar la línea de comandos con `python -m logic`.
+"""
+
+import multiprocessing
+import sys
+
+from .cli import main
+
+if __name__ == "__main__":
+    # Necesario para los procesos de trabajos y del codificador en ejecutables congelados
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -6,28 +6,123 @@ import sounddevice as sd
 import pyaudio
 import numpy as np
 import wave
+from threading import Thread, Event, Lock
 from typing import List, Optional, Tuple, Callable
 import logging
 
+from .wav_writer import StreamingWavWriter
+
 logger = logging.getLogger(__name__)
 
 
+class AudioCaptureMode:
+    """Modos de captura de audio."""
+    CALLBACK = "callback"  # PortAudio llama a un callback en su propio hilo
+    BLOCKING = "blocking"  # El llamador hace stream.read() periódicamente
+
+
+class AudioRingBuffer:
+    """
+    Buffer circular de bytes para un productor y un consumidor.
+
+    El productor (callback de PortAudio) solo avanza `_write_pos` y el
+    consumidor solo avanza `_read_pos`, por lo que no se necesita lock: cada
+    posición se publica después de copiar los datos.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity: Capacidad en bytes
+        """
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._write_pos = 0
+        self._read_pos = 0
+        self.overruns = 0
+
+    def reset(self) -> None:
+        """
+        Descarta los datos pendientes y reinicia los contadores.
+
+        Solo debe llamarse sin stream activo (ningún productor escribiendo).
+        """
+        self._write_pos = 0
+        self._read_pos = 0
+        self.overruns = 0
+
+    def available(self) -> int:
+        """Bytes pendientes de leer."""
+        return self._write_pos - self._read_pos
+
+    def write(self, data: bytes) -> bool:
+        """
+        Escribe datos en el buffer (lado productor).
+
+        Returns:
+            False si no había espacio y el bloque se descartó
+        """
+        size = len(data)
+        if size > self.capacity - self.available():
+            self.overruns += 1
+            return False
+
+        view = memoryview(data)
+        start = self._write_pos % self.capacity
+        first = min(size, self.capacity - start)
+        self._buffer[start:start + first] = view[:first]
+        if size > first:
+            self._buffer[:size - first] = view[first:]
+        self._write_pos += size
+        return True
+
+    def read(self) -> bytes:
+        """Lee todos los datos pendientes (lado consumidor)."""
+        size = self.available()
+        if size <= 0:
+            return b''
+
+        start = self._read_pos % self.capacity
+        first = min(size, self.capacity - start)
+        data = bytes(self._buffer[start:start + first])
+        if size > first:
+            data += bytes(self._buffer[:size - first])
+        self._read_pos += size
+        return data
+
+
 class AudioHandler:
     """Maneja la grabación y procesamiento de audio."""
 
-    def __init__(self, sample_rate: int = 44100, channels: int = 2):
+    def __init__(
+        self,
+        sample_rate: int = 44100,
+        channels: int = 2,
+        capture_mode: str = AudioCaptureMode.CALLBACK
+    ):
         """
         Inicializa el gestor de audio.
         
         Args:
             sample_rate: Frecuencia de muestreo
             channels: Número de canales
+            capture_mode: Modo de captura por defecto (ver AudioCaptureMode)
         """
         self.sample_rate = sample_rate
         self.channels = channels
+        self.capture_mode = capture_mode
         self.audio_frames: List[bytes] = []
         self.stream = None
         self.recording = False
+        self.paused = False
+        self.active_capture_mode = capture_mode
+        self.ring_buffer: Optional[AudioRingBuffer] = None
+        self.overflow_count = 0
+        self._drain_thread: Optional[Thread] = None
+        self._drain_stop = Event()
+        self.audio_sink: Optional[Callable[[bytes], None]] = None
+        self._sink_lock = Lock()
+        self.wav_writer: Optional[StreamingWavWriter] = None
 
     def get_microphone_devices(self) -> List[dict]:
         """
@@ -60,13 +155,19 @@ class AudioHandler:
             logger.error(f"Error obteniendo dispositivos de audio: {e}")
             return []
 
-    def start_recording(self, device_index: int, callback: Optional[Callable] = None) -> bool:
+    def start_recording(
+        self,
+        device_index: int,
+        callback: Optional[Callable] = None,
+        capture_mode: Optional[str] = None
+    ) -> bool:
         """
         Inicia grabación de audio del micrófono.
         
         Args:
             device_index: Índice del dispositivo
             callback: Función callback para nivel de volumen
+            capture_mode: Modo de captura (None usa self.capture_mode)
             
         Returns:
             True si se inicia exitosamente
@@ -86,6 +187,20 @@ class AudioHandler:
             # Actualizar canales para que save_audio use el valor correcto
             self.channels = channels
             
+            self.active_capture_mode = capture_mode or self.capture_mode
+            self.overflow_count = 0
+            self.paused = False
+            self.audio_frames = []
+            use_callback = self.active_capture_mode == AudioCaptureMode.CALLBACK
+            
+            # El buffer de la sesión anterior no debe aportar muestras ni
+            # descartes a esta: se vacía antes de abrir el stream
+            capacity = self.sample_rate * channels * 2 * 2  # ~2 segundos de audio de 16 bits
+            if use_callback and (self.ring_buffer is None or self.ring_buffer.capacity != capacity):
+                self.ring_buffer = AudioRingBuffer(capacity)
+            elif self.ring_buffer is not None:
+                self.ring_buffer.reset()
+            
             # Crear stream
             self.stream = p.open(
                 format=pyaudio.paInt16,
@@ -93,12 +208,19 @@ class AudioHandler:
                 rate=self.sample_rate,
                 input=True,
                 input_device_index=device_index,
-                frames_per_buffer=2048
+                frames_per_buffer=2048,
+                stream_callback=self._stream_callback if use_callback else None
             )
             
             self.recording = True
-            self.audio_frames = []
-            logger.info(f"Grabación de audio iniciada. Dispositivo: {device_info['name']}, Canales: {channels}")
+            if use_callback:
+                self._drain_stop.clear()
+                self._drain_thread = Thread(target=self._drain_loop, name="audio-drain", daemon=True)
+                self._drain_thread.start()
+            logger.info(
+                f"Grabación de audio iniciada. Dispositivo: {device_info['name']}, "
+                f"Canales: {channels}, Modo: {self.active_capture_mode}"
+            )
             return True
             
         except Exception as e:
@@ -111,11 +233,125 @@ class AudioHandler:
             if self.stream:
                 self.stream.stop_stream()
                 self.stream.close()
+                self.stream = None
             self.recording = False
+            
+            # Vaciar lo que quede en el buffer circular
+            if self._drain_thread is not None:
+                self._drain_stop.set()
+                self._drain_thread.join(timeout=2)
+                self._drain_thread = None
+            self._drain_ring_buffer()
+            self.close_wav_output()
+            
+            if self.overflow_count or (self.ring_buffer and self.ring_buffer.overruns):
+                overruns = self.ring_buffer.overruns if self.ring_buffer else 0
+                logger.warning(f"Audio: {self.overflow_count} overflows de entrada, {overruns} bloques descartados")
             logger.info("Grabación de audio detenida")
         except Exception as e:
             logger.error(f"Error al detener grabación: {e}")
 
+    def set_audio_sink(self, sink: Optional[Callable[[bytes], None]]) -> None:
+        """
+        Redirige el audio capturado a `sink` en lugar de acumularlo en memoria.
+        
+        Los bloques ya acumulados se entregan primero, en orden.
+        
+        Args:
+            sink: Función que recibe bloques PCM int16 intercalados (None para desactivar)
+        """
+        with self._sink_lock:
+            self.audio_sink = sink
+            if sink is not None and self.audio_frames:
+                pending, self.audio_frames = self.audio_frames, []
+                for data in pending:
+                    sink(data)
+
+    def set_wav_output(self, filepath: str) -> bool:
+        """
+        Escribe el audio capturado directamente en un WAV a medida que llega.
+        
+        La memoria usada se mantiene constante durante toda la grabación y al
+        detener solo hay que ajustar la cabecera.
+        
+        Args:
+            filepath: Ruta del archivo WAV
+            
+        Returns:
+            True si el archivo se abrió correctamente
+        """
+        try:
+            self.close_wav_output()
+            self.wav_writer = StreamingWavWriter(filepath, self.channels, self.sample_rate)
+            self.set_audio_sink(self.wav_writer.write)
+            logger.info(f"Audio en streaming a disco: {filepath}")
+            return True
+        except Exception as e:
+            logger.error(f"Error abriendo WAV de salida: {e}")
+            self.wav_writer = None
+            return False
+
+    def checkpoint_wav(self) -> None:
+        """Actualiza la cabecera del WAV en streaming y lo vacía a disco."""
+        writer = self.wav_writer
+        if writer is not None:
+            try:
+                writer.checkpoint()
+            except Exception as e:
+                logger.error(f"Error en checkpoint de audio: {e}")
+
+    def close_wav_output(self) -> Optional[str]:
+        """
+        Cierra el WAV en streaming si hay uno abierto.
+        
+        Returns:
+            Ruta del archivo cerrado o None
+        """
+        if self.wav_writer is None:
+            return None
+        writer = self.wav_writer
+        self.wav_writer = None
+        with self._sink_lock:
+            if self.audio_sink == writer.write:
+                self.audio_sink = None
+        writer.close()
+        return writer.path
+
+    def _deliver(self, data: bytes) -> None:
+        """Entrega un bloque capturado al sink o lo acumula."""
+        with self._sink_lock:
+            if self.audio_sink is not None:
+                try:
+                    self.audio_sink(data)
+                except Exception as e:
+                    logger.error(f"Error entregando audio: {e}")
+            else:
+                self.audio_frames.append(data)
+
+    def is_callback_mode(self) -> bool:
+        """Retorna True si la captura actual la maneja PortAudio en su propio hilo."""
+        return self.active_capture_mode == AudioCaptureMode.CALLBACK
+
+    def _stream_callback(self, in_data, frame_count, time_info, status_flags):
+        """Callback de PyAudio: solo copia al buffer circular, sin bloquear."""
+        if status_flags & pyaudio.paInputOverflow:
+            self.overflow_count += 1
+        if in_data and not self.paused:
+            self.ring_buffer.write(in_data)
+        return (None, pyaudio.paContinue)
+
+    def _drain_loop(self) -> None:
+        """Mueve periódicamente el audio del buffer circular a la lista de frames."""
+        while not self._drain_stop.wait(0.02):
+            self._drain_ring_buffer()
+
+    def _drain_ring_buffer(self) -> None:
+        if self.ring_buffer is None:
+            return
+        data = self.ring_buffer.read()
+        if data:
+            self._deliver(data)
+
     def read_audio_frame(self, frames_per_buffer: int = 2048) -> Optional[bytes]:
         """
         Lee un frame de audio.
@@ -127,11 +363,14 @@ class AudioHandler:
             Datos de audio o None
         """
         try:
+            if self.is_callback_mode():
+                # En modo callback el audio llega solo; nunca bloquear aquí
+                return None
             if self.stream and self.recording:
                 # Leer con exception_on_overflow=False para evitar errores de buffer
                 data = self.stream.read(frames_per_buffer, exception_on_overflow=False)
-                if data:
-                    self.audio_frames.append(data)
+                if data and not self.paused:
+                    self._deliver(data)
                     return data
         except IOError as e:
             # Ignorar errores de overflow del buffer
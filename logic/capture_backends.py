@@ -0,0 +1,293 @@
+"""
+Backends de captura de pantalla intercambiables.
+
+Todos los backends devuelven frames BGRA (alto, ancho, 4) en uint8. El array
+devuelto por grab() puede ser una vista sobre un buffer reutilizado, por lo
+que solo es válido hasta la siguiente llamada a grab(): quien necesite
+conservarlo debe convertirlo o copiarlo antes.
+"""
+
+import time
+import logging
+from typing import Dict, List, Optional, Type
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class CaptureBackend:
+    """Interfaz común de los backends de captura."""
+
+    name = "base"
+
+    def open(self) -> None:
+        """Reserva los recursos del backend (llamar desde el hilo que capturará)."""
+
+    def grab(self, bbox: dict) -> np.ndarray:
+        """
+        Captura una región de la pantalla.
+
+        Args:
+            bbox: Bounding box {'left', 'top', 'width', 'height'}
+
+        Returns:
+            Frame BGRA de forma (height, width, 4)
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Libera los recursos del backend."""
+
+    def measure_grab_rate(self, bbox: dict, duration: float = 1.0) -> float:
+        """
+        Mide cuántas capturas por segundo puede sostener el backend.
+
+        Args:
+            bbox: Región a capturar
+            duration: Duración de la medición en segundos
+
+        Returns:
+            Capturas por segundo alcanzables
+        """
+        frames = 0
+        start = time.perf_counter()
+        end = start + duration
+        while time.perf_counter() < end:
+            self.grab(bbox)
+            frames += 1
+        elapsed = time.perf_counter() - start
+        return frames / elapsed if elapsed > 0 else 0.0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class MssBackend(CaptureBackend):
+    """Captura multiplataforma con mss."""
+
+    name = "mss"
+
+    def __init__(self):
+        self._sct = None
+
+    def open(self) -> None:
+        import mss
+        self._sct = mss.mss()
+
+    def grab(self, bbox: dict) -> np.ndarray:
+        if self._sct is None:
+            self.open()
+        img = self._sct.grab(bbox)
+        # Envolver el buffer BGRA de mss sin copiarlo
+        return np.frombuffer(img.raw, dtype=np.uint8).reshape(img.height, img.width, 4)
+
+    def close(self) -> None:
+        if self._sct is not None:
+            self._sct.close()
+            self._sct = None
+
+
+class XShmBackend(CaptureBackend):
+    """
+    Captura en X11 mediante la extensión MIT-SHM (requiere xcffib).
+
+    El servidor X escribe directamente en un segmento de memoria compartida
+    que se reserva una sola vez y se reutiliza en cada frame.
+    """
+
+    name = "xshm"
+
+    _IPC_PRIVATE = 0
+    _IPC_CREAT = 0o1000
+    _IPC_RMID = 0
+
+    def __init__(self, display: Optional[str] = None):
+        """
+        Args:
+            display: Display de X11 (None usa $DISPLAY)
+        """
+        self.display = display
+        self._conn = None
+        self._shm = None
+        self._root = None
+        self._libc = None
+        self._segment = None
+        self._address = None
+        self._capacity = 0
+
+    def open(self) -> None:
+        import ctypes
+        import ctypes.util
+        import xcffib
+        import xcffib.shm
+
+        self._conn = xcffib.connect(display=self.display)
+        self._shm = self._conn(xcffib.shm.key)
+        setup = self._conn.get_setup()
+        self._root = setup.roots[self._conn.pref_screen].root
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        libc.shmget.restype = ctypes.c_int
+        libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        libc.shmat.restype = ctypes.c_void_p
+        libc.shmdt.argtypes = [ctypes.c_void_p]
+        libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+        self._libc = libc
+
+    def _ensure_capacity(self, size: int) -> None:
+        """Reserva (o amplía) el segmento compartido."""
+        import ctypes
+
+        if size <= self._capacity:
+            return
+        self._release_segment()
+
+        shmid = self._libc.shmget(self._IPC_PRIVATE, size, self._IPC_CREAT | 0o600)
+        if shmid < 0:
+            raise OSError("shmget falló reservando memoria compartida")
+        address = self._libc.shmat(shmid, None, 0)
+        if address is None or address == ctypes.c_void_p(-1).value:
+            self._libc.shmctl(shmid, self._IPC_RMID, None)
+            raise OSError("shmat falló adjuntando memoria compartida")
+
+        segment = self._conn.generate_id()
+        self._shm.AttachChecked(segment, shmid, False).check()
+        # Marcar para borrado: el sistema lo libera cuando ambos procesos se desadjunten
+        self._libc.shmctl(shmid, self._IPC_RMID, None)
+
+        self._segment = segment
+        self._address = address
+        self._capacity = size
+        logger.info(f"Segmento XShm reservado: {size} bytes")
+
+    def grab(self, bbox: dict) -> np.ndarray:
+        import ctypes
+        import xcffib.xproto
+
+        if self._conn is None:
+            self.open()
+
+        width, height = bbox['width'], bbox['height']
+        size = width * height * 4
+        self._ensure_capacity(size)
+
+        self._shm.GetImage(
+            self._root, bbox['left'], bbox['top'], width, height,
+            0xFFFFFFFF, xcffib.xproto.ImageFormat.ZPixmap,
+            self._segment, 0
+        ).reply()
+
+        buffer = (ctypes.c_ubyte * size).from_address(self._address)
+        return np.frombuffer(buffer, dtype=np.uint8).reshape(height, width, 4)
+
+    def _release_segment(self) -> None:
+        if self._segment is not None:
+            try:
+                self._shm.Detach(self._segment)
+                self._conn.flush()
+            except Exception as e:
+                logger.debug(f"Error desadjuntando segmento XShm: {e}")
+            self._segment = None
+        if self._address is not None:
+            self._libc.shmdt(self._address)
+            self._address = None
+        self._capacity = 0
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._release_segment()
+            self._conn.disconnect()
+            self._conn = None
+
+
+class TestPatternBackend(CaptureBackend):
+    """Genera un patrón sintético en movimiento (pruebas y benchmarks sin pantalla)."""
+
+    name = "test_pattern"
+
+    def __init__(self):
+        self._buffer: Optional[np.ndarray] = None
+        self._base: Optional[np.ndarray] = None
+        self._frame = 0
+
+    def grab(self, bbox: dict) -> np.ndarray:
+        width, height = bbox['width'], bbox['height']
+        if self._buffer is None or self._buffer.shape[:2] != (height, width):
+            # Degradado fijo precalculado; cada frame solo desplaza una barra
+            x = np.linspace(0, 255, width, dtype=np.uint8)
+            y = np.linspace(0, 255, height, dtype=np.uint8)
+            self._base = np.empty((height, width, 4), dtype=np.uint8)
+            self._base[..., 0] = x[np.newaxis, :]
+            self._base[..., 1] = y[:, np.newaxis]
+            self._base[..., 2] = 128
+            self._base[..., 3] = 255
+            self._buffer = self._base.copy()
+
+        bar_width = max(1, width // 32)
+        previous = (self._frame * bar_width) % width
+        self._frame += 1
+        current = (self._frame * bar_width) % width
+        self._buffer[:, previous:previous + bar_width] = self._base[:, previous:previous + bar_width]
+        self._buffer[:, current:current + bar_width, :3] = 255
+        return self._buffer
+
+
+CAPTURE_BACKENDS: Dict[str, Type[CaptureBackend]] = {
+    MssBackend.name: MssBackend,
+    XShmBackend.name: XShmBackend,
+    TestPatternBackend.name: TestPatternBackend,
+}
+
+
+def create_capture_backend(name: str, fallback: str = MssBackend.name) -> CaptureBackend:
+    """
+    Crea y abre un backend de captura, cayendo a `fallback` si no está disponible.
+
+    Args:
+        name: Nombre del backend (ver CAPTURE_BACKENDS)
+        fallback: Backend a usar si el solicitado falla
+
+    Returns:
+        Backend abierto
+    """
+    backend_cls = CAPTURE_BACKENDS.get(name)
+    if backend_cls is None:
+        logger.warning(f"Backend de captura desconocido '{name}', usando {fallback}")
+        backend_cls = CAPTURE_BACKENDS[fallback]
+
+    backend = backend_cls()
+    try:
+        backend.open()
+        logger.info(f"Backend de captura: {backend.name}")
+        return backend
+    except Exception as e:
+        if backend_cls.name == fallback:
+            raise
+        logger.warning(f"Backend de captura '{backend_cls.name}' no disponible ({e}), usando {fallback}")
+        backend = CAPTURE_BACKENDS[fallback]()
+        backend.open()
+        return backend
+
+
+def available_backends() -> List[str]:
+    """Retorna los nombres de los backends que pueden abrirse en este sistema."""
+    available = []
+    for name, backend_cls in CAPTURE_BACKENDS.items():
+        backend = backend_cls()
+        try:
+            backend.open()
+            available.append(name)
+        except Exception:
+            continue
+        finally:
+            try:
+                backend.close()
+            except Exception:
+                pass
+    return available
@@ -0,0 +1,52 @@
+"""
+Detección de pantalla estática.
+
+Compara una muestra submuestreada del frame BGRA crudo con la del frame
+anterior, antes de convertir, superponer o codificar. Si no cambió, el frame
+se omite y el escritor lo trata como repetición del anterior.
+"""
+
+import logging
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class StaticFrameDetector:
+    """Detecta frames idénticos al anterior comparando una de cada N filas."""
+
+    def __init__(self, row_stride: int = 4):
+        """
+        Args:
+            row_stride: Se compara una de cada `row_stride` filas a ancho
+                completo; así un cursor de texto de 1-2 px no pasa inadvertido
+        """
+        self.row_stride = max(1, int(row_stride))
+        self.static_frames = 0
+        self._previous: Optional[np.ndarray] = None
+
+    def reset(self) -> None:
+        """Olvida el frame de referencia (el siguiente se considera cambiado)."""
+        self._previous = None
+
+    def is_static(self, raw: np.ndarray) -> bool:
+        """
+        Indica si `raw` es igual al último frame con cambios.
+
+        Args:
+            raw: Frame BGRA capturado
+
+        Returns:
+            True si la muestra no cambió respecto al frame anterior
+        """
+        sample = raw[::self.row_stride]
+        if self._previous is not None and self._previous.shape == sample.shape:
+            if np.array_equal(sample, self._previous):
+                self.static_frames += 1
+                return True
+            np.copyto(self._previous, sample)
+        else:
+            self._previous = sample.copy()
+        return False
@@ -0,0 +1,795 @@
+"""
+Interfaz de línea de comandos sin Qt (`python -m logic`).
+
+Graba, combina y lista dispositivos usando directamente ConfigManager,
+ScreenHandler, AudioHandler y ScreenRecorder; nada de este módulo importa
+PyQt, así que sirve en servidores y tareas programadas.
+
+Comandos:
+    record   Graba en primer plano hasta Ctrl+C, SIGTERM o `--duration`
+    combine  Combina un video temporal y un WAV en el archivo final
+    devices  Lista micrófonos, monitores y backends de captura
+    daemon   Proceso residente controlado por un socket local o por señales
+    start, stop, pause, resume, status, shutdown
+             Envían la orden al daemon
+
+El daemon recibe un objeto JSON por línea ({"command": "start", "options":
+{...}}) y responde con otro. Solo el usuario que lo lanzó puede controlarlo:
+en POSIX escucha en un socket Unix con permisos 0600 dentro de un directorio
+privado (`$XDG_RUNTIME_DIR/grabador`); en Windows escucha en 127.0.0.1
+(`cli.daemon_port`) y exige el token de sesión que escribe en un archivo del
+perfil del usuario. En POSIX, SIGUSR1 alterna la pausa y SIGUSR2 detiene la
+grabación en curso; SIGINT y SIGTERM lo cierran deteniendo antes la grabación.
+"""
+
+import argparse
+import hmac
+import json
+import logging
+import os
+import secrets
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Any, Dict, List, Optional
+
+from .config_manager import ConfigManager
+from .job_queue import JobKind, JobQueue, PostProcessJob, build_finalize_job, run_job
+from .multi_monitor import MonitorMode
+
+logger = logging.getLogger(__name__)
+
+DAEMON_HOST = "127.0.0.1"
+DEFAULT_DAEMON_PORT = 47653
+# Archivos de control dentro de control_dir()
+_SOCKET_NAME = "daemon.sock"
+_TOKEN_NAME = "daemon.token"
+# Segundos que se espera a que el grabador arranque o termine
+_START_TIMEOUT = 10.0
+_JOIN_TIMEOUT = 5.0
+# Tamaño máximo de una orden al daemon
+_MAX_REQUEST = 64 * 1024
+
+
+class CliError(Exception):
+    """Error de uso o de ejecución que se informa sin traza."""
+
+
+def use_unix_socket() -> bool:
+    """Indica si el daemon se controla por un socket Unix (POSIX)."""
+    return os.name != 'nt' and hasattr(socket, "AF_UNIX")
+
+
+def control_dir() -> Path:
+    """
+    Directorio privado del usuario con el socket o el token del daemon.
+
+    Raises:
+        CliError: Si el directorio existe pero otro usuario puede usarlo
+    """
+    if os.name == 'nt':
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home())
+        path = base / "grabador"
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    path = Path(runtime) / "grabador" if runtime else Path(tempfile.gettempdir()) / f"grabador-{os.getuid()}"
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    info = path.stat()
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise CliError(f"El directorio de control {path} no es privado del usuario")
+    return path
+
+
+def _write_token() -> str:
+    """Genera el token de la sesión y lo guarda legible solo por el usuario."""
+    token = secrets.token_hex(32)
+    path = control_dir() / _TOKEN_NAME
+    if path.exists():
+        path.unlink()
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+    return token
+
+
+def _read_token() -> str:
+    try:
+        return (control_dir() / _TOKEN_NAME).read_text(encoding="utf-8").strip()
+    except OSError:
+        raise CliError("No se encontró el token del daemon (¿está en marcha?)")
+
+
+def list_monitors() -> List[Dict[str, Any]]:
+    """
+    Monitores conectados, en el orden que usa la interfaz.
+
+    Returns:
+        Lista de {'name', 'left', 'top', 'width', 'height', 'primary'}
+    """
+    from screeninfo import get_monitors
+
+    return [
+        {
+            'name': m.name or f"Pantalla {i}",
+            'left': m.x,
+            'top': m.y,
+            'width': m.width,
+            'height': m.height,
+            'primary': bool(m.is_primary),
+        }
+        for i, m in enumerate(get_monitors(), start=1)
+    ]
+
+
+def parse_region(text: str) -> Dict[str, int]:
+    """
+    Convierte "izquierda,arriba,ancho,alto" en una región.
+
+    Raises:
+        argparse.ArgumentTypeError: Si el formato no es válido
+    """
+    try:
+        left, top, width, height = (int(value) for value in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Región no válida '{text}' (usa izquierda,arriba,ancho,alto)")
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"Región vacía: {text}")
+    return {'left': left, 'top': top, 'width': width, 'height': height}
+
+
+def parse_window_id(text: str) -> int:
+    """Acepta el identificador X11 en decimal o hexadecimal (0x...)."""
+    try:
+        return int(text, 0)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Identificador de ventana no válido: {text}")
+
+
+class RecordingSession:
+    """
+    Una grabación lanzada desde la línea de comandos.
+
+    `ScreenRecorder.start_recording` bloquea hasta que se detiene, así que
+    corre en su propio hilo, igual que en la interfaz gráfica.
+    """
+
+    def __init__(self, config_manager: ConfigManager, options: Dict[str, Any]):
+        """
+        Args:
+            config_manager: Configuración de la aplicación
+            options: Opciones de grabación (las del comando `record`); las
+                ausentes se toman de la configuración
+        """
+        self.config_manager = config_manager
+        self.options = options
+        self.recorder = None
+        self.thread: Optional[Thread] = None
+        self.video_path = ""
+        self.audio_path = ""
+        self.description = ""
+
+    def option(self, name: str, config_key: Optional[str] = None, default: Any = None) -> Any:
+        value = self.options.get(name)
+        if value is None and config_key:
+            value = self.config_manager.get(config_key, default)
+        return default if value is None else value
+
+    def _capture_target(self) -> Dict[str, Any]:
+        """Región, monitores y ventana a grabar según las opciones."""
+        monitors = [
+            {key: m[key] for key in ('left', 'top', 'width', 'height')}
+            for m in list_monitors()
+        ]
+        if not monitors:
+            raise CliError("No se encontró ninguna pantalla")
+
+        index = int(self.option("monitor", default=1))
+        if not 1 <= index <= len(monitors):
+            raise CliError(f"La pantalla {index} no existe (hay {len(monitors)})")
+        bbox = monitors[index - 1]
+        if self.options.get("monitor_mode"):
+            monitor_mode = self.options["monitor_mode"]
+        elif self.options.get("monitor") is not None:
+            # Una pantalla elegida explícitamente no hereda el modo multimonitor de la interfaz
+            monitor_mode = MonitorMode.SINGLE
+        else:
+            monitor_mode = self.config_manager.get("recording.monitor_mode", MonitorMode.SINGLE)
+        self.description = f"pantalla {index}"
+
+        region = self.option("region")
+        window_id = self.option("window")
+        if isinstance(region, str):
+            region = parse_region(region)
+        if window_id is not None:
+            window_id = parse_window_id(str(window_id))
+            monitor_mode = MonitorMode.SINGLE
+            self.description = f"ventana 0x{window_id:x}"
+        elif region:
+            bbox = region
+            monitor_mode = MonitorMode.SINGLE
+            self.description = f"región {region['width']}x{region['height']}"
+        elif monitor_mode != MonitorMode.SINGLE:
+            self.description = f"{len(monitors)} pantallas ({monitor_mode})"
+
+        return {"bbox": bbox, "monitors": monitors, "monitor_mode": monitor_mode, "window_id": window_id}
+
+    def start(self) -> None:
+        """
+        Inicia la grabación y espera a que el grabador esté capturando.
+
+        Raises:
+            CliError: Si la grabación no llega a iniciarse
+        """
+        from .audio_handler import AudioHandler
+        from .recorder import RecorderState, ScreenRecorder
+        from .screen_handler import ScreenHandler
+
+        target = self._capture_target()
+
+        tmp_dir = Path("grabaciones/tmp")
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.video_path = str(tmp_dir / f"tmp_{timestamp}_video.mkv")
+        self.audio_path = str(tmp_dir / f"tmp_{timestamp}_audio.wav")
+
+        self.recorder = ScreenRecorder(ScreenHandler(), AudioHandler(), self.config_manager)
+        self.thread = Thread(
+            target=self.recorder.start_recording,
+            args=(self.video_path, self.audio_path, target["bbox"], int(self.option("mic", default=0))),
+            kwargs={
+                "fps": int(self.option("fps", "recording.fps", 15)),
+                "quality": int(self.option("quality", default=85)),
+                "capture_camera": bool(self.option("camera", default=False)),
+                "video_format": self.option("format", "recording.format", ".mp4"),
+                "monitors": target["monitors"],
+                "monitor_mode": target["monitor_mode"],
+                "window_id": target["window_id"],
+            },
+            name="cli-recording",
+            daemon=True
+        )
+        self.thread.start()
+
+        # start_recording no retorna mientras graba: esperar al cambio de estado
+        deadline = time.monotonic() + _START_TIMEOUT
+        while self.thread.is_alive() and self.recorder.state == RecorderState.IDLE:
+            if time.monotonic() > deadline:
+                break
+            time.sleep(0.05)
+        if self.recorder.state == RecorderState.IDLE:
+            raise CliError("No se pudo iniciar la grabación (detalles en el registro)")
+        logger.info(f"Grabación CLI iniciada: {self.description} -> {self.video_path}")
+
+    def is_active(self) -> bool:
+        return self.recorder is not None and (self.recorder.is_recording() or self.recorder.is_paused())
+
+    def toggle_pause(self) -> bool:
+        """Alterna pausa y grabación; retorna True si quedó pausada."""
+        if self.recorder.is_paused():
+            self.recorder.resume_recording()
+        else:
+            self.recorder.pause_recording()
+        return self.recorder.is_paused()
+
+    def stop(self) -> Optional[PostProcessJob]:
+        """
+        Detiene la grabación.
+
+        Returns:
+            Trabajo que genera el archivo final, o None si no hay video
+        """
+        video_path, audio_path = self.recorder.stop_recording()
+        if self.thread is not None:
+            self.thread.join(_JOIN_TIMEOUT)
+        if not video_path or not Path(video_path).exists():
+            logger.error("La grabación no generó archivo de video")
+            return None
+        return build_finalize_job(
+            video_path,
+            audio_path,
+            output_dir=self.option("output_dir", "files.storage_location", "grabaciones"),
+            filename=self.option("filename", "files.default_filename", "grabacion"),
+            video_format=self.option("format", "recording.format", ".mp4"),
+            quality=int(self.option("quality", default=85)),
+            already_muxed=self.recorder.output_is_final,
+            segments=list(self.recorder.segment_paths),
+            session_stats=self.recorder.get_session_summary(),
+            monitor_videos=list(self.recorder.monitor_video_paths[1:])
+        )
+
+    def status(self) -> Dict[str, Any]:
+        """Estado de la grabación para `status`."""
+        recorder = self.recorder
+        elapsed = recorder.get_elapsed_time()
+        return {
+            "state": recorder.state,
+            "target": self.description,
+            "elapsed": round(elapsed, 1),
+            "elapsed_text": recorder.format_time(elapsed),
+            "video_path": self.video_path,
+        }
+
+
+def _print_progress(report: Dict[str, Any]) -> None:
+    fraction = report.get("fraction")
+    if fraction is not None:
+        print(f"\rProcesando... {fraction * 100:5.1f}%", end="", file=sys.stderr, flush=True)
+
+
+def _run_finalize(job: PostProcessJob, config_file: str) -> Dict[str, Any]:
+    """Ejecuta un trabajo de finalización en primer plano mostrando el progreso."""
+    try:
+        return run_job(job.kind, job.params, config_file, _print_progress)
+    finally:
+        print(file=sys.stderr)
+
+
+def _recording_options(args: argparse.Namespace) -> Dict[str, Any]:
+    """Opciones de grabación del comando, serializables para el daemon."""
+    return {
+        "monitor": args.monitor,
+        "monitor_mode": args.monitor_mode,
+        "region": args.region,
+        "window": args.window,
+        "fps": args.fps,
+        "quality": args.quality,
+        "format": args.format,
+        "mic": args.mic,
+        "camera": args.camera or None,
+        "output_dir": args.output_dir,
+        "filename": args.filename,
+    }
+
+
+def _install_handlers(handlers: Dict[str, Any]) -> None:
+    """Instala manejadores de señales; las que no existen en el sistema se ignoran."""
+    for name, handler in handlers.items():
+        signum = getattr(signal, name, None)
+        if signum is not None:
+            signal.signal(signum, handler)
+
+
+def cmd_record(args: argparse.Namespace, config_manager: ConfigManager) -> int:
+    """Graba en primer plano y genera el archivo final al terminar."""
+    session = RecordingSession(config_manager, _recording_options(args))
+    session.start()
+
+    stop_requested = Event()
+    _install_handlers({
+        "SIGINT": lambda signum, frame: stop_requested.set(),
+        "SIGTERM": lambda signum, frame: stop_requested.set(),
+        "SIGUSR1": lambda signum, frame: print(
+            "Pausado" if session.toggle_pause() else "Reanudado", file=sys.stderr
+        ),
+    })
+    limit = f" durante {args.duration:g}s" if args.duration else " (Ctrl+C para detener)"
+    print(f"Grabando {session.description}{limit}", file=sys.stderr)
+
+    # wait() con timeout para que las señales se atiendan también en Windows
+    while not stop_requested.wait(0.2):
+        if args.duration and session.recorder.get_elapsed_time() >= args.duration:
+            break
+        if not session.thread.is_alive():
+            logger.warning("El hilo de grabación terminó antes de tiempo")
+            break
+
+    job = session.stop()
+    if job is None:
+        raise CliError("No se generó archivo de video")
+    if args.no_finalize:
+        print(f"Temporales conservados: {session.video_path}")
+        return 0
+
+    result = _run_finalize(job, str(config_manager.config_file))
+    for output in result.get("outputs", [result["output"]]):
+        print(output)
+    return 0
+
+
+def cmd_combine(args: argparse.Namespace, config_manager: ConfigManager) -> int:
+    """Combina un video temporal y su audio en el archivo final."""
+    for path in (args.video, args.audio):
+        if not Path(path).exists():
+            raise CliError(f"No existe: {path}")
+    video_format = args.format or Path(args.output).suffix or ".mp4"
+    params = {
+        "video_path": args.video,
+        "audio_path": args.audio,
+        "output_path": args.output,
+        "video_format": video_format,
+        "quality": args.quality or 85,
+    }
+    result = _run_finalize(PostProcessJob(JobKind.COMBINE, params), str(config_manager.config_file))
+    print(result["output"])
+    return 0
+
+
+def cmd_devices(args: argparse.Namespace, config_manager: ConfigManager) -> int:
+    """Lista los dispositivos de captura disponibles."""
+    from .audio_handler import AudioHandler
+    from .screen_handler import ScreenHandler
+
+    microphones = AudioHandler().get_microphone_devices()
+    monitors = list_monitors()
+    report: Dict[str, Any] = {"microphones": microphones, "monitors": monitors}
+    if args.measure and monitors:
+        report["capture_backends"] = ScreenHandler().measure_backends(
+            {key: monitors[0][key] for key in ('left', 'top', 'width', 'height')}
+        )
+    from . import window_tracker
+    if window_tracker.is_supported():
+        report["windows"] = [
+            {"id": f"0x{w.window_id:x}", "title": w.title} for w in window_tracker.list_windows()
+        ]
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return 0
+
+    print("Micrófonos:")
+    for mic in microphones:
+        print(f"  [{mic['index']}] {mic['name']} ({mic['channels']} canales)")
+    print("Pantallas:")
+    for i, m in enumerate(monitors, start=1):
+        primary = " (principal)" if m['primary'] else ""
+        print(f"  [{i}] {m['name']}: {m['width']}x{m['height']} en {m['left']},{m['top']}{primary}")
+    if "windows" in report:
+        print("Ventanas:")
+        for window in report["windows"]:
+            print(f"  {window['id']} {window['title']}")
+    if "capture_backends" in report:
+        print("Backends de captura (capturas/s):")
+        for name, rate in report["capture_backends"].items():
+            print(f"  {name}: {rate}")
+    return 0
+
+
+class RecorderDaemon:
+    """
+    Proceso residente que graba bajo demanda.
+
+    Las órdenes llegan por el socket local o por señales; la finalización se
+    encola en la JobQueue para que el daemon pueda empezar otra grabación
+    mientras se procesa la anterior.
+    """
+
+    def __init__(self, config_manager: ConfigManager, port: int):
+        """
+        Args:
+            config_manager: Configuración de la aplicación
+            port: Puerto TCP en 127.0.0.1 (solo sin sockets Unix)
+        """
+        self.config_manager = config_manager
+        self.port = port
+        self.session: Optional[RecordingSession] = None
+        self.job_queue = JobQueue(
+            workers=config_manager.get("processing.workers", 1),
+            config_file=str(config_manager.config_file)
+        )
+        self.shutdown_requested = Event()
+        self._lock = Lock()
+        self._server: Optional[socketserver.BaseServer] = None
+        self._socket_path: Optional[Path] = None
+        self._token: Optional[str] = None
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Ejecuta una orden.
+
+        Args:
+            request: {"command": ..., "options": {...}}
+
+        Returns:
+            Respuesta {"ok": bool, ...}
+        """
+        command = request.get("command")
+        with self._lock:
+            if command == "start":
+                if self.session is not None and self.session.is_active():
+                    return {"ok": False, "error": "Ya hay una grabación en curso"}
+                session = RecordingSession(self.config_manager, request.get("options") or {})
+                session.start()
+                self.session = session
+                return {"ok": True, "target": session.description}
+            if command == "status":
+                return {"ok": True, **self._status()}
+            if command == "shutdown":
+                self.shutdown_requested.set()
+                return {"ok": True}
+
+            if self.session is None or not self.session.is_active():
+                return {"ok": False, "error": "No hay ninguna grabación en curso"}
+            if command == "stop":
+                return {"ok": True, **self._stop_session()}
+            if command in ("pause", "resume", "toggle"):
+                paused = self.session.recorder.is_paused()
+                if command == "toggle" or paused == (command == "resume"):
+                    paused = self.session.toggle_pause()
+                return {"ok": True, "paused": paused}
+        return {"ok": False, "error": f"Orden desconocida: {command}"}
+
+    def _status(self) -> Dict[str, Any]:
+        recording = self.session.status() if self.session is not None and self.session.is_active() else None
+        jobs = [job.format_status() for job in self.job_queue.get_jobs()]
+        return {"recording": recording, "jobs": jobs}
+
+    def _stop_session(self) -> Dict[str, Any]:
+        job = self.session.stop()
+        self.session = None
+        if job is None:
+            return {"job": None}
+        self.job_queue.submit(job)
+        logger.info(f"Procesamiento encolado: {job.description} [{job.id}]")
+        return {"job": job.id, "output": job.params["output_path"]}
+
+    def _signal_toggle(self, signum, frame) -> None:
+        Thread(target=self.handle, args=({"command": "toggle"},), daemon=True).start()
+
+    def _signal_stop(self, signum, frame) -> None:
+        Thread(target=self.handle, args=({"command": "stop"},), daemon=True).start()
+
+    def authorized(self, request: Dict[str, Any]) -> bool:
+        """Con socket TCP la orden debe traer el token de la sesión."""
+        if self._token is None:
+            return True
+        return hmac.compare_digest(str(request.get("token", "")), self._token)
+
+    def _create_server(self, handler) -> tuple:
+        """
+        Abre el socket de control accesible solo para el usuario actual.
+
+        Returns:
+            (servidor, dirección para mostrar)
+        """
+        if use_unix_socket():
+            path = control_dir() / _SOCKET_NAME
+            if path.exists():
+                probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                try:
+                    probe.connect(str(path))
+                    raise CliError(f"Ya hay un daemon en marcha ({path})")
+                except OSError:
+                    path.unlink()  # Socket de un daemon que no se cerró bien
+                finally:
+                    probe.close()
+            # umask: el socket nace con 0600, sin ventana en que otros puedan conectarse
+            previous = os.umask(0o177)
+            try:
+                server = socketserver.ThreadingUnixStreamServer(str(path), handler)
+            except OSError as e:
+                raise CliError(f"No se pudo escuchar en {path}: {e}")
+            finally:
+                os.umask(previous)
+            self._socket_path = path
+            return server, str(path)
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        try:
+            server = socketserver.ThreadingTCPServer((DAEMON_HOST, self.port), handler)
+        except OSError as e:
+            raise CliError(f"No se pudo escuchar en {DAEMON_HOST}:{self.port}: {e}")
+        self._token = _write_token()
+        return server, f"{DAEMON_HOST}:{self.port}"
+
+    def _remove_control_files(self) -> None:
+        try:
+            if self._socket_path is not None:
+                self._socket_path.unlink()
+            if self._token is not None:
+                (control_dir() / _TOKEN_NAME).unlink()
+        except OSError as e:
+            logger.debug(f"No se pudieron borrar los archivos de control: {e}")
+
+    def serve(self) -> None:
+        """Atiende órdenes hasta `shutdown` o SIGINT/SIGTERM."""
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline(_MAX_REQUEST)
+                try:
+                    request = json.loads(line)
+                    if not daemon.authorized(request):
+                        logger.warning("Orden al daemon rechazada: token no válido")
+                        raise CliError("No autorizado")
+                    response = daemon.handle(request)
+                except CliError as e:
+                    response = {"ok": False, "error": str(e)}
+                except Exception as e:
+                    logger.error(f"Error atendiendo orden del daemon: {e}", exc_info=True)
+                    response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+
+        self._server, address = self._create_server(Handler)
+        self._server.daemon_threads = True
+
+        _install_handlers({
+            "SIGINT": lambda signum, frame: self.shutdown_requested.set(),
+            "SIGTERM": lambda signum, frame: self.shutdown_requested.set(),
+            "SIGUSR1": self._signal_toggle,
+            "SIGUSR2": self._signal_stop,
+        })
+        self.job_queue.start()
+        server_thread = Thread(target=self._server.serve_forever, name="cli-daemon", daemon=True)
+        server_thread.start()
+        logger.info(f"Daemon escuchando en {address}")
+        print(f"Daemon escuchando en {address}", file=sys.stderr)
+
+        try:
+            while not self.shutdown_requested.wait(0.5):
+                pass
+        finally:
+            with self._lock:
+                if self.session is not None and self.session.is_active():
+                    self._stop_session()
+            self._server.shutdown()
+            self._server.server_close()
+            self._remove_control_files()
+            # Los trabajos en curso se retoman al reiniciar (la cola se persiste)
+            self.job_queue.stop()
+            logger.info("Daemon detenido")
+
+
+def send_command(port: int, command: str, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Envía una orden al daemon.
+
+    Raises:
+        CliError: Si el daemon no responde
+    """
+    request = {"command": command, "options": options or {}}
+    if use_unix_socket():
+        address = str(control_dir() / _SOCKET_NAME)
+    else:
+        address = f"{DAEMON_HOST}:{port}"
+        request["token"] = _read_token()
+    try:
+        if use_unix_socket():
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.settimeout(_START_TIMEOUT + 5)
+            conn.connect(address)
+        else:
+            conn = socket.create_connection((DAEMON_HOST, port), timeout=_START_TIMEOUT + 5)
+        with conn:
+            conn.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            data = conn.makefile("rb").readline()
+    except OSError as e:
+        raise CliError(f"No se pudo contactar con el daemon en {address}: {e}")
+    if not data:
+        raise CliError("El daemon cerró la conexión sin responder")
+    return json.loads(data)
+
+
+def cmd_daemon(args: argparse.Namespace, config_manager: ConfigManager) -> int:
+    RecorderDaemon(config_manager, args.port).serve()
+    return 0
+
+
+def cmd_client(args: argparse.Namespace, config_manager: ConfigManager) -> int:
+    """Envía start/stop/pause/resume/status/shutdown al daemon."""
+    options = _recording_options(args) if args.command == "start" else None
+    response = send_command(args.port, args.command, options)
+    if not response.get("ok"):
+        raise CliError(response.get("error", "Error desconocido"))
+    response.pop("ok")
+    if args.command == "status" and not args.json:
+        recording = response["recording"]
+        if recording:
+            print(f"{recording['state']}: {recording['target']} {recording['elapsed_text']}")
+        else:
+            print("Sin grabación en curso")
+        for line in response["jobs"]:
+            print(f"  {line}")
+    elif response:
+        print(json.dumps(response, indent=2, ensure_ascii=False))
+    return 0
+
+
+def _add_recording_arguments(parser: argparse.ArgumentParser) -> None:
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--monitor", type=int, help="Pantalla a grabar (1 = primera)")
+    target.add_argument("--all-monitors", dest="monitor_mode", choices=[MonitorMode.SEPARATE, MonitorMode.CANVAS],
+                        help="Graba todas las pantallas: un archivo por pantalla o un lienzo")
+    target.add_argument("--region", type=parse_region, help="Región izquierda,arriba,ancho,alto")
+    target.add_argument("--window", type=parse_window_id, help="Ventana X11 a seguir (ver `devices`)")
+    parser.add_argument("--fps", type=int, help="Cuadros por segundo (por defecto recording.fps)")
+    parser.add_argument("--quality", type=int, help="Calidad 1-100 (por defecto 85)")
+    parser.add_argument("--format", help="Contenedor final, p. ej. .mp4 o .mkv")
+    parser.add_argument("--mic", type=int, help="Índice del micrófono (ver `devices`)")
+    parser.add_argument("--camera", action="store_true", help="Superpone la cámara web")
+    parser.add_argument("--output-dir", help="Carpeta del archivo final (por defecto files.storage_location)")
+    parser.add_argument("--filename", help="Prefijo del archivo final (por defecto files.default_filename)")
+
+
+def build_parser(config_manager: ConfigManager) -> argparse.ArgumentParser:
+    """Construye el analizador de argumentos de `python -m logic`."""
+    parser = argparse.ArgumentParser(prog="python -m logic", description="Grabador de pantalla sin interfaz gráfica")
+    parser.add_argument("--config", default="config.json", help="Archivo de configuración")
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="Más detalle en el registro")
+    parser.add_argument("--log-file", help="Escribe el registro en un archivo en lugar de stderr")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    port = config_manager.get("cli.daemon_port", DEFAULT_DAEMON_PORT)
+
+    record = commands.add_parser("record", help="Graba en primer plano")
+    _add_recording_arguments(record)
+    record.add_argument("--duration", type=float, help="Segundos a grabar (sin pausas)")
+    record.add_argument("--no-finalize", action="store_true",
+                        help="Conserva los temporales sin generar el archivo final")
+    record.set_defaults(handler=cmd_record)
+
+    combine = commands.add_parser("combine", help="Combina video y audio temporales")
+    combine.add_argument("video")
+    combine.add_argument("audio")
+    combine.add_argument("output")
+    combine.add_argument("--format", help="Contenedor final (por defecto la extensión de salida)")
+    combine.add_argument("--quality", type=int)
+    combine.set_defaults(handler=cmd_combine)
+
+    devices = commands.add_parser("devices", help="Lista micrófonos, pantallas y ventanas")
+    devices.add_argument("--measure", action="store_true", help="Mide los backends de captura")
+    devices.add_argument("--json", action="store_true")
+    devices.set_defaults(handler=cmd_devices)
+
+    daemon = commands.add_parser("daemon", help="Proceso residente controlado por socket o señales")
+    daemon.add_argument("--port", type=int, default=port, help="Puerto TCP (solo Windows)")
+    daemon.set_defaults(handler=cmd_daemon)
+
+    for name, help_text in (
+        ("start", "Inicia una grabación en el daemon"),
+        ("stop", "Detiene la grabación del daemon y encola su finalización"),
+        ("pause", "Pausa la grabación del daemon"),
+        ("resume", "Reanuda la grabación del daemon"),
+        ("status", "Estado del daemon y de su cola de trabajos"),
+        ("shutdown", "Cierra el daemon"),
+    ):
+        client = commands.add_parser(name, help=help_text)
+        if name == "start":
+            _add_recording_arguments(client)
+        client.add_argument("--port", type=int, default=port, help="Puerto TCP (solo Windows)")
+        client.add_argument("--json", action="store_true")
+        client.set_defaults(handler=cmd_client)
+
+    return parser
+
+
+def _configure_logging(args: argparse.Namespace) -> None:
+    level = logging.WARNING - 10 * min(args.verbose, 2)
+    logging.basicConfig(
+        filename=args.log_file,
+        level=level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        encoding='utf-8'
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Punto de entrada de `python -m logic`.
+
+    Returns:
+        Código de salida del proceso
+    """
+    # La configuración se lee antes de analizar los argumentos (puerto del daemon)
+    pre_parser = argparse.ArgumentParser(add_help=False)
+    pre_parser.add_argument("--config", default="config.json")
+    known, _ = pre_parser.parse_known_args(argv)
+    config_manager = ConfigManager(known.config)
+
+    args = build_parser(config_manager).parse_args(argv)
+    _configure_logging(args)
+    try:
+        return args.handler(args, config_manager)
+    except CliError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
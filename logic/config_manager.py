@@ -103,17 +103,39 @@ class ConfigManager:
                 "show_cursor": True,
                 "cursor_style": "Predeterminado",
                 "minimize_on_start": True,
+                "capture_backend": "mss",
+                "encode_mode": "live",
+                "speed_mode": "balanced",
+                "monitor_mode": "single",
+                "window_poll_seconds": 0.2,
+                "encoder_process": False,
+                "segment_seconds": 0,
+                "segment_max_mb": 0,
+                "segment_join": "concat",
+                "crash_safe": True,
+                "checkpoint_seconds": 5,
+                "skip_static_frames": True,
+                "webcam_preview_fps": 10,
+                "queue_size": 4,
+                "drop_policy": "drop_oldest",
             },
             "audio": {
                 "record_microphone": True,
                 "microphone_volume": 1000,
                 "record_system_audio": False,
                 "system_audio_volume": 700,
+                "capture_mode": "callback",
             },
             "files": {
                 "default_filename": "grabacion",
                 "storage_location": "grabaciones",
             },
+            "processing": {
+                "workers": 1,
+            },
+            "cli": {
+                "daemon_port": 47653,
+            },
             "keyboard": {
                 "hotkey": "Ctrl+Alt+R",
                 "enabled": True,
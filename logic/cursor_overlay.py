@@ -0,0 +1,364 @@
+"""
+Cursor del ratón dibujado sobre los frames capturados.
+
+mss y XShm no incluyen el cursor en la captura. La etapa de captura consulta
+la posición del puntero una vez por frame (en X11 con XFixes, que también da
+la imagen real del cursor) y la etapa de procesamiento lo compone.
+
+Cada estilo se pre-renderiza una sola vez por sesión como sprite BGRA con
+alfa premultiplicado; componer es `frame = frame * (1 - alfa) + sprite`
+sobre la pequeña región bajo el puntero, con buffers reservados, así que el
+coste por frame es de microsegundos. La imagen real del cursor se decodifica
+solo cuando cambia (número de serie de XFixes).
+"""
+
+import logging
+import os
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Sprites de imágenes de cursor distintas que se conservan (flechas, manos, texto...)
+_MAX_CACHED_IMAGES = 32
+
+
+class CursorStyle:
+    """Estilos de cursor (`recording.cursor_style`)."""
+    DEFAULT = "Predeterminado"
+    WHITE_CIRCLE = "Círculo blanco"
+    RED_CIRCLE = "Círculo rojo"
+    GREEN_CIRCLE = "Círculo verde"
+    BLUE_CIRCLE = "Círculo azul"
+    CROSS = "Cruz"
+
+    ALL = (DEFAULT, WHITE_CIRCLE, RED_CIRCLE, GREEN_CIRCLE, BLUE_CIRCLE, CROSS)
+
+
+# Colores BGR de los círculos
+_CIRCLE_COLORS = {
+    CursorStyle.WHITE_CIRCLE: (255, 255, 255),
+    CursorStyle.RED_CIRCLE: (0, 0, 255),
+    CursorStyle.GREEN_CIRCLE: (0, 255, 0),
+    CursorStyle.BLUE_CIRCLE: (255, 0, 0),
+}
+
+CURSOR_RADIUS = 10
+
+# Flecha de respaldo cuando no hay imagen real del cursor (punta en el origen)
+_ARROW_POINTS = [(0, 0), (0, 16), (4, 12), (7, 18), (9, 17), (6, 11), (11, 11)]
+
+
+class CursorSample:
+    """Posición del puntero (coordenadas de pantalla) y su imagen, si se conoce."""
+
+    def __init__(
+        self,
+        x: int,
+        y: int,
+        serial: Optional[int] = None,
+        image: Optional[np.ndarray] = None,
+        hotspot: Tuple[int, int] = (0, 0)
+    ):
+        """
+        Args:
+            x, y: Posición del punto activo del cursor
+            serial: Identificador de la imagen del cursor (XFixes)
+            image: Imagen BGRA premultiplicada del cursor (compartida, no se modifica)
+            hotspot: Punto activo dentro de la imagen
+        """
+        self.x = x
+        self.y = y
+        self.serial = serial
+        self.image = image
+        self.hotspot = hotspot
+
+
+class CursorSprite:
+    """Sprite BGRA premultiplicado listo para componer."""
+
+    def __init__(self, bgra: np.ndarray, hotspot: Tuple[int, int]):
+        """
+        Args:
+            bgra: Imagen (alto, ancho, 4) con alfa premultiplicado
+            hotspot: Punto activo (x, y) dentro de la imagen
+        """
+        self.height, self.width = bgra.shape[:2]
+        self.hot_x, self.hot_y = hotspot
+        self.color = bgra[..., :3].astype(np.uint16)
+        self.inv_alpha = (255 - bgra[..., 3:4]).astype(np.uint16)
+        self._work = np.empty((self.height, self.width, 3), dtype=np.uint16)
+
+    def blend(self, frame: np.ndarray, x: int, y: int) -> bool:
+        """
+        Compone el sprite con su punto activo en (x, y), recortado a los bordes.
+
+        Returns:
+            True si alguna parte del sprite cae dentro del frame
+        """
+        left, top = x - self.hot_x, y - self.hot_y
+        frame_h, frame_w = frame.shape[:2]
+        x0, y0 = max(left, 0), max(top, 0)
+        x1, y1 = min(left + self.width, frame_w), min(top + self.height, frame_h)
+        if x0 >= x1 or y0 >= y1:
+            return False
+
+        sprite_rows = slice(y0 - top, y1 - top)
+        sprite_cols = slice(x0 - left, x1 - left)
+        roi = frame[y0:y1, x0:x1]
+        work = self._work[sprite_rows, sprite_cols]
+        # frame * (255 - alfa) / 255 + sprite, redondeando, en uint16
+        np.multiply(roi, self.inv_alpha[sprite_rows, sprite_cols], out=work)
+        work += 127
+        work //= 255
+        work += self.color[sprite_rows, sprite_cols]
+        np.copyto(roi, work, casting='unsafe')
+        return True
+
+
+def _premultiplied(color: np.ndarray, alpha: np.ndarray) -> np.ndarray:
+    bgra = np.empty(color.shape[:2] + (4,), dtype=np.uint8)
+    bgra[..., :3] = (color.astype(np.uint16) * alpha[..., None] + 127) // 255
+    bgra[..., 3] = alpha
+    return bgra
+
+
+def render_sprite(style: str, scale: float = 1.0) -> CursorSprite:
+    """
+    Pre-renderiza el sprite de un estilo.
+
+    Args:
+        style: CursorStyle (DEFAULT dibuja la flecha de respaldo)
+        scale: Escala de la salida respecto a la captura
+
+    Returns:
+        Sprite con el punto activo en el centro (o en la punta de la flecha)
+    """
+    if style in _CIRCLE_COLORS:
+        radius = max(3, round(CURSOR_RADIUS * scale))
+        size = 2 * radius + 3
+        center = (size // 2, size // 2)
+        color = np.empty((size, size, 3), dtype=np.uint8)
+        color[:] = _CIRCLE_COLORS[style]
+        alpha = np.zeros((size, size), dtype=np.uint8)
+        # Relleno translúcido y borde opaco
+        cv2.circle(alpha, center, radius, 110, -1, cv2.LINE_AA)
+        cv2.circle(alpha, center, radius, 255, max(1, round(2 * scale)), cv2.LINE_AA)
+        return CursorSprite(_premultiplied(color, alpha), center)
+
+    if style == CursorStyle.CROSS:
+        arm = max(4, round(CURSOR_RADIUS * scale))
+        size = 2 * arm + 3
+        c = size // 2
+        color = np.zeros((size, size, 3), dtype=np.uint8)
+        alpha = np.zeros((size, size), dtype=np.uint8)
+        # Cruz blanca con contorno negro para que se vea sobre cualquier fondo
+        for canvas, value, thickness in ((alpha, 255, 3), (color, (255, 255, 255), 1)):
+            cv2.line(canvas, (c - arm, c), (c + arm, c), value, thickness)
+            cv2.line(canvas, (c, c - arm), (c, c + arm), value, thickness)
+        return CursorSprite(_premultiplied(color, alpha), (c, c))
+
+    # Flecha de respaldo (Windows o sin XFixes), con 1 px de margen para el contorno
+    factor = max(0.5, scale)
+    points = np.array([(1 + round(px * factor), 1 + round(py * factor)) for px, py in _ARROW_POINTS], dtype=np.int32)
+    width, height = points[:, 0].max() + 2, points[:, 1].max() + 2
+    color = np.zeros((height, width, 3), dtype=np.uint8)
+    alpha = np.zeros((height, width), dtype=np.uint8)
+    cv2.fillPoly(alpha, [points], 255, cv2.LINE_AA)
+    cv2.polylines(alpha, [points], True, 255, 1, cv2.LINE_AA)
+    cv2.fillPoly(color, [points], (255, 255, 255))
+    cv2.polylines(color, [points], True, (0, 0, 0), 1, cv2.LINE_AA)
+    return CursorSprite(_premultiplied(color, alpha), (1, 1))
+
+
+class CursorOverlay:
+    """Compone el cursor de un estilo sobre frames de una fuente de captura."""
+
+    def __init__(self, style: str = CursorStyle.DEFAULT, scale: float = 1.0):
+        """
+        Args:
+            style: CursorStyle
+            scale: Escala de la salida respecto a la captura (el sprite se
+                reduce igual que la pantalla)
+        """
+        if style not in CursorStyle.ALL:
+            logger.warning(f"Estilo de cursor desconocido '{style}', usando el predeterminado")
+            style = CursorStyle.DEFAULT
+        self.style = style
+        self.scale = scale
+        self._fixed = render_sprite(style, scale) if style != CursorStyle.DEFAULT else None
+        self._arrow: Optional[CursorSprite] = None
+        self._images: Dict[int, CursorSprite] = {}
+        self.images_decoded = 0
+
+    def _sprite_for(self, sample: CursorSample) -> CursorSprite:
+        if self._fixed is not None:
+            return self._fixed
+        if sample.serial is not None and sample.image is not None:
+            sprite = self._images.get(sample.serial)
+            if sprite is None:
+                sprite = self._image_sprite(sample)
+                if len(self._images) >= _MAX_CACHED_IMAGES:
+                    self._images.pop(next(iter(self._images)))
+                self._images[sample.serial] = sprite
+            return sprite
+        if self._arrow is None:
+            self._arrow = render_sprite(CursorStyle.DEFAULT, self.scale)
+        return self._arrow
+
+    def _image_sprite(self, sample: CursorSample) -> CursorSprite:
+        """Sprite a partir de la imagen real del cursor (ya premultiplicada)."""
+        image = sample.image
+        hot_x, hot_y = sample.hotspot
+        if self.scale != 1.0:
+            height, width = image.shape[:2]
+            size = (max(1, round(width * self.scale)), max(1, round(height * self.scale)))
+            # Escalar con alfa premultiplicado no produce halos
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+            hot_x, hot_y = round(hot_x * self.scale), round(hot_y * self.scale)
+        self.images_decoded += 1
+        return CursorSprite(image, (hot_x, hot_y))
+
+    def apply(self, frame: np.ndarray, x: int, y: int, sample: CursorSample) -> bool:
+        """
+        Dibuja el cursor sobre `frame` (en el lugar).
+
+        Args:
+            frame: Frame BGR
+            x, y: Posición del punto activo en coordenadas del frame
+            sample: Muestra del puntero (imagen y serie del cursor)
+
+        Returns:
+            True si el cursor cae dentro del frame
+        """
+        return self._sprite_for(sample).blend(frame, x, y)
+
+
+class PointerSource:
+    """Consulta la posición (y, si se puede, la imagen) del puntero."""
+
+    def open(self) -> None:
+        """Abre los recursos (llamar desde el hilo que consultará)."""
+
+    def query(self) -> Optional[CursorSample]:
+        """Retorna la muestra actual o None si el cursor está oculto."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Libera los recursos."""
+
+
+class X11Pointer(PointerSource):
+    """Puntero en X11: XFixes GetCursorImage (posición + imagen) o QueryPointer."""
+
+    def __init__(self, with_image: bool = True, display: Optional[str] = None):
+        """
+        Args:
+            with_image: Obtener la imagen real del cursor con XFixes
+            display: Display de X11 (None usa $DISPLAY)
+        """
+        self.with_image = with_image
+        self.display = display
+        self._conn = None
+        self._root = None
+        self._xfixes = None
+        self._serial: Optional[int] = None
+        self._image: Optional[np.ndarray] = None
+
+    def open(self) -> None:
+        import xcffib
+        import xcffib.xproto
+
+        self._conn = xcffib.connect(display=self.display)
+        self._root = self._conn.get_setup().roots[self._conn.pref_screen].root
+        if self.with_image:
+            try:
+                import xcffib.xfixes
+                self._xfixes = self._conn(xcffib.xfixes.key)
+                self._xfixes.QueryVersion(4, 0).reply()
+            except Exception as e:
+                logger.warning(f"XFixes no disponible, se dibuja una flecha: {e}")
+                self._xfixes = None
+
+    def query(self) -> Optional[CursorSample]:
+        if self._conn is None:
+            self.open()
+        if self._xfixes is None:
+            reply = self._conn.core.QueryPointer(self._root).reply()
+            return CursorSample(reply.root_x, reply.root_y)
+
+        reply = self._xfixes.GetCursorImage().reply()
+        if reply.width == 0 or reply.height == 0:
+            return None
+        if reply.cursor_serial != self._serial:
+            # ARGB premultiplicado en palabras de 32 bits: en memoria, BGRA
+            pixels = np.frombuffer(reply.cursor_image.buf(), dtype=np.uint32)
+            self._image = pixels.view(np.uint8).reshape(reply.height, reply.width, 4).copy()
+            self._serial = reply.cursor_serial
+        return CursorSample(reply.x, reply.y, self._serial, self._image, (reply.xhot, reply.yhot))
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.disconnect()
+            self._conn = None
+            self._xfixes = None
+
+
+class Win32Pointer(PointerSource):
+    """Puntero en Windows con GetCursorInfo (sin imagen: se dibuja una flecha)."""
+
+    _CURSOR_SHOWING = 0x1
+
+    def __init__(self):
+        self._info = None
+        self._info_ref = None
+        self._get_cursor_info = None
+
+    def open(self) -> None:
+        import ctypes
+        from ctypes import wintypes
+
+        class CURSORINFO(ctypes.Structure):
+            _fields_ = [
+                ("cbSize", wintypes.DWORD),
+                ("flags", wintypes.DWORD),
+                ("hCursor", wintypes.HANDLE),
+                ("ptScreenPos", wintypes.POINT),
+            ]
+
+        self._info = CURSORINFO()
+        self._info.cbSize = ctypes.sizeof(CURSORINFO)
+        self._info_ref = ctypes.byref(self._info)
+        self._get_cursor_info = ctypes.windll.user32.GetCursorInfo
+
+    def query(self) -> Optional[CursorSample]:
+        if self._info is None:
+            self.open()
+        if not self._get_cursor_info(self._info_ref) or not self._info.flags & self._CURSOR_SHOWING:
+            return None
+        return CursorSample(self._info.ptScreenPos.x, self._info.ptScreenPos.y)
+
+
+def create_pointer_source(style: str = CursorStyle.DEFAULT) -> Optional[PointerSource]:
+    """
+    Crea la fuente del puntero de esta plataforma.
+
+    Args:
+        style: Solo el estilo predeterminado necesita la imagen real del cursor
+
+    Returns:
+        PointerSource o None si no se puede consultar el puntero
+    """
+    if os.name == 'nt':
+        return Win32Pointer()
+    if os.environ.get("DISPLAY"):
+        try:
+            import xcffib  # noqa: F401
+            return X11Pointer(with_image=style == CursorStyle.DEFAULT)
+        except ImportError:
+            logger.warning("xcffib no está instalado; no se dibujará el cursor")
+            return None
+    logger.info("Sin sesión X11 ni Windows; no se dibujará el cursor")
+    return None
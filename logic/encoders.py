@@ -0,0 +1,276 @@
+"""
+Escritores de video usados por la etapa de codificación.
+
+Todos reciben frames BGR con el índice de slot asignado por el planificador.
+Un slot sin frame (captura tardía, descarte en cola o pantalla estática)
+significa que la imagen no cambió respecto al frame anterior:
+- XvidFrameWriter: archivo temporal XVID con OpenCV (ruta en dos fases);
+  rellena los slots vacíos repitiendo el frame anterior (frame rate constante).
+- LiveEncoder: H.264 + AAC con PyAV directamente en el contenedor final;
+  usa el índice de slot como pts, así que no necesita duplicar frames.
+"""
+
+import logging
+from fractions import Fraction
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Contenedores que admiten escritura fragmentada (moov vacío + moof por fragmento)
+FRAGMENTABLE_FORMATS = (".mp4", ".mov")
+
+
+class FrameWriter:
+    """Interfaz común de los escritores de frames."""
+
+    # Guarda una copia del último frame para rellenar slots vacíos y el final;
+    # los escritores que delegan en otro escritor no la necesitan
+    KEEPS_LAST_FRAME = True
+
+    def __init__(self, path: str, width: int, height: int, fps: float):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frames_written = 0
+        self.duplicated_frames = 0
+        self.next_slot = 0
+        self._last_frame: Optional[np.ndarray] = None
+
+    def write_frame(self, frame: np.ndarray, index: int) -> None:
+        """
+        Escribe un frame en su slot.
+
+        Args:
+            frame: Frame BGR (alto, ancho, 3)
+            index: Índice de slot; los frames fuera de orden se ignoran
+        """
+        if index < self.next_slot:
+            return
+        self._write(frame, index)
+        self.next_slot = index + 1
+        if self.KEEPS_LAST_FRAME:
+            self._remember(frame)
+
+    def _remember(self, frame: np.ndarray) -> None:
+        # El frame es un buffer del pool que se reutiliza en cuanto se devuelve:
+        # repetirlo más tarde requiere una copia propia del escritor
+        if self._last_frame is None or self._last_frame.shape != frame.shape:
+            self._last_frame = np.empty_like(frame)
+        np.copyto(self._last_frame, frame)
+
+    def write(self, frame: np.ndarray) -> None:
+        """Escribe un frame en el siguiente slot."""
+        self.write_frame(frame, self.next_slot)
+
+    def finish(self, final_slot: Optional[int] = None) -> None:
+        """
+        Completa el video hasta `final_slot` con el último frame.
+
+        Debe llamarse desde el hilo que escribe los frames y antes de close().
+        """
+        if final_slot is None or self._last_frame is None or final_slot <= self.next_slot:
+            return
+        self._pad(self._last_frame, final_slot)
+        self.next_slot = final_slot
+
+    def close(self) -> None:
+        """Vacía y cierra el archivo."""
+
+    def release(self) -> None:
+        """Alias de close() compatible con cv2.VideoWriter."""
+        self.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "written_frames": self.frames_written,
+            "duplicated_frames": self.duplicated_frames,
+        }
+
+    def _write(self, frame: np.ndarray, index: int) -> None:
+        raise NotImplementedError
+
+    def _pad(self, frame: np.ndarray, final_slot: int) -> None:
+        raise NotImplementedError
+
+
+class XvidFrameWriter(FrameWriter):
+    """Escritor XVID con OpenCV para el archivo temporal de la ruta en dos fases."""
+
+    def __init__(self, path: str, width: int, height: int, fps: float):
+        super().__init__(path, width, height, fps)
+        fourcc = cv2.VideoWriter_fourcc(*'XVID')
+        self._writer = cv2.VideoWriter(path, fourcc, fps, (width, height))
+
+    def isOpened(self) -> bool:
+        return self._writer is not None and self._writer.isOpened()
+
+    def _write(self, frame: np.ndarray, index: int) -> None:
+        # Los slots vacíos repiten el frame anterior (o este, si es el primero)
+        gap = index - self.next_slot
+        if gap > 0:
+            previous = self._last_frame if self._last_frame is not None else frame
+            for _ in range(gap):
+                self._writer.write(previous)
+            self.frames_written += gap
+            self.duplicated_frames += gap
+        self._writer.write(frame)
+        self.frames_written += 1
+
+    def _pad(self, frame: np.ndarray, final_slot: int) -> None:
+        padding = final_slot - self.next_slot
+        for _ in range(padding):
+            self._writer.write(frame)
+        self.frames_written += padding
+        self.duplicated_frames += padding
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+
+
+class LiveEncoder(FrameWriter):
+    """
+    Codifica H.264 (y AAC si hay audio) con PyAV y multiplexa en el archivo final.
+
+    El video se escribe desde la etapa de codificación y el audio desde el hilo
+    de audio; ambos comparten el contenedor protegido por un lock.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        width: int,
+        height: int,
+        fps: float,
+        sample_rate: Optional[int] = None,
+        channels: Optional[int] = None,
+        video_options: Optional[Dict[str, str]] = None,
+        fragmented: bool = False
+    ):
+        """
+        Args:
+            path: Ruta del archivo final (el contenedor se deduce de la extensión)
+            width, height: Dimensiones del video
+            fps: Frames por segundo
+            sample_rate: Frecuencia del audio (None = sin audio)
+            channels: Canales del audio
+            video_options: Opciones de libx264 (preset, crf...)
+            fragmented: En MP4/MOV, escribir fragmentos en cada keyframe para
+                que el archivo siga siendo reproducible si se interrumpe
+        """
+        import av
+
+        super().__init__(path, width, height, fps)
+        self._lock = Lock()
+        container_options = {}
+        fragmented = fragmented and Path(path).suffix.lower() in FRAGMENTABLE_FORMATS
+        if fragmented:
+            container_options['movflags'] = 'frag_keyframe+empty_moov+default_base_moof'
+        self._container = av.open(path, 'w', options=container_options)
+
+        rate = Fraction(fps).limit_denominator(1001)
+        self._video = self._container.add_stream('h264', rate=rate)
+        self._video.width = width
+        self._video.height = height
+        self._video.pix_fmt = 'yuv420p'
+        self._video.time_base = 1 / rate
+        options = dict(video_options or {'preset': 'veryfast', 'crf': '23'})
+        if fragmented:
+            # Un keyframe (y un fragmento) cada 2 s: es lo máximo que se pierde
+            options.setdefault('g', str(max(1, int(round(fps * 2)))))
+        self._video.options = options
+
+        self._audio = None
+        if sample_rate and channels:
+            layout = 'mono' if channels == 1 else 'stereo'
+            self._audio = self._container.add_stream('aac', rate=sample_rate)
+            self._audio.layout = layout
+            self._audio.bit_rate = 192000
+            self._audio_layout = layout
+            self._audio_channels = channels
+            self._audio_rate = sample_rate
+            self._resampler = av.AudioResampler(format='fltp', layout=layout, rate=sample_rate)
+            self._fifo = av.AudioFifo()
+            self._audio_pts = 0
+        logger.info(f"Codificación en vivo: {path} ({width}x{height} @ {fps} FPS, audio: {bool(self._audio)})")
+
+    def _encode_video(self, frame: np.ndarray, pts: int) -> None:
+        import av
+
+        video_frame = av.VideoFrame.from_ndarray(frame, format='bgr24')
+        video_frame.pts = pts
+        packets = self._video.encode(video_frame)
+        with self._lock:
+            for packet in packets:
+                self._container.mux(packet)
+        self.frames_written += 1
+
+    def _write(self, frame: np.ndarray, index: int) -> None:
+        self._encode_video(frame, index)
+
+    def _pad(self, frame: np.ndarray, final_slot: int) -> None:
+        # Un solo frame en el último slot basta para fijar la duración
+        self._encode_video(frame, final_slot - 1)
+        self.duplicated_frames += 1
+
+    def write_audio(self, data: bytes) -> None:
+        """
+        Codifica un bloque de audio PCM de 16 bits intercalado.
+
+        Args:
+            data: Muestras int16 intercaladas por canal
+        """
+        if self._audio is None or self._container is None or not data:
+            return
+        import av
+
+        samples = np.frombuffer(data, dtype=np.int16)
+        if self._audio_channels > 2:
+            # AAC estéreo: conservar los dos primeros canales
+            samples = samples.reshape(-1, self._audio_channels)[:, :2].reshape(-1)
+        audio_frame = av.AudioFrame.from_ndarray(
+            samples.reshape(1, -1), format='s16', layout=self._audio_layout
+        )
+        audio_frame.sample_rate = self._audio_rate
+
+        for resampled in self._resampler.resample(audio_frame):
+            resampled.pts = None
+            self._fifo.write(resampled)
+        self._encode_fifo(flush=False)
+
+    def _encode_fifo(self, flush: bool) -> None:
+        frame_size = self._audio.codec_context.frame_size or 1024
+        while self._fifo.samples >= frame_size or (flush and self._fifo.samples > 0):
+            chunk = self._fifo.read(min(frame_size, self._fifo.samples))
+            chunk.pts = self._audio_pts
+            self._audio_pts += chunk.samples
+            packets = self._audio.encode(chunk)
+            with self._lock:
+                for packet in packets:
+                    self._container.mux(packet)
+
+    def close(self) -> None:
+        if self._container is None:
+            return
+        try:
+            if self._audio is not None:
+                self._encode_fifo(flush=True)
+                remaining = self._audio.encode(None)
+                with self._lock:
+                    for packet in remaining:
+                        self._container.mux(packet)
+            remaining = self._video.encode(None)
+            with self._lock:
+                for packet in remaining:
+                    self._container.mux(packet)
+        finally:
+            self._container.close()
+            self._container = None
+            logger.info(f"Codificación en vivo finalizada: {self.path} ({self.frames_written} frames)")
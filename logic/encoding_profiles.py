@@ -0,0 +1,116 @@
+"""
+Perfiles de control de tasa para x264.
+
+El control deslizante de calidad (1-100) se traduce a CRF y el modo de
+velocidad (`recording.speed_mode`) elige el preset y el tune: más tiempo de
+CPU por frame da archivos más pequeños con la misma calidad visual. El mismo
+perfil se usa en la codificación en vivo (PyAV), en la combinación con PyAV y
+en la de FFmpeg.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# CRF para calidad 100 y límite inferior de calidad (valores mayores = peor)
+CRF_BEST = 17
+CRF_WORST = 40
+# Pendiente del mapeo: calidad 85 (valor por defecto) -> CRF 23
+_CRF_PER_QUALITY = 0.33
+
+
+class SpeedMode:
+    """Compromisos entre tiempo de CPU y tamaño de archivo."""
+    REALTIME = "realtime"    # Mínima carga de CPU, archivos más grandes
+    BALANCED = "balanced"    # Comportamiento por defecto
+    ARCHIVAL = "archival"    # Más CPU al combinar para archivos más pequeños
+
+    ALL = (REALTIME, BALANCED, ARCHIVAL)
+
+
+# Preset por modo: (codificación en vivo, combinación después de grabar).
+# En vivo el codificador tiene que seguir el ritmo de la captura, así que
+# nunca usa presets lentos aunque el modo sea de archivo.
+_PRESETS = {
+    SpeedMode.REALTIME: ("ultrafast", "veryfast"),
+    SpeedMode.BALANCED: ("veryfast", "fast"),
+    SpeedMode.ARCHIVAL: ("faster", "slow"),
+}
+
+# zerolatency desactiva lookahead y B-frames (menos latencia y memoria en vivo);
+# animation favorece zonas planas y bordes nítidos, típicos de una pantalla
+_TUNES = {
+    SpeedMode.REALTIME: "zerolatency",
+    SpeedMode.BALANCED: None,
+    SpeedMode.ARCHIVAL: "animation",
+}
+
+
+class EncodingProfile:
+    """Parámetros de libx264 para una calidad y un modo de velocidad."""
+
+    def __init__(self, crf: int, preset: str, tune: Optional[str] = None):
+        """
+        Args:
+            crf: Factor de calidad constante (0-51, menor = mejor)
+            preset: Preset de velocidad de x264
+            tune: Ajuste de x264 (None = sin tune)
+        """
+        self.crf = crf
+        self.preset = preset
+        self.tune = tune
+
+    def x264_options(self) -> Dict[str, str]:
+        """Opciones para un stream de PyAV (`stream.options`)."""
+        options = {'preset': self.preset, 'crf': str(self.crf)}
+        if self.tune:
+            options['tune'] = self.tune
+        return options
+
+    def ffmpeg_args(self) -> List[str]:
+        """Argumentos equivalentes para la línea de comandos de FFmpeg."""
+        args = ['-preset', self.preset, '-crf', str(self.crf)]
+        if self.tune:
+            args += ['-tune', self.tune]
+        return args
+
+    def __repr__(self) -> str:
+        return f"EncodingProfile(crf={self.crf}, preset={self.preset}, tune={self.tune})"
+
+
+def quality_to_crf(quality: int) -> int:
+    """
+    Convierte la calidad de la interfaz (1-100) en CRF.
+
+    Args:
+        quality: Calidad (1-100)
+
+    Returns:
+        CRF entre CRF_BEST y CRF_WORST
+    """
+    quality = max(1, min(100, int(quality)))
+    return max(CRF_BEST, min(CRF_WORST, round(51 - _CRF_PER_QUALITY * quality)))
+
+
+def encoding_profile(quality: int = 85, speed_mode: str = SpeedMode.BALANCED, live: bool = False) -> EncodingProfile:
+    """
+    Perfil de x264 para una calidad y un modo de velocidad.
+
+    Args:
+        quality: Calidad de la interfaz (1-100)
+        speed_mode: Modo de velocidad (SpeedMode)
+        live: True para la codificación durante la captura
+
+    Returns:
+        Perfil con CRF, preset y tune
+    """
+    if speed_mode not in _PRESETS:
+        logger.warning(f"Modo de velocidad desconocido '{speed_mode}', usando '{SpeedMode.BALANCED}'")
+        speed_mode = SpeedMode.BALANCED
+    live_preset, offline_preset = _PRESETS[speed_mode]
+    tune = _TUNES[speed_mode]
+    if not live and tune == "zerolatency":
+        # Sin requisitos de latencia al combinar: conservar lookahead y B-frames
+        tune = None
+    return EncodingProfile(quality_to_crf(quality), live_preset if live else offline_preset, tune)
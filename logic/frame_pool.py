@@ -0,0 +1,65 @@
+"""
+Pool de buffers de frame preasignados.
+
+Evita reservar un array nuevo por frame: las etapas escriben en buffers de
+un anillo fijo que se reutiliza de forma circular.
+"""
+
+import logging
+from typing import Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class FramePool:
+    """
+    Anillo de buffers reutilizables.
+
+    El anillo debe tener al menos tantos buffers como frames puedan estar
+    vivos a la vez (capacidad de las colas + uno en curso por etapa); un
+    buffer se reutiliza `count` adquisiciones después de entregarse.
+    """
+
+    def __init__(self, shape: Tuple[int, ...], count: int, dtype=np.uint8):
+        """
+        Args:
+            shape: Forma de cada buffer, p. ej. (alto, ancho, 3)
+            count: Número de buffers del anillo
+            dtype: Tipo de dato de los buffers
+        """
+        self.shape = tuple(shape)
+        self.count = max(1, int(count))
+        self.dtype = dtype
+        self._buffers = [np.empty(self.shape, dtype=dtype) for _ in range(self.count)]
+        self._next = 0
+        logger.info(
+            f"Pool de frames: {self.count} buffers de {self.shape} "
+            f"({self.nbytes() / (1024 * 1024):.1f} MB en total)"
+        )
+
+    def acquire(self) -> np.ndarray:
+        """Retorna el siguiente buffer del anillo."""
+        buffer = self._buffers[self._next]
+        self._next = (self._next + 1) % self.count
+        return buffer
+
+    def nbytes(self) -> int:
+        """Memoria total reservada por el pool."""
+        return sum(buffer.nbytes for buffer in self._buffers)
+
+
+def bgra_to_bgr(src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """
+    Convierte BGRA a BGR escribiendo en un buffer del llamador.
+
+    Args:
+        src: Frame BGRA (alto, ancho, 4)
+        dst: Buffer destino (alto, ancho, 3) uint8
+
+    Returns:
+        El propio `dst`
+    """
+    return cv2.cvtColor(src, cv2.COLOR_BGRA2BGR, dst=dst)
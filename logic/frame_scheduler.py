@@ -0,0 +1,137 @@
+"""
+Planificador de frames con plazos absolutos sobre el reloj monotónico.
+
+Cada frame tiene un slot fijo (origen + n / fps). Si la captura llega tarde
+se salta a slot actual y los slots perdidos se rellenan duplicando frames en
+la etapa de codificación, de modo que el video final sea de frame rate
+constante y dure lo mismo que el tiempo real grabado.
+"""
+
+import os
+import time
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class FrameScheduler:
+    """Entrega el índice del siguiente slot de frame esperando hasta su plazo."""
+
+    def __init__(self, fps: float, spin_threshold: float = 0.002):
+        """
+        Args:
+            fps: Frames por segundo objetivo
+            spin_threshold: Margen final (s) que se espera cediendo el hilo en
+                lugar de dormir, para compensar la granularidad de sleep()
+        """
+        self.fps = float(fps)
+        self.period = 1.0 / self.fps
+        self.spin_threshold = spin_threshold
+        self._origin: Optional[float] = None
+        self._next_slot = 0
+        self._pause_started: Optional[float] = None
+        self._timer_resolution_set = False
+
+        # Estadísticas
+        self.frames = 0
+        self.late_frames = 0
+        self.skipped_slots = 0
+        self.max_lateness = 0.0
+        self.total_lateness = 0.0
+
+    def start(self, origin: Optional[float] = None) -> None:
+        """
+        Fija el origen de tiempos; el slot 0 vence inmediatamente.
+
+        Args:
+            origin: Origen compartido con otros planificadores (perf_counter),
+                para que el mismo slot sea el mismo instante en todos
+        """
+        self._set_timer_resolution(True)
+        self._origin = origin if origin is not None else time.perf_counter()
+        self._next_slot = 0
+        self._pause_started = None
+
+    def stop(self) -> None:
+        """Restaura la resolución del temporizador del sistema."""
+        self._set_timer_resolution(False)
+
+    def pause(self) -> None:
+        """Congela el reloj de slots."""
+        if self._pause_started is None:
+            self._pause_started = time.perf_counter()
+
+    def resume(self) -> None:
+        """Reanuda desplazando el origen lo que duró la pausa."""
+        if self._pause_started is not None and self._origin is not None:
+            self._origin += time.perf_counter() - self._pause_started
+            self._pause_started = None
+
+    def wait_next(self) -> int:
+        """
+        Espera hasta el plazo del siguiente slot.
+
+        Returns:
+            Índice del slot al que corresponde el frame que se va a capturar
+        """
+        if self._origin is None:
+            self.start()
+
+        deadline = self._origin + self._next_slot * self.period
+        now = time.perf_counter()
+        remaining = deadline - now
+
+        if remaining > 0:
+            if remaining > self.spin_threshold:
+                time.sleep(remaining - self.spin_threshold)
+            while time.perf_counter() < deadline:
+                time.sleep(0)
+            slot = self._next_slot
+        else:
+            # Llegamos tarde: saltar al slot vigente y contar los perdidos
+            slot = max(self._next_slot, int((now - self._origin) / self.period))
+            lateness = -remaining
+            if lateness > self.period * 0.5:
+                self.late_frames += 1
+            self.skipped_slots += slot - self._next_slot
+            self.max_lateness = max(self.max_lateness, lateness)
+            self.total_lateness += lateness
+
+        self._next_slot = slot + 1
+        self.frames += 1
+        return slot
+
+    def current_slot(self) -> int:
+        """Retorna el slot que corresponde al instante actual (excluye pausas)."""
+        if self._origin is None:
+            return 0
+        now = self._pause_started if self._pause_started is not None else time.perf_counter()
+        return max(0, int((now - self._origin) / self.period))
+
+    def get_stats(self) -> Dict[str, float]:
+        """Retorna estadísticas de puntualidad."""
+        return {
+            "fps": self.fps,
+            "frames": self.frames,
+            "slots": self._next_slot,
+            "late_frames": self.late_frames,
+            "skipped_slots": self.skipped_slots,
+            "max_lateness_ms": round(self.max_lateness * 1000, 2),
+            "mean_lateness_ms": round(self.total_lateness * 1000 / self.frames, 2) if self.frames else 0.0,
+        }
+
+    def _set_timer_resolution(self, enable: bool) -> None:
+        """En Windows pide resolución de 1 ms al temporizador para que sleep() sea preciso."""
+        if os.name != 'nt' or enable == self._timer_resolution_set:
+            return
+        try:
+            import ctypes
+            winmm = ctypes.windll.winmm
+            if enable:
+                winmm.timeBeginPeriod(1)
+            else:
+                winmm.timeEndPeriod(1)
+            self._timer_resolution_set = enable
+        except Exception as e:
+            logger.debug(f"No se pudo ajustar la resolución del temporizador: {e}")
@@ -0,0 +1,677 @@
+"""
+Cola de trabajos de postprocesamiento.
+
+Combinar audio y video, unir segmentos o recuperar grabaciones se encola como
+trabajo en lugar de lanzar un hilo por grabación. Un número configurable de
+trabajos corre a la vez, cada uno en su propio proceso para que la
+codificación no compita por el GIL con la interfaz. Cada trabajo tiene
+prioridad, progreso, tiempo estimado restante y puede cancelarse; la cola se
+guarda en JSON y los trabajos pendientes se retoman al reiniciar.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import shutil
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, List, Optional
+
+from .progress import ProcessingCancelled
+
+logger = logging.getLogger(__name__)
+
+# Segundos de gracia tras pedir la cancelación antes de terminar el proceso
+_CANCEL_GRACE = 5.0
+# Intervalo mínimo entre escrituras del archivo de la cola por progreso
+_PERSIST_INTERVAL = 2.0
+# Trabajos terminados que se conservan en el historial
+_HISTORY_SIZE = 50
+
+
+class JobStatus:
+    """Estados de un trabajo."""
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class JobKind:
+    """Tipos de trabajo."""
+    COMBINE = "combine"              # Video temporal + WAV -> archivo final
+    FINALIZE_LIVE = "finalize_live"  # Mover o unir la salida de la codificación en vivo
+    RECOVER = "recover"              # Recuperar temporales de una grabación interrumpida
+
+
+class JobPriority:
+    """Prioridades habituales (mayor = antes)."""
+    LOW = 0
+    NORMAL = 10
+    HIGH = 20
+
+
+class PostProcessJob:
+    """Trabajo de postprocesamiento y su estado."""
+
+    def __init__(
+        self,
+        kind: str,
+        params: Dict[str, Any],
+        priority: int = JobPriority.NORMAL,
+        description: str = ""
+    ):
+        """
+        Args:
+            kind: Tipo de trabajo (JobKind)
+            params: Parámetros serializables en JSON
+            priority: Prioridad (mayor = antes)
+            description: Texto para la interfaz
+        """
+        self.id = uuid.uuid4().hex[:8]
+        self.kind = kind
+        self.params = params
+        self.priority = priority
+        self.description = description or kind
+        self.status = JobStatus.PENDING
+        self.progress = 0.0
+        self.eta: Optional[float] = None
+        self.fps: Optional[float] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.result: Dict[str, Any] = {}
+
+    def update_progress(self, fraction: float, eta: Optional[float] = None, fps: Optional[float] = None) -> None:
+        """
+        Actualiza el progreso del trabajo.
+
+        Args:
+            fraction: Progreso entre 0 y 1
+            eta: Segundos restantes informados por la tarea (None = estimar por tiempo)
+            fps: FPS de codificación informados por la tarea
+        """
+        self.progress = max(0.0, min(1.0, fraction))
+        self.fps = fps
+        if eta is not None:
+            self.eta = eta
+        elif self.started_at and 0 < self.progress < 1:
+            elapsed = time.time() - self.started_at
+            self.eta = elapsed * (1 - self.progress) / self.progress
+        elif self.progress >= 1:
+            self.eta = 0.0
+
+    def format_status(self) -> str:
+        """Resumen de una línea para la interfaz."""
+        text = f"[{self.id}] {self.description}: {self.status}"
+        if self.status == JobStatus.RUNNING:
+            text += f" {self.progress * 100:.0f}%"
+            if self.fps:
+                text += f" {self.fps:.0f} fps"
+            if self.eta is not None:
+                minutes, seconds = divmod(int(self.eta), 60)
+                text += f" (quedan {minutes:02d}:{seconds:02d})"
+        elif self.status == JobStatus.FAILED and self.error:
+            text += f" - {self.error}"
+        elif self.status == JobStatus.DONE and self.result.get("output"):
+            text += f" -> {self.result['output']}"
+        return text
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PostProcessJob":
+        job = cls(data["kind"], data.get("params", {}))
+        job.__dict__.update(data)
+        return job
+
+
+def build_finalize_job(
+    video_path: str,
+    audio_path: str,
+    output_dir: str = "grabaciones",
+    filename: str = "grabacion",
+    video_format: str = ".mp4",
+    quality: int = 85,
+    already_muxed: bool = False,
+    segments: Optional[List[str]] = None,
+    session_stats: Optional[Dict[str, Any]] = None,
+    monitor_videos: Optional[List[str]] = None
+) -> PostProcessJob:
+    """
+    Crea el trabajo que convierte los temporales de una grabación en el archivo final.
+
+    Args:
+        video_path: Video temporal (o salida de la codificación en vivo)
+        audio_path: WAV temporal (no se usa si `already_muxed`)
+        output_dir: Carpeta de las grabaciones finales
+        filename: Prefijo del nombre final
+        video_format: Contenedor final
+        quality: Calidad de la recodificación
+        already_muxed: La codificación en vivo ya escribió video y audio
+        segments: Segmentos de la codificación en vivo
+        session_stats: Resumen de la sesión para el archivo de estadísticas
+        monitor_videos: Temporales de los monitores adicionales (un archivo por monitor)
+
+    Returns:
+        Trabajo listo para encolar o ejecutar con `run_job`
+    """
+    recordings_dir = Path(output_dir)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = filename or "grabacion"
+    output_path = str(recordings_dir / f"{filename}_{timestamp}{video_format}")
+
+    params = {
+        "video_path": video_path,
+        "output_path": output_path,
+        "session_stats": session_stats or {},
+        "monitors": [
+            {
+                "video_path": path,
+                "output_path": str(recordings_dir / f"{filename}_{timestamp}_mon{i}{video_format}"),
+            }
+            for i, path in enumerate(monitor_videos or [], start=2)
+        ],
+    }
+    # Codificación en vivo: el archivo (o sus segmentos) ya tiene video y audio
+    if already_muxed:
+        kind = JobKind.FINALIZE_LIVE
+        params["segments"] = segments or []
+    else:
+        kind = JobKind.COMBINE
+        params.update(audio_path=audio_path, video_format=video_format, quality=quality)
+
+    return PostProcessJob(kind, params, JobPriority.NORMAL, description=Path(output_path).name)
+
+
+def _configure_child_logging(log_file: Optional[str]) -> None:
+    if log_file:
+        logging.basicConfig(
+            filename=log_file,
+            filemode='a',
+            level=logging.DEBUG,
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            encoding='utf-8'
+        )
+
+
+def _job_process(job_data: Dict[str, Any], config_file: str, log_file: Optional[str], events, cancel_event) -> None:
+    """Proceso de un trabajo: lo ejecuta y comunica progreso y resultado."""
+    _configure_child_logging(log_file)
+    job_id = job_data["id"]
+
+    def progress(report: Dict[str, Any]) -> None:
+        if cancel_event.is_set():
+            raise ProcessingCancelled(job_id)
+        events.put(("progress", job_id, report))
+
+    try:
+        result = run_job(job_data["kind"], job_data["params"], config_file, progress)
+        events.put(("done", job_id, result))
+    except ProcessingCancelled:
+        events.put(("cancelled", job_id, None))
+    except Exception as e:
+        logger.error(f"Error en trabajo {job_id}: {e}", exc_info=True)
+        events.put(("failed", job_id, f"{type(e).__name__}: {e}"))
+
+
+def run_job(
+    kind: str,
+    params: Dict[str, Any],
+    config_file: str = "config.json",
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Ejecuta un trabajo en el proceso actual.
+
+    Args:
+        kind: Tipo de trabajo (JobKind)
+        params: Parámetros del trabajo
+        config_file: Archivo de configuración a usar
+        progress: Recibe reportes {"fraction", "eta", "fps", ...}; puede lanzar
+            ProcessingCancelled para cancelar
+
+    Returns:
+        Resultado del trabajo ({"output": ruta, ...})
+
+    Raises:
+        RuntimeError: Si el trabajo falla
+    """
+    from .config_manager import ConfigManager
+    from .recorder import ScreenRecorder
+    from .recording_stats import stats_path_for, write_stats_file
+
+    progress = progress or (lambda report: None)
+    recorder = ScreenRecorder(None, None, ConfigManager(config_file))
+    recorder.quality = params.get("quality", recorder.quality)
+
+    # Con un archivo por monitor cada uno es una parte del progreso total
+    monitors = params.get("monitors", []) if kind != JobKind.RECOVER else []
+    parts = 1 + len(monitors)
+
+    def combine_progress(part: int) -> Callable[[Dict[str, Any]], None]:
+        def on_combine_progress(report: Dict[str, Any]) -> None:
+            # Sin total conocido solo se informan FPS y frames
+            progress(dict(report, fraction=(part + (report["fraction"] or 0.0)) / parts))
+        return on_combine_progress
+
+    recorder.progress_callback = combine_progress(0)
+    progress({"fraction": 0.0})
+
+    if kind == JobKind.COMBINE:
+        # El WAV se comparte entre monitores: se borra con el último
+        output = _run_combine(recorder, params, keep_audio=bool(monitors))
+    elif kind == JobKind.FINALIZE_LIVE:
+        output = _run_finalize_live(recorder, params["video_path"], params["output_path"], params.get("segments", []))
+    elif kind == JobKind.RECOVER:
+        from .recovery import OrphanedRecording, recover_recording
+        orphan = OrphanedRecording(params["key"])
+        orphan.video_paths = list(params["video_paths"])
+        orphan.audio_path = params.get("audio_path")
+        output = recover_recording(orphan, recorder, params.get("output_dir", "grabaciones"),
+                                   params.get("video_format", ".mp4"))
+        if not output:
+            raise RuntimeError("No se pudo recuperar la grabación")
+    else:
+        raise RuntimeError(f"Tipo de trabajo desconocido: {kind}")
+
+    outputs = [output]
+    for part, monitor in enumerate(monitors, start=1):
+        recorder.progress_callback = combine_progress(part)
+        if kind == JobKind.COMBINE:
+            monitor_params = dict(params, video_path=monitor["video_path"], output_path=monitor["output_path"])
+            outputs.append(_run_combine(recorder, monitor_params, keep_audio=part < len(monitors)))
+        else:
+            outputs.append(_run_finalize_live(recorder, monitor["video_path"], monitor["output_path"]))
+
+    result = {"output": output, "finalize": recorder.last_combine_report}
+    if monitors:
+        result["outputs"] = outputs
+    session_stats = params.get("session_stats")
+    if session_stats:
+        data = dict(session_stats)
+        data["output"] = output
+        if recorder.last_combine_report:
+            data["finalize"] = recorder.last_combine_report
+        stats_path = stats_path_for(output)
+        if write_stats_file(stats_path, data):
+            result["stats"] = stats_path
+    progress({"fraction": 1.0})
+    return result
+
+
+def _run_finalize_live(recorder, video_path: str, output_path: str, segments: Optional[List[str]] = None) -> str:
+    """
+    Lleva la salida en vivo a su destino; no la rehace si ya llegó.
+
+    `finalize_live_output` crea el archivo final de forma atómica, así que si
+    existe está completo: un trabajo retomado tras interrumpirse después de
+    crearlo (mientras borraba los segmentos, por ejemplo) solo limpia los
+    temporales que quedaron.
+
+    Returns:
+        Ruta del archivo final
+    """
+    if os.path.exists(output_path):
+        leftovers = [p for p in (segments or [video_path]) if os.path.exists(p)]
+        for path in leftovers:
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"No se pudo eliminar el temporal {path}: {e}")
+        logger.info(f"{output_path} ya estaba finalizado; {len(leftovers)} temporales eliminados")
+        return output_path
+    recorder.segment_paths = list(segments or [])
+    return recorder.finalize_live_output(video_path, output_path)
+
+
+def _run_combine(recorder, params: Dict[str, Any], keep_audio: bool = False) -> str:
+    """
+    Combina video y audio; si falla conserva al menos el video.
+
+    Args:
+        recorder: ScreenRecorder del trabajo
+        params: Parámetros del trabajo (video_path, audio_path, output_path...)
+        keep_audio: No borra el WAV (lo usa otro monitor de la misma sesión)
+
+    Returns:
+        Ruta del archivo final
+    """
+    video_path = params["video_path"]
+    audio_path = params.get("audio_path", "")
+    output_path = params["output_path"]
+    video_format = params.get("video_format", ".mp4")
+    cleanup_audio = "" if keep_audio else audio_path
+
+    if recorder.combine_audio_video(video_path, audio_path, output_path, video_format):
+        recorder.cleanup_temp_files(video_path, cleanup_audio)
+        return output_path
+
+    fallback = str(Path(output_path).with_name(f"{Path(output_path).stem}_video{video_format}"))
+    shutil.copy(video_path, fallback)
+    recorder.cleanup_temp_files(video_path, cleanup_audio)
+    logger.warning(f"Video guardado sin audio: {fallback}")
+    return fallback
+
+
+class JobQueue:
+    """Cola de trabajos con un número limitado de procesos en paralelo."""
+
+    def __init__(
+        self,
+        state_file: str = "grabaciones/jobs.json",
+        workers: int = 1,
+        config_file: str = "config.json",
+        on_update: Optional[Callable[[PostProcessJob], None]] = None
+    ):
+        """
+        Args:
+            state_file: Archivo JSON donde se guarda la cola
+            workers: Trabajos en paralelo
+            config_file: Configuración que usan los procesos
+            on_update: Función llamada (desde el hilo de la cola) al cambiar un trabajo
+        """
+        self.state_file = Path(state_file)
+        self.workers = max(1, workers)
+        self.config_file = config_file
+        self.on_update = on_update
+        self.jobs: Dict[str, PostProcessJob] = {}
+
+        self._lock = Lock()
+        self._context = multiprocessing.get_context("spawn")
+        self._events = self._context.Queue()
+        self._running: Dict[str, Any] = {}        # id -> Process
+        self._cancel_events: Dict[str, Any] = {}  # id -> multiprocessing.Event
+        self._cancel_requested: Dict[str, float] = {}
+        self._stop = Event()
+        self._shutting_down = False
+        self._thread: Optional[Thread] = None
+        self._last_persist = 0.0
+        self._log_file = self._find_log_file()
+
+        self._load()
+
+    @staticmethod
+    def _find_log_file() -> Optional[str]:
+        for handler in logging.getLogger().handlers:
+            if isinstance(handler, logging.FileHandler):
+                return handler.baseFilename
+        return None
+
+    def start(self) -> None:
+        """Inicia el hilo que reparte los trabajos."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="job-queue", daemon=True)
+        self._thread.start()
+        pending = sum(1 for job in self.jobs.values() if job.status == JobStatus.PENDING)
+        logger.info(f"Cola de trabajos iniciada ({self.workers} en paralelo, {pending} pendientes)")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Detiene el reparto y los procesos de los trabajos en curso.
+
+        Los procesos no son daemon (se los mataría a mitad de escritura): se
+        les pide la cancelación cooperativa, que deja los temporales intactos,
+        y si no responden se terminan. Esos trabajos se retoman al reiniciar.
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+        self._shutting_down = True
+        with self._lock:
+            running = dict(self._running)
+            for job_id in running:
+                self._cancel_events[job_id].set()
+        deadline = time.monotonic() + _CANCEL_GRACE
+        for job_id, process in running.items():
+            process.join(timeout=max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(f"El trabajo {job_id} no atendió la cancelación; se termina su proceso")
+                process.terminate()
+                process.join(timeout=2)
+        # Un trabajo pudo terminar justo antes de la cancelación: registrar su resultado
+        self._drain_events()
+        with self._lock:
+            self._running.clear()
+            self._cancel_events.clear()
+            self._cancel_requested.clear()
+        self._shutting_down = False
+        self._persist(force=True)
+
+    def submit(self, job: PostProcessJob) -> str:
+        """
+        Encola un trabajo.
+
+        Returns:
+            Identificador del trabajo
+        """
+        with self._lock:
+            self.jobs[job.id] = job
+        logger.info(f"Trabajo encolado: {job.id} ({job.kind}, prioridad {job.priority})")
+        self._persist(force=True)
+        self._notify(job)
+        return job.id
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancela un trabajo pendiente o en curso.
+
+        Returns:
+            True si el trabajo existía y no había terminado
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.status in JobStatus.FINISHED:
+                return False
+            if job.status == JobStatus.PENDING:
+                job.status = JobStatus.CANCELLED
+                job.finished_at = time.time()
+            else:
+                # Cancelación cooperativa; si no responde se termina el proceso
+                self._cancel_events[job_id].set()
+                self._cancel_requested[job_id] = time.monotonic()
+        logger.info(f"Cancelación solicitada: {job_id}")
+        self._persist(force=True)
+        self._notify(job)
+        return True
+
+    def get_jobs(self) -> List[PostProcessJob]:
+        """Trabajos ordenados: en curso, pendientes por prioridad y terminados."""
+        order = {JobStatus.RUNNING: 0, JobStatus.PENDING: 1}
+        with self._lock:
+            jobs = list(self.jobs.values())
+        return sorted(jobs, key=lambda j: (order.get(j.status, 2), -j.priority, j.created_at))
+
+    def active_paths(self) -> List[str]:
+        """Archivos que usan los trabajos sin terminar (no son temporales huérfanos)."""
+        paths = []
+        with self._lock:
+            for job in self.jobs.values():
+                if job.status in JobStatus.FINISHED:
+                    continue
+                for key in ("video_path", "audio_path"):
+                    if job.params.get(key):
+                        paths.append(os.path.abspath(job.params[key]))
+                for key in ("segments", "video_paths"):
+                    paths.extend(os.path.abspath(p) for p in job.params.get(key, []))
+        return paths
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._start_pending()
+            try:
+                event, job_id, payload = self._events.get(timeout=0.2)
+                self._handle_event(event, job_id, payload)
+            except queue.Empty:
+                pass
+            # Un proceso deja "progress" y "done" seguidos antes de salir:
+            # atender todo lo recibido antes de revisar los procesos
+            self._drain_events()
+            self._reap()
+
+    def _drain_events(self) -> None:
+        """Atiende todos los eventos ya recibidos sin esperar."""
+        while True:
+            try:
+                event, job_id, payload = self._events.get_nowait()
+            except queue.Empty:
+                return
+            self._handle_event(event, job_id, payload)
+
+    def _start_pending(self) -> None:
+        with self._lock:
+            free = self.workers - len(self._running)
+            if free <= 0:
+                return
+            pending = sorted(
+                (j for j in self.jobs.values() if j.status == JobStatus.PENDING),
+                key=lambda j: (-j.priority, j.created_at)
+            )[:free]
+            for job in pending:
+                cancel_event = self._context.Event()
+                process = self._context.Process(
+                    target=_job_process,
+                    args=(job.to_dict(), self.config_file, self._log_file, self._events, cancel_event),
+                    name=f"job-{job.id}"
+                )
+                process.start()
+                job.status = JobStatus.RUNNING
+                job.started_at = time.time()
+                job.progress = 0.0
+                job.eta = None
+                self._running[job.id] = process
+                self._cancel_events[job.id] = cancel_event
+                logger.info(f"Trabajo iniciado: {job.id} (pid {process.pid})")
+        for job in pending:
+            self._notify(job)
+        if pending:
+            self._persist(force=True)
+
+    def _handle_event(self, event: str, job_id: str, payload: Any) -> None:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            # Un trabajo terminado no cambia de estado (eventos tardíos o duplicados)
+            if job is None or job.status in JobStatus.FINISHED:
+                return
+            if event == "cancelled" and self._shutting_down and job_id not in self._cancel_requested:
+                # Cancelado por el cierre, no por el usuario: sigue en curso y se retoma
+                return
+            if event == "progress":
+                job.update_progress(payload["fraction"], payload.get("eta"), payload.get("fps"))
+            else:
+                job.finished_at = time.time()
+                if event == "done":
+                    job.status = JobStatus.DONE
+                    job.result = payload or {}
+                    job.update_progress(1.0)
+                elif event == "cancelled":
+                    job.status = JobStatus.CANCELLED
+                else:
+                    job.status = JobStatus.FAILED
+                    job.error = payload
+                logger.info(f"Trabajo {job.id} terminado: {job.status}")
+        self._persist(force=event != "progress")
+        self._notify(job)
+
+    def _reap(self) -> None:
+        """Libera procesos terminados y termina los que no atendieron la cancelación."""
+        exited = []
+        with self._lock:
+            for job_id, process in self._running.items():
+                requested = self._cancel_requested.get(job_id)
+                if process.is_alive() and requested and time.monotonic() - requested > _CANCEL_GRACE:
+                    process.terminate()
+                if not process.is_alive():
+                    exited.append(job_id)
+        if not exited:
+            return
+
+        # Los procesos ya salieron: sus últimos eventos están en la cola y
+        # deben atenderse antes de decidir si terminaron sin avisar
+        self._drain_events()
+
+        finished = []
+        with self._lock:
+            for job_id in exited:
+                process = self._running.pop(job_id)
+                process.join()
+                self._cancel_events.pop(job_id, None)
+                requested = self._cancel_requested.pop(job_id, None)
+                job = self.jobs[job_id]
+                if job.status == JobStatus.RUNNING:
+                    # Terminó sin avisar: por cancelación forzada o por un fallo
+                    job.finished_at = time.time()
+                    if requested:
+                        job.status = JobStatus.CANCELLED
+                    elif process.exitcode == 0:
+                        # Salida normal sin "done"/"failed": error del protocolo, no un cierre inesperado
+                        job.status = JobStatus.FAILED
+                        job.error = "El proceso terminó sin informar el resultado"
+                        logger.error(f"Trabajo {job_id}: el proceso salió con código 0 sin evento final")
+                    else:
+                        job.status = JobStatus.FAILED
+                        job.error = f"El proceso terminó con código {process.exitcode}"
+                    finished.append(job)
+        for job in finished:
+            self._persist(force=True)
+            self._notify(job)
+
+    def _notify(self, job: PostProcessJob) -> None:
+        if self.on_update is not None:
+            try:
+                self.on_update(job)
+            except Exception as e:
+                logger.error(f"Error notificando trabajo {job.id}: {e}")
+
+    def _persist(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_persist < _PERSIST_INTERVAL:
+            return
+        self._last_persist = now
+        with self._lock:
+            jobs = [job.to_dict() for job in self.jobs.values()]
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.state_file.with_suffix(".tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(jobs, f, indent=4, ensure_ascii=False)
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            logger.error(f"Error guardando la cola de trabajos: {e}")
+
+    def _load(self) -> None:
+        """Carga la cola; los trabajos que estaban en curso vuelven a pendientes."""
+        if not self.state_file.exists():
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Error cargando la cola de trabajos: {e}")
+            return
+
+        jobs = [PostProcessJob.from_dict(item) for item in data]
+        finished = sorted((j for j in jobs if j.status in JobStatus.FINISHED), key=lambda j: j.finished_at or 0)
+        for job in jobs:
+            if job.status == JobStatus.RUNNING:
+                job.status = JobStatus.PENDING
+                job.progress = 0.0
+                job.eta = None
+        keep = [j for j in jobs if j.status not in JobStatus.FINISHED] + finished[-_HISTORY_SIZE:]
+        self.jobs = {job.id: job for job in keep}
+        logger.info(f"Cola de trabajos cargada: {len(self.jobs)} trabajos")
@@ -0,0 +1,162 @@
+"""
+Grabación simultánea de varios monitores.
+
+Cada monitor es una fuente de captura con su propio hilo, su propio handle
+del backend (mss, XShm...) y su propio planificador; todos los planificadores
+comparten el mismo origen de tiempos, así que el slot N de cada monitor
+corresponde al mismo instante y las capturas corren en paralelo en lugar de
+serializarse en un único hilo.
+
+Modos (`recording.monitor_mode`):
+- single: solo el monitor seleccionado.
+- separate: un archivo por monitor, cada uno con su pipeline completo.
+- canvas: un único video con los monitores compuestos según su posición en
+  el escritorio virtual.
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .frame_scheduler import FrameScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class MonitorMode:
+    """Modos de captura con varios monitores."""
+    SINGLE = "single"
+    SEPARATE = "separate"
+    CANVAS = "canvas"
+
+    ALL = (SINGLE, SEPARATE, CANVAS)
+
+
+class CaptureSource:
+    """
+    Estado de captura de un monitor (o región).
+
+    El recorder crea una por monitor; el backend se abre dentro del hilo de
+    captura de la fuente porque los handles de mss/XShm no se comparten
+    entre hilos.
+    """
+
+    def __init__(self, index: int, bbox: Dict[str, int], fps: float):
+        """
+        Args:
+            index: Posición de la fuente (0 = principal)
+            bbox: Región a capturar {'left', 'top', 'width', 'height'}
+            fps: FPS objetivo
+        """
+        self.index = index
+        self.bbox = bbox
+        self.scheduler = FrameScheduler(fps)
+        self.grabber = None
+        self.frame_pool = None
+        self.static_detector = None
+        self.output_size: Tuple[int, int] = (bbox['width'], bbox['height'])
+        self.scaler = None
+        self.output_pool = None
+        self.writer = None
+        self.output_path: Optional[str] = None
+        # Seguimiento de ventana (X11): la región cambia durante la grabación
+        self.tracker = None
+        self.fitter = None
+        # Cursor: el puntero se consulta en el hilo de captura y se dibuja al procesar
+        self.pointer = None
+        self.cursor_overlay = None
+        self.last_cursor: Optional[Tuple[int, int, Optional[int]]] = None
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.bbox['width'], self.bbox['height']
+
+    def open(self, backend, origin: Optional[float] = None) -> None:
+        """Asigna el backend del hilo de captura y arranca el reloj de slots."""
+        self.grabber = backend
+        if self.tracker is not None:
+            self.tracker.open()
+        if self.pointer is not None:
+            try:
+                self.pointer.open()
+            except Exception as e:
+                logger.warning(f"No se puede consultar el puntero; se graba sin cursor: {e}")
+                self.pointer = None
+        self.last_cursor = None
+        self.scheduler.start(origin)
+
+    def close(self) -> None:
+        self.scheduler.stop()
+        if self.grabber is not None:
+            self.grabber.close()
+            self.grabber = None
+        if self.tracker is not None:
+            self.tracker.close()
+        if self.pointer is not None:
+            self.pointer.close()
+
+
+def virtual_bbox(bboxes: List[Dict[str, int]]) -> Dict[str, int]:
+    """Rectángulo que contiene a todas las regiones (escritorio virtual)."""
+    left = min(b['left'] for b in bboxes)
+    top = min(b['top'] for b in bboxes)
+    right = max(b['left'] + b['width'] for b in bboxes)
+    bottom = max(b['top'] + b['height'] for b in bboxes)
+    return {'left': left, 'top': top, 'width': right - left, 'height': bottom - top}
+
+
+def canvas_offsets(bboxes: List[Dict[str, int]]) -> List[Tuple[int, int]]:
+    """Posición (x, y) de cada región dentro del lienzo."""
+    canvas = virtual_bbox(bboxes)
+    return [(b['left'] - canvas['left'], b['top'] - canvas['top']) for b in bboxes]
+
+
+def monitor_output_path(path: str, index: int) -> str:
+    """
+    Ruta del archivo de un monitor: `grabacion.mp4` -> `grabacion_mon2.mp4`.
+
+    El monitor principal (índice 0) conserva la ruta original.
+    """
+    if index == 0:
+        return path
+    p = Path(path)
+    return str(p.with_name(f"{p.stem}_mon{index + 1}{p.suffix}"))
+
+
+class CanvasCompositor:
+    """
+    Compone los frames de varios monitores en un lienzo persistente.
+
+    Cada monitor pega su frame en su región; los que no envían frame (pantalla
+    estática o captura tardía) conservan la imagen anterior. Un slot se da
+    por completo cuando llega el primer frame de un slot posterior.
+    """
+
+    def __init__(self, bboxes: List[Dict[str, int]]):
+        """
+        Args:
+            bboxes: Regiones de los monitores, en orden de fuente
+        """
+        canvas = virtual_bbox(bboxes)
+        self.size = (canvas['width'], canvas['height'])
+        # Fondo negro en las zonas del escritorio virtual sin monitor
+        self.canvas = np.zeros((canvas['height'], canvas['width'], 3), dtype=np.uint8)
+        self._regions = [
+            (slice(y, y + b['height']), slice(x, x + b['width']))
+            for (x, y), b in zip(canvas_offsets(bboxes), bboxes)
+        ]
+        self.pending_slot: Optional[int] = None
+        logger.info(f"Lienzo de {len(bboxes)} monitores: {self.size[0]}x{self.size[1]}")
+
+    def paste(self, source: int, frame: np.ndarray, slot: int) -> None:
+        """Copia el frame de un monitor en su región del lienzo."""
+        np.copyto(self.canvas[self._regions[source]], frame)
+        if self.pending_slot is None or slot > self.pending_slot:
+            self.pending_slot = slot
+
+    def take_slot(self) -> Optional[int]:
+        """Retorna el slot pendiente y lo marca como emitido."""
+        slot, self.pending_slot = self.pending_slot, None
+        return slot
@@ -0,0 +1,57 @@
+"""
+Superposición de la cámara web sobre los frames de pantalla.
+
+La región de destino se calcula una vez por sesión y el frame de la cámara
+se redimensiona solo cuando llega uno nuevo (según el número de secuencia
+del lector), sobre un buffer reservado de antemano. Entre frames de cámara,
+superponer cuesta una única copia de la región.
+"""
+
+import logging
+from typing import Optional
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class WebcamOverlay:
+    """Compone la cámara en la esquina superior derecha del frame."""
+
+    def __init__(self, frame_width: int, frame_height: int, scale: int = 6, margin: int = 10):
+        """
+        Args:
+            frame_width, frame_height: Dimensiones del frame de pantalla
+            scale: La cámara ocupa 1/scale del ancho y alto del frame
+            margin: Separación en píxeles desde los bordes superior y derecho
+        """
+        self.width = max(1, frame_width // scale)
+        self.height = max(1, frame_height // scale)
+        x = max(0, frame_width - self.width - margin)
+        y = min(margin, max(0, frame_height - self.height))
+        self.roi = (slice(y, y + self.height), slice(x, x + self.width))
+        self._buffer = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        self._sequence: Optional[int] = None
+        self.resizes = 0
+
+    def apply(self, frame: np.ndarray, sequence: int, camera_frame: Optional[np.ndarray]) -> bool:
+        """
+        Superpone la cámara sobre `frame` (en el lugar).
+
+        Args:
+            frame: Frame BGR de pantalla
+            sequence: Número de secuencia del frame de cámara
+            camera_frame: Último frame de cámara (None si aún no hay)
+
+        Returns:
+            True si se superpuso la cámara
+        """
+        if sequence != self._sequence and camera_frame is not None:
+            cv2.resize(camera_frame, (self.width, self.height), dst=self._buffer, interpolation=cv2.INTER_AREA)
+            self._sequence = sequence
+            self.resizes += 1
+        if self._sequence is None:
+            return False
+        np.copyto(frame[self.roi], self._buffer)
+        return True
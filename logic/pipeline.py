@@ -0,0 +1,294 @@
+"""
+Pipeline de captura por etapas (captura -> procesamiento -> codificación).
+
+Cada etapa corre en su propio hilo y se comunica con la siguiente mediante
+colas acotadas con política de descarte configurable.
+"""
+
+import logging
+from collections import deque
+from threading import Thread, Condition, Event
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DropPolicy:
+    """Políticas de descarte cuando una cola está llena."""
+    BLOCK = "block"              # Bloquear al productor hasta que haya espacio
+    DROP_OLDEST = "drop_oldest"  # Descartar el elemento más antiguo de la cola
+    DROP_NEWEST = "drop_newest"  # Descartar el elemento entrante
+
+    ALL = (BLOCK, DROP_OLDEST, DROP_NEWEST)
+
+
+class CapturedFrame:
+    """Frame en tránsito por el pipeline."""
+
+    def __init__(self, index: int, timestamp: float, frame: Any, source: int = 0, cursor: Any = None):
+        """
+        Args:
+            index: Índice del slot de frame dentro de la sesión
+            timestamp: Instante de captura (reloj monotónico)
+            frame: Imagen capturada
+            source: Monitor de origen (0 = principal)
+            cursor: (x, y, CursorSample) en coordenadas del frame, o None
+        """
+        self.index = index
+        self.timestamp = timestamp
+        self.frame = frame
+        self.source = source
+        self.cursor = cursor
+
+
+class FrameQueue:
+    """Cola acotada entre dos etapas del pipeline."""
+
+    def __init__(self, name: str, maxsize: int = 8, drop_policy: str = DropPolicy.DROP_OLDEST):
+        """
+        Inicializa la cola.
+
+        Args:
+            name: Nombre para diagnóstico
+            maxsize: Capacidad máxima
+            drop_policy: Política de descarte (ver DropPolicy)
+        """
+        if drop_policy not in DropPolicy.ALL:
+            logger.warning(f"Política de descarte desconocida '{drop_policy}', usando {DropPolicy.DROP_OLDEST}")
+            drop_policy = DropPolicy.DROP_OLDEST
+
+        self.name = name
+        self.maxsize = max(1, int(maxsize))
+        self.drop_policy = drop_policy
+        self.dropped = 0
+        self.max_depth = 0
+        self._items = deque()
+        self._cond = Condition()
+        self._closed = False
+
+    def put(self, item: Any, timeout: Optional[float] = None) -> bool:
+        """
+        Encola un elemento aplicando la política de descarte.
+
+        Args:
+            item: Elemento a encolar
+            timeout: Espera máxima en modo BLOCK (None = indefinida)
+
+        Returns:
+            True si el elemento entró en la cola
+        """
+        with self._cond:
+            if self._closed:
+                return False
+
+            if len(self._items) >= self.maxsize:
+                if self.drop_policy == DropPolicy.DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                if self.drop_policy == DropPolicy.DROP_OLDEST:
+                    self._items.popleft()
+                    self.dropped += 1
+                else:
+                    ready = self._cond.wait_for(
+                        lambda: len(self._items) < self.maxsize or self._closed,
+                        timeout
+                    )
+                    if not ready or self._closed:
+                        self.dropped += 1
+                        return False
+
+            self._items.append(item)
+            self.max_depth = max(self.max_depth, len(self._items))
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Extrae el siguiente elemento.
+
+        Args:
+            timeout: Espera máxima en segundos
+
+        Returns:
+            El elemento o None si no hubo ninguno a tiempo
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._closed, timeout):
+                return None
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self) -> None:
+        """Despierta a productores y consumidores bloqueados."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def depth(self) -> int:
+        """Retorna el número de elementos en espera."""
+        with self._cond:
+            return len(self._items)
+
+    def __len__(self) -> int:
+        return self.depth()
+
+
+class PipelineStage:
+    """
+    Etapa del pipeline ejecutada en su propio hilo.
+
+    Si no tiene cola de entrada actúa como fuente: llama a `func()` en bucle.
+    En caso contrario llama a `func(item)` por cada elemento recibido. Si la
+    función retorna algo distinto de None se envía a la cola de salida.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        input_queue: Optional[FrameQueue] = None,
+        output_queue: Optional[FrameQueue] = None,
+        setup: Optional[Callable[[], None]] = None,
+        teardown: Optional[Callable[[], None]] = None
+    ):
+        """
+        Args:
+            name: Nombre de la etapa (se usa como nombre del hilo)
+            func: Función de trabajo
+            input_queue: Cola de entrada (None para fuentes)
+            output_queue: Cola de salida (None para sumideros)
+            setup: Llamada dentro del hilo antes de empezar
+            teardown: Llamada dentro del hilo al terminar
+        """
+        self.name = name
+        self.func = func
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.setup = setup
+        self.teardown = teardown
+        self.processed = 0
+        self.errors = 0
+        self._stop_event = Event()
+        self._thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        """Lanza el hilo de la etapa."""
+        self._stop_event.clear()
+        self._thread = Thread(target=self._run, name=f"pipeline-{self.name}", daemon=True)
+        self._thread.start()
+
+    def request_stop(self) -> None:
+        """Pide a la etapa que termine (las etapas con entrada vacían su cola antes)."""
+        self._stop_event.set()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que el hilo termine. Retorna True si terminó."""
+        if self._thread is None:
+            return True
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _should_run(self) -> bool:
+        if not self._stop_event.is_set():
+            return True
+        # Al detener, las etapas intermedias terminan de vaciar su cola
+        return self.input_queue is not None and self.input_queue.depth() > 0
+
+    def _run(self) -> None:
+        try:
+            if self.setup:
+                self.setup()
+        except Exception as e:
+            logger.error(f"Error inicializando etapa '{self.name}': {e}", exc_info=True)
+            return
+
+        try:
+            while self._should_run():
+                if self.input_queue is not None:
+                    item = self.input_queue.get(timeout=0.05)
+                    if item is None:
+                        continue
+                    args = (item,)
+                else:
+                    args = ()
+
+                try:
+                    result = self.func(*args)
+                except Exception as e:
+                    self.errors += 1
+                    logger.error(f"Error en etapa '{self.name}': {e}")
+                    continue
+
+                self.processed += 1
+                if result is not None and self.output_queue is not None:
+                    self.output_queue.put(result)
+        finally:
+            try:
+                if self.teardown:
+                    self.teardown()
+            except Exception as e:
+                logger.error(f"Error finalizando etapa '{self.name}': {e}")
+
+
+class CapturePipeline:
+    """Conjunto ordenado de etapas unidas por colas acotadas."""
+
+    def __init__(self):
+        self.stages: List[PipelineStage] = []
+        self.queues: List[FrameQueue] = []
+
+    def add_queue(self, queue: FrameQueue) -> FrameQueue:
+        """Registra una cola para exponer su profundidad."""
+        self.queues.append(queue)
+        return queue
+
+    def add_stage(self, stage: PipelineStage) -> PipelineStage:
+        """Agrega una etapa; el orden de inserción es el orden de parada."""
+        self.stages.append(stage)
+        return stage
+
+    def start(self) -> None:
+        """Arranca todas las etapas (de la última a la primera)."""
+        for stage in reversed(self.stages):
+            stage.start()
+        logger.info(f"Pipeline iniciado con etapas: {[s.name for s in self.stages]}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Detiene las etapas en orden, dejando que cada una vacíe su cola.
+
+        Args:
+            timeout: Espera máxima por etapa
+        """
+        for stage in self.stages:
+            stage.request_stop()
+            if not stage.join(timeout):
+                logger.warning(f"La etapa '{stage.name}' no terminó en {timeout}s")
+        for queue in self.queues:
+            queue.close()
+        logger.info("Pipeline detenido")
+
+    def is_running(self) -> bool:
+        return any(stage.is_alive() for stage in self.stages)
+
+    def get_queue_depths(self) -> Dict[str, int]:
+        """Retorna la profundidad actual de cada cola."""
+        return {queue.name: queue.depth() for queue in self.queues}
+
+    def get_queue_stats(self) -> Dict[str, Dict[str, int]]:
+        """Retorna profundidad, capacidad, máximo observado y descartes por cola."""
+        return {
+            queue.name: {
+                "depth": queue.depth(),
+                "maxsize": queue.maxsize,
+                "max_depth": queue.max_depth,
+                "dropped": queue.dropped,
+            }
+            for queue in self.queues
+        }
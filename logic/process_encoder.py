@@ -0,0 +1,271 @@
+"""
+Codificación en un proceso aparte.
+
+La captura, la conversión y la codificación comparten el GIL con la interfaz
+Qt; con el preview repintándose la captura puede perder el ritmo. En este
+modo el escritor (XVID o H.264 en vivo) corre en otro proceso y los frames
+viajan por un buffer circular en `multiprocessing.shared_memory`: por la
+cola solo pasan el número de slot, el índice del frame y su timestamp.
+"""
+
+import logging
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from .encoders import FrameWriter, LiveEncoder, XvidFrameWriter
+
+logger = logging.getLogger(__name__)
+
+# Segundos de espera máxima por el proceso codificador
+_READY_TIMEOUT = 15.0
+_SLOT_TIMEOUT = 1.0
+# Al cerrar se espera mientras el codificador avance; se da por colgado tras
+# estos segundos sin vaciar ningún frame del buffer
+_CLOSE_STALL_TIMEOUT = 15.0
+
+
+class SharedFrameRing:
+    """Slots de frames BGR en un bloque de memoria compartida."""
+
+    def __init__(self, shape: Tuple[int, ...], slots: int, name: Optional[str] = None):
+        """
+        Args:
+            shape: Forma de cada frame (alto, ancho, 3)
+            slots: Número de frames del buffer
+            name: Nombre del bloque existente (None = crear uno nuevo)
+        """
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.frame_nbytes = int(np.prod(self.shape))
+        self._owner = name is None
+        if self._owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=self.frame_nbytes * slots)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self._frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def view(self, slot: int) -> np.ndarray:
+        """Array sobre el slot, sin copia."""
+        return self._frames[slot]
+
+    def close(self) -> None:
+        """Suelta la memoria compartida (y la elimina si este lado la creó)."""
+        self._frames = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def _encoder_worker(
+    ring_name: str,
+    shape: Tuple[int, ...],
+    slots: int,
+    writer_args: Dict[str, Any],
+    commands,
+    free_slots,
+    results
+) -> None:
+    """Proceso codificador: consume comandos hasta recibir 'close'."""
+    ring = SharedFrameRing(shape, slots, name=ring_name)
+    try:
+        if writer_args.pop("live"):
+            writer = LiveEncoder(**writer_args)
+        else:
+            writer = XvidFrameWriter(**writer_args)
+    except Exception as e:
+        results.put(("error", f"{type(e).__name__}: {e}"))
+        ring.close()
+        return
+    results.put(("ready", None))
+
+    # El escritor conserva el último frame para rellenar huecos, así que su
+    # slot no se devuelve hasta que llega el siguiente
+    held_slot = None
+    max_transfer = 0.0
+    try:
+        while True:
+            command = commands.get()
+            kind = command[0]
+            if kind == "frame":
+                _, slot, index, timestamp = command
+                max_transfer = max(max_transfer, time.monotonic() - timestamp)
+                writer.write_frame(ring.view(slot), index)
+                if held_slot is not None:
+                    free_slots.put(held_slot)
+                held_slot = slot
+            elif kind == "audio":
+                writer.write_audio(command[1])
+            elif kind == "finish":
+                writer.finish(command[1])
+            elif kind == "close":
+                break
+    except Exception as e:
+        results.put(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        writer.close()
+        stats = writer.get_stats()
+        stats["max_transfer_ms"] = round(max_transfer * 1000, 2)
+        results.put(("stats", stats))
+        ring.close()
+
+
+class ProcessEncoder(FrameWriter):
+    """Escritor que delega la codificación en otro proceso."""
+
+    # El escritor del proceso hijo guarda el último frame
+    KEEPS_LAST_FRAME = False
+
+    def __init__(
+        self,
+        path: str,
+        width: int,
+        height: int,
+        fps: float,
+        live: bool = False,
+        sample_rate: Optional[int] = None,
+        channels: Optional[int] = None,
+        video_options: Optional[Dict[str, str]] = None,
+        fragmented: bool = False,
+        slots: int = 8
+    ):
+        """
+        Args:
+            path: Ruta del archivo de salida
+            width, height: Dimensiones del video
+            fps: Frames por segundo
+            live: True = LiveEncoder (H.264/AAC), False = XVID temporal
+            sample_rate, channels: Parámetros del audio en modo en vivo
+            video_options: Opciones de libx264 en modo en vivo (ver LiveEncoder)
+            fragmented: MP4 fragmentado en modo en vivo (ver LiveEncoder)
+            slots: Frames del buffer compartido (mínimo 2)
+
+        Raises:
+            RuntimeError: Si el proceso no pudo crear el escritor
+        """
+        super().__init__(path, width, height, fps)
+        self.slots = max(2, slots)
+        self.ring = SharedFrameRing((height, width, 3), self.slots)
+        self._stats: Dict[str, Any] = {}
+        # Recibe los frames que faltan por codificar mientras close() espera
+        self.drain_callback: Optional[Callable[[int], None]] = None
+
+        # spawn en todas las plataformas: hacer fork de un proceso con hilos
+        # (Qt, PortAudio) puede heredar locks tomados
+        context = multiprocessing.get_context("spawn")
+        self._commands = context.Queue()
+        self._free_slots = context.Queue()
+        self._results = context.Queue()
+        for slot in range(self.slots):
+            self._free_slots.put(slot)
+
+        writer_args = {"path": path, "width": width, "height": height, "fps": fps, "live": live}
+        if live:
+            writer_args.update(
+                sample_rate=sample_rate, channels=channels,
+                video_options=video_options, fragmented=fragmented
+            )
+        self._process = context.Process(
+            target=_encoder_worker,
+            args=(self.ring.name, self.ring.shape, self.slots, writer_args,
+                  self._commands, self._free_slots, self._results),
+            name="encoder",
+            daemon=True
+        )
+        self._process.start()
+
+        try:
+            status, message = self._results.get(timeout=_READY_TIMEOUT)
+        except queue.Empty:
+            status, message = "error", "sin respuesta del proceso codificador"
+        if status != "ready":
+            self._terminate()
+            raise RuntimeError(message)
+        logger.info(f"Codificador en proceso aparte (pid {self._process.pid}, {self.slots} slots, live={live})")
+
+    def _acquire_slot(self) -> int:
+        while True:
+            try:
+                return self._free_slots.get(timeout=_SLOT_TIMEOUT)
+            except queue.Empty:
+                if not self._process.is_alive():
+                    raise RuntimeError("El proceso codificador terminó inesperadamente")
+
+    def _write(self, frame: np.ndarray, index: int) -> None:
+        # Si el codificador va atrasado esto bloquea y la cola de codificación
+        # aplica su política de descarte
+        slot = self._acquire_slot()
+        np.copyto(self.ring.view(slot), frame)
+        self._commands.put(("frame", slot, index, time.monotonic()))
+        self.frames_written += 1
+
+    def write_audio(self, data: bytes) -> None:
+        """Envía un bloque PCM al LiveEncoder del proceso."""
+        if data and self._process is not None:
+            self._commands.put(("audio", data))
+
+    def finish(self, final_slot: Optional[int] = None) -> None:
+        if final_slot is None or self._process is None or final_slot <= self.next_slot:
+            return
+        self._commands.put(("finish", final_slot))
+        self.next_slot = final_slot
+
+    def close(self) -> None:
+        if self._process is None:
+            return
+        self._commands.put(("close",))
+        # La espera depende de lo que queda en el buffer: mientras el
+        # codificador siga vaciándolo no se corta
+        pending = self._pending_frames()
+        last_progress = time.monotonic()
+        while True:
+            try:
+                status, payload = self._results.get(timeout=1.0)
+            except queue.Empty:
+                remaining = self._pending_frames()
+                if remaining is not None and pending is not None and remaining < pending:
+                    last_progress = time.monotonic()
+                pending = remaining
+                if remaining is not None and self.drain_callback is not None:
+                    self.drain_callback(remaining)
+                if time.monotonic() - last_progress > _CLOSE_STALL_TIMEOUT:
+                    logger.error(f"El proceso codificador no avanza ({remaining} frames pendientes)")
+                    break
+                continue
+            if status == "stats":
+                self._stats = payload
+                break
+            logger.error(f"Error en el proceso codificador: {payload}")
+        self._terminate()
+        logger.info(f"Codificador en proceso aparte finalizado: {self.path} ({self._stats})")
+
+    def _pending_frames(self) -> Optional[int]:
+        """Frames del buffer aún sin codificar (None si la plataforma no lo permite)."""
+        try:
+            return self.slots - self._free_slots.qsize()
+        except NotImplementedError:
+            return None
+
+    def _terminate(self) -> None:
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(timeout=2)
+        self._process = None
+        for q in (self._commands, self._free_slots, self._results):
+            q.close()
+            q.cancel_join_thread()
+        self.ring.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        if self._stats:
+            return dict(self._stats)
+        return super().get_stats()
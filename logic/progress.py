@@ -0,0 +1,124 @@
+"""
+Progreso de las tareas de combinación y remux.
+
+Las rutas de PyAV cuentan frames a medida que los procesan y la de FFmpeg lee
+`-progress pipe:1`; ambas informan a un ProgressTracker, que calcula la
+fracción completada, los FPS de codificación y el tiempo restante, y se los
+pasa a una función opcional (la cola de trabajos la usa para mostrar el
+progreso y para cancelar).
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Tiempo mínimo de espera por FFmpeg y segundos permitidos por segundo de video
+PROCESSING_TIMEOUT_MIN = 300
+PROCESSING_TIMEOUT_FACTOR = 4.0
+
+
+class ProcessingCancelled(Exception):
+    """Se pidió cancelar la combinación en curso."""
+
+
+def processing_timeout(duration: Optional[float]) -> float:
+    """
+    Tiempo máximo para procesar un archivo según su duración.
+
+    Args:
+        duration: Duración del video en segundos (None = desconocida)
+
+    Returns:
+        Segundos de espera antes de abortar FFmpeg
+    """
+    if not duration:
+        return float(PROCESSING_TIMEOUT_MIN)
+    return max(float(PROCESSING_TIMEOUT_MIN), duration * PROCESSING_TIMEOUT_FACTOR + 60)
+
+
+def expected_frames(info: Dict[str, Any]) -> Optional[int]:
+    """Frames totales de un archivo a partir de probe_media (None si no se sabe)."""
+    if info.get("frames"):
+        return int(info["frames"])
+    if info.get("duration") and info.get("fps"):
+        return int(round(info["duration"] * info["fps"]))
+    return None
+
+
+class ProgressTracker:
+    """Calcula fracción, FPS y tiempo restante de una tarea por frames."""
+
+    def __init__(
+        self,
+        label: str,
+        total: Optional[int],
+        callback: Optional[Callable[[Dict[str, Any]], Optional[bool]]] = None,
+        interval: float = 0.5,
+        log_interval: float = 5.0
+    ):
+        """
+        Args:
+            label: Nombre de la tarea (ruta de combinación)
+            total: Frames totales esperados (None = desconocido)
+            callback: Recibe el reporte; si retorna False se cancela la tarea
+            interval: Segundos mínimos entre llamadas al callback
+            log_interval: Segundos mínimos entre líneas de log
+        """
+        self.label = label
+        self.total = total or None
+        self.callback = callback
+        self.interval = interval
+        self.log_interval = log_interval
+        self.frames = 0
+        self._start = time.perf_counter()
+        self._last_report = 0.0
+        self._last_log = self._start
+
+    def report(self) -> Dict[str, Any]:
+        """Estado actual: frames, total, fracción, FPS y segundos restantes."""
+        elapsed = time.perf_counter() - self._start
+        fps = self.frames / elapsed if elapsed > 0 else 0.0
+        fraction = min(1.0, self.frames / self.total) if self.total else None
+        eta = None
+        if self.total and fps > 0:
+            eta = max(0.0, (self.total - self.frames) / fps)
+        return {
+            "stage": self.label,
+            "frames": self.frames,
+            "total": self.total,
+            "fraction": fraction,
+            "fps": round(fps, 1),
+            "eta": round(eta, 1) if eta is not None else None,
+        }
+
+    def update(self, frames: int, force: bool = False) -> None:
+        """
+        Registra los frames procesados hasta ahora.
+
+        Raises:
+            ProcessingCancelled: Si el callback pidió cancelar
+        """
+        self.frames = frames
+        now = time.perf_counter()
+        if not force and now - self._last_report < self.interval:
+            return
+        self._last_report = now
+        report = self.report()
+
+        if now - self._last_log >= self.log_interval:
+            self._last_log = now
+            total = report["total"] or "?"
+            eta = f", quedan {report['eta']:.0f}s" if report["eta"] is not None else ""
+            logger.info(f"{self.label}: {report['frames']}/{total} frames, {report['fps']} fps{eta}")
+
+        if self.callback is not None and self.callback(report) is False:
+            raise ProcessingCancelled(self.label)
+
+    def finish(self) -> Dict[str, Any]:
+        """Marca la tarea como completa y retorna el reporte final."""
+        if self.total is None or self.frames > self.total:
+            self.total = self.frames
+        self.update(self.total, force=True)
+        return self.report()
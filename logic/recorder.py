@@ -1,17 +1,59 @@
-import mss
 import cv2
 import os
 import time
 import numpy as np
 from pathlib import Path
-from typing import Optional, Callable, Dict, Any, Tuple
-from threading import Thread, Lock
+from typing import Optional, Callable, Dict, Any, List, Tuple
+from functools import partial
+from threading import Thread, Lock, Timer
 import logging
+import shutil
 import subprocess
+import tempfile
+
+from .audio_handler import AudioCaptureMode
+from .change_detector import StaticFrameDetector
+from .cursor_overlay import CursorOverlay, CursorStyle, create_pointer_source
+from .encoders import FrameWriter, LiveEncoder, XvidFrameWriter
+from .encoding_profiles import EncodingProfile, SpeedMode, encoding_profile
+from .frame_pool import FramePool, bgra_to_bgr
+from .frame_scheduler import FrameScheduler
+from .multi_monitor import CanvasCompositor, CaptureSource, MonitorMode, monitor_output_path, virtual_bbox
+from .overlay import WebcamOverlay
+from .pipeline import CapturePipeline, CapturedFrame, DropPolicy, FrameQueue, PipelineStage
+from .process_encoder import ProcessEncoder
+from .progress import ProcessingCancelled, ProgressTracker, expected_frames, processing_timeout
+from .recording_stats import RecordingStats, StageTimings, stats_path_for
+from .scaler import FULL_RESOLUTION, FrameScaler, output_size
+from .screen_handler import align_region
+from .segments import SegmentJoin, SegmentedWriter, segment_path
+from .webcam_reader import WebcamReader
+from .window_tracker import DEFAULT_POLL_INTERVAL, LetterboxFitter, WindowTracker
 
 logger = logging.getLogger(__name__)
 
 
+# Códec de video de destino por contenedor: si la entrada ya lo usa se hace remux
+REMUX_VIDEO_CODECS = {
+    ".mp4": ("h264", "hevc"),
+    ".mov": ("h264", "hevc"),
+    ".avi": ("mpeg4", "h264"),
+}
+
+# Códecs de audio que cada contenedor acepta sin recodificar
+COPYABLE_AUDIO_CODECS = {
+    ".mp4": ("aac", "mp3"),
+    ".mov": ("aac", "mp3", "pcm_s16le"),
+    ".avi": ("mp3", "pcm_s16le"),
+}
+
+
+class EncodeMode:
+    """Modos de codificación de la grabación."""
+    LIVE = "live"            # H.264/AAC directo al contenedor final durante la captura
+    TWO_PHASE = "two_phase"  # XVID temporal + WAV y combinación al detener
+
+
 class RecorderState:
     """Estados posibles de la grabación."""
     IDLE = "idle"
@@ -20,6 +62,12 @@ class RecorderState:
     PROCESSING = "processing"
 
 
+def _partial_path(output_path: str) -> str:
+    """Archivo donde se escribe el final antes de renombrarlo (conserva la extensión)."""
+    path = Path(output_path)
+    return str(path.with_name(f"{path.stem}.partial{path.suffix}"))
+
+
 class ScreenRecorder:
     """Gestor centralizado de grabación de pantalla."""
 
@@ -53,6 +101,28 @@ class ScreenRecorder:
         self.output_audio_path = None
         self.webcam = None
         self.capture_camera = False
+        self.webcam_callback = None
+        self.webcam_reader: Optional[WebcamReader] = None
+        self.webcam_overlay: Optional[WebcamOverlay] = None
+        self.pipeline: Optional[CapturePipeline] = None
+        self.scheduler: Optional[FrameScheduler] = None
+        self.output_size: Optional[Tuple[int, int]] = None
+        self.monitor_mode = MonitorMode.SINGLE
+        self.sources: List[CaptureSource] = []
+        self.compositor: Optional[CanvasCompositor] = None
+        self.canvas_scaler: Optional[FrameScaler] = None
+        self.canvas_pool: Optional[FramePool] = None
+        self.monitor_video_paths: List[str] = []
+        self._writer_stats: Dict[str, int] = {}
+        self._final_frame_slot = None
+        self.output_is_final = False
+        self.segment_paths: List[str] = []
+        self.last_combine_report: Dict[str, Any] = {}
+        # Recibe el progreso de la combinación; si retorna False se cancela
+        self.progress_callback: Optional[Callable[[Dict[str, Any]], Optional[bool]]] = None
+        # Recibe mensajes de avance mientras stop_recording vacía los codificadores
+        self.stop_progress_callback: Optional[Callable[[str], None]] = None
+        self.stats: Optional[RecordingStats] = None
 
     def set_state(self, new_state: str) -> None:
         """Cambia el estado de grabación de forma thread-safe."""
@@ -96,7 +166,11 @@ class ScreenRecorder:
         quality: int = 85,
         capture_camera: bool = False,
         webcam_object: Optional[cv2.VideoCapture] = None,
-        webcam_callback: Optional[Callable] = None
+        webcam_callback: Optional[Callable] = None,
+        video_format: str = ".mp4",
+        monitors: Optional[List[Dict[str, int]]] = None,
+        monitor_mode: Optional[str] = None,
+        window_id: Optional[int] = None
     ) -> bool:
         """
         Inicia grabación.
@@ -111,7 +185,12 @@ class ScreenRecorder:
             capture_camera: Si True, superpone la cámara web en el video
             webcam_object: Objeto VideoCapture ya abierto para reutilizar
             webcam_callback: Función para enviar frames de cámara a la UI
-            
+            video_format: Contenedor final, usado por la codificación en vivo
+            monitors: Regiones de todos los monitores para los modos multimonitor
+            monitor_mode: MonitorMode (usa `recording.monitor_mode` si None);
+                con un solo monitor siempre se graba `bbox`
+            window_id: Ventana X11 a seguir; sustituye a `bbox` y a los monitores
+        
         Returns:
             True si se inicia exitosamente
         """
@@ -121,21 +200,14 @@ class ScreenRecorder:
                 return False
 
             self.current_fps = fps or self.config_manager.get("recording.fps", 15)
-            self.bbox = bbox
+            self._prepare_sources(bbox, monitors, monitor_mode, window_id)
             self.quality = quality
             self.output_video_path = output_video_path
             self.output_audio_path = output_audio_path
             self.capture_camera = capture_camera
             self.webcam_callback = webcam_callback
-            
-            # Preparar video con codec XVID
-            fourcc = cv2.VideoWriter_fourcc(*'XVID')
-            self.video_writer = cv2.VideoWriter(
-                output_video_path,
-                fourcc,
-                self.current_fps,
-                (bbox['width'], bbox['height'])
-            )
+            self.output_is_final = False
+            self.segment_paths = []
 
             # Preparar captura de cámara
             if self.capture_camera:
@@ -150,83 +222,631 @@ class ScreenRecorder:
                     self.capture_camera = False
 
             # Preparar audio
-            if not self.audio_handler.start_recording(mic_device_index):
+            capture_mode = self.config_manager.get("audio.capture_mode", AudioCaptureMode.CALLBACK)
+            if not self.audio_handler.start_recording(mic_device_index, capture_mode=capture_mode):
                 logger.error("Falló inicio de grabación de audio")
+                self._abort_start()
                 return False
 
+            # Preparar video (necesita los parámetros reales del audio en modo en vivo)
+            self._create_writers(output_video_path, video_format)
+            
+            # En dos fases el audio se escribe a disco mientras se captura
+            if not self.output_is_final and output_audio_path:
+                self.audio_handler.set_wav_output(output_audio_path)
+
             # Inicializar tiempos
             self.start_time = time.time()
             self.pause_time = None
             self.total_paused_time = 0
             self.audio_frames = []
             
+            self.stats = RecordingStats(self.current_fps)
+            # Construir el pipeline antes de cambiar de estado: sus errores no
+            # dejan la sesión a medias
+            self.pipeline = self._build_pipeline()
             self.set_state(RecorderState.RECORDING)
-            logger.info(f"Grabación iniciada. FPS: {self.current_fps}, Calidad: {quality}%")
+            logger.info(
+                f"Grabación iniciada. FPS: {self.current_fps}, Calidad: {quality}% "
+                f"({self._encoding_profile(live=True)}), salida {self.output_size[0]}x{self.output_size[1]}, "
+                f"monitores: {len(self.sources)} ({self.monitor_mode})"
+            )
             
-            # Loop de captura de frames
-            frame_delay = 1.0 / self.current_fps
-            last_frame_time = time.time()
+            # La cámara se lee en su propio hilo; la superposición toma el último frame
+            if self.capture_camera:
+                self.webcam_reader = WebcamReader(
+                    self.webcam,
+                    preview_callback=self.webcam_callback,
+                    preview_fps=self.config_manager.get("recording.webcam_preview_fps", 10)
+                )
+                self.webcam_reader.start()
             
-            # Mantener una instancia de mss
-            with mss.mss() as sct:
-                while self.state != RecorderState.IDLE:
-                    # Capturar audio constantemente para evitar overflow del buffer
-                    self.audio_handler.read_audio_frame()
-                    
-                    # Gestionar cámara web (lectura y callback para UI)
-                    webcam_frame_to_overlay = None
-                    if self.capture_camera and hasattr(self, 'webcam') and self.webcam:
-                        try:
-                            ret, w_frame = self.webcam.read()
-                            if ret:
-                                webcam_frame_to_overlay = w_frame
-                                # Enviar a la UI para mantener el preview vivo
-                                if hasattr(self, 'webcam_callback') and self.webcam_callback:
-                                    self.webcam_callback(w_frame)
-                        except Exception as e:
-                            logger.error(f"Error leyendo webcam: {e}")
-                    
-                    if self.state == RecorderState.PAUSED:
-                        time.sleep(0.01)
-                        continue
-
-                    current_time = time.time()
-                    elapsed = current_time - last_frame_time
-                    
-                    # Capturar frame si ha pasado el tiempo necesario
-                    if elapsed >= frame_delay:
-                        try:
-                            # Captura ultra-rápida con mss
-                            img = sct.grab(bbox)
-                            frame = np.array(img)
-                            frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
-                            
-                            # Superponer cámara web si hay frame disponible
-                            if webcam_frame_to_overlay is not None:
-                                cam_w = bbox['width'] // 6
-                                cam_h = bbox['height'] // 6
-                                resized_cam = cv2.resize(webcam_frame_to_overlay, (cam_w, cam_h))
-                                
-                                x_offset = bbox['width'] - cam_w - 10
-                                y_offset = 10
-                                frame[y_offset:y_offset+cam_h, x_offset:x_offset+cam_w] = resized_cam
-                            
-                            if self.video_writer:
-                                self.video_writer.write(frame)
-                            last_frame_time = current_time
-                        except Exception as e:
-                            logger.error(f"Error capturando frame: {e}")
-                    
-                    time.sleep(0.001)
+            # Pipeline captura -> procesamiento -> codificación, cada etapa en su hilo
+            self.pipeline.start()
+            
+            # En modo callback el audio se captura en el hilo de PortAudio; en modo
+            # bloqueante este hilo hace las lecturas y la lectura marca su propio ritmo.
+            # El WAV en streaming se vuelca a disco periódicamente para poder
+            # recuperarlo si la aplicación se cierra de forma inesperada
+            checkpoint_interval = self.config_manager.get("recording.checkpoint_seconds", 5)
+            next_checkpoint = time.monotonic() + checkpoint_interval
+            while self.state != RecorderState.IDLE:
+                if self.audio_handler.is_callback_mode():
+                    time.sleep(0.05)
+                elif self.audio_handler.read_audio_frame() is None:
+                    time.sleep(0.005)
+                if checkpoint_interval and time.monotonic() >= next_checkpoint:
+                    self.audio_handler.checkpoint_wav()
+                    next_checkpoint = time.monotonic() + checkpoint_interval
             
             # No liberar la cámara aquí si es propiedad de la UI
             # self.webcam.release() se manejará en stop_recording o en la UI
             return True
 
         except Exception as e:
-            logger.error(f"Error iniciando grabación: {e}")
+            logger.error(f"Error iniciando grabación: {e}", exc_info=True)
+            self._abort_start()
             return False
 
+    def _abort_start(self) -> None:
+        """
+        Deshace un inicio de grabación fallido.
+
+        Detiene lo que llegó a arrancar (pipeline, audio, cámara), libera los
+        escritores y vuelve a IDLE para que se pueda grabar de nuevo.
+        """
+        self.set_state(RecorderState.IDLE)
+
+        def attempt(description: str, action: Callable[[], Any]) -> None:
+            try:
+                action()
+            except Exception as e:
+                logger.warning(f"Error {description} tras el fallo de inicio: {e}")
+
+        if self.pipeline is not None:
+            attempt("deteniendo el pipeline", self.pipeline.stop)
+            self.pipeline = None
+        attempt("deteniendo el audio", self.audio_handler.stop_recording)
+        self.audio_handler.set_audio_sink(None)
+        for writer in self._writers():
+            attempt("liberando el escritor", writer.release)
+        self.video_writer = None
+        for source in self.sources:
+            source.writer = None
+        if self.webcam_reader is not None:
+            attempt("deteniendo la cámara", self.webcam_reader.stop)
+            self.webcam_reader = None
+        if self.webcam is not None:
+            if not self.webcam_callback:
+                attempt("liberando la cámara", self.webcam.release)
+            self.webcam = None
+
+    def _prepare_sources(
+        self,
+        bbox: Dict[str, int],
+        monitors: Optional[List[Dict[str, int]]],
+        monitor_mode: Optional[str],
+        window_id: Optional[int] = None
+    ) -> None:
+        """
+        Crea una fuente de captura por monitor y calcula las resoluciones de salida.
+
+        Raises:
+            RuntimeError: Si la ventana a seguir no está visible
+        """
+        tracker = None
+        if window_id is not None:
+            # El tamaño del video es el de la ventana al empezar
+            tracker = WindowTracker(
+                window_id,
+                poll_interval=self.config_manager.get("recording.window_poll_seconds", DEFAULT_POLL_INTERVAL)
+            )
+            try:
+                bbox = tracker.query_bbox()
+            finally:
+                tracker.close()
+            if bbox is None:
+                raise RuntimeError(f"La ventana 0x{window_id:x} no está visible")
+            monitor_mode = MonitorMode.SINGLE
+
+        mode = monitor_mode or self.config_manager.get("recording.monitor_mode", MonitorMode.SINGLE)
+        if mode not in MonitorMode.ALL:
+            logger.warning(f"Modo de monitores desconocido '{mode}', grabando un solo monitor")
+            mode = MonitorMode.SINGLE
+        if mode != MonitorMode.SINGLE and (not monitors or len(monitors) < 2):
+            mode = MonitorMode.SINGLE
+        # yuv420p necesita dimensiones pares (una región personalizada ya lo está)
+        regions = [align_region(r) for r in ([bbox] if mode == MonitorMode.SINGLE else monitors)]
+
+        self.monitor_mode = mode
+        self.sources = [CaptureSource(i, region, self.current_fps) for i, region in enumerate(regions)]
+        resolution = self.config_manager.get("recording.resolution", FULL_RESOLUTION)
+        for source in self.sources:
+            source.output_size = output_size(source.bbox['width'], source.bbox['height'], resolution)
+        self.sources[0].tracker = tracker
+
+        # En el lienzo la resolución de salida se aplica al escritorio virtual completo
+        self.bbox = virtual_bbox(regions) if mode == MonitorMode.CANVAS else regions[0]
+        self.output_size = (
+            output_size(self.bbox['width'], self.bbox['height'], resolution)
+            if mode == MonitorMode.CANVAS else self.sources[0].output_size
+        )
+
+    def _create_writers(self, output_video_path: str, video_format: str) -> None:
+        """Crea el escritor de la sesión (o uno por monitor) y conecta el audio."""
+        self.monitor_video_paths = []
+        if self.monitor_mode == MonitorMode.SEPARATE:
+            # Un archivo por monitor: el primero decide si la sesión es en vivo
+            for source in self.sources:
+                source.writer = self._create_video_writer(
+                    monitor_output_path(output_video_path, source.index), video_format,
+                    source.output_size, allow_segments=False,
+                    live=self.output_is_final if source.index else None
+                )
+                source.output_path = source.writer.path
+                self.monitor_video_paths.append(source.writer.path)
+            self.video_writer = self.sources[0].writer
+        else:
+            self.video_writer = self._create_video_writer(output_video_path, video_format, self.output_size)
+            for source in self.sources:
+                source.writer = self.video_writer
+        self.output_video_path = self.video_writer.path
+
+        # En modo en vivo el audio va dentro del video (de cada monitor)
+        if self.output_is_final:
+            writers = [source.writer for source in self.sources] if self.monitor_mode == MonitorMode.SEPARATE else []
+            if len(writers) > 1:
+                self.audio_handler.set_audio_sink(lambda data: [w.write_audio(data) for w in writers])
+            else:
+                self.audio_handler.set_audio_sink(self.video_writer.write_audio)
+
+    def _create_video_writer(
+        self,
+        output_video_path: str,
+        video_format: str,
+        size: Tuple[int, int],
+        allow_segments: bool = True,
+        live: Optional[bool] = None
+    ) -> FrameWriter:
+        """
+        Crea el escritor según `recording.encode_mode`.
+        
+        En modo en vivo el audio se entrega al codificador en lugar de guardarse
+        en WAV. Si PyAV no está disponible se usa la ruta en dos fases. Con
+        `recording.encoder_process` el escritor corre en otro proceso, y con
+        `recording.segment_seconds`/`segment_max_mb` la salida en vivo se
+        reparte en segmentos (salvo con `allow_segments=False`).
+
+        Args:
+            output_video_path: Ruta del video temporal
+            video_format: Contenedor final para la codificación en vivo
+            size: (ancho, alto) del video
+            allow_segments: Permite la salida segmentada
+            live: Fuerza en vivo (True) o dos fases (False); None = configuración
+
+        Returns:
+            Escritor; `self.output_is_final` indica si escribe la salida final
+        """
+        width, height = size
+        encode_mode = self.config_manager.get("recording.encode_mode", EncodeMode.LIVE)
+        if live is not None:
+            encode_mode = EncodeMode.LIVE if live else EncodeMode.TWO_PHASE
+        use_process = self.config_manager.get("recording.encoder_process", False)
+        segment_seconds = self.config_manager.get("recording.segment_seconds", 0)
+        segment_max_mb = self.config_manager.get("recording.segment_max_mb", 0)
+        crash_safe = self.config_manager.get("recording.crash_safe", True)
+        if not allow_segments and (segment_seconds or segment_max_mb):
+            logger.warning("La grabación segmentada no se usa con un archivo por monitor")
+            segment_seconds = segment_max_mb = 0
+        
+        if encode_mode == EncodeMode.LIVE:
+            live_path = str(Path(output_video_path).with_suffix(video_format))
+            live_params = {
+                "sample_rate": self.audio_handler.sample_rate,
+                "channels": self.audio_handler.channels,
+                "video_options": self._encoding_profile(live=True).x264_options(),
+                "fragmented": crash_safe,
+            }
+            
+            def live_writer(path: str) -> FrameWriter:
+                if use_process:
+                    return ProcessEncoder(path, width, height, self.current_fps, live=True, **live_params)
+                return LiveEncoder(path, width, height, self.current_fps, **live_params)
+
+            try:
+                if segment_seconds or segment_max_mb:
+                    writer = SegmentedWriter(
+                        live_path, width, height, self.current_fps, live_writer,
+                        segment_seconds=segment_seconds,
+                        segment_max_bytes=int(segment_max_mb * 1024 * 1024)
+                    )
+                else:
+                    writer = live_writer(live_path)
+                self.output_is_final = True
+                return writer
+            except ImportError:
+                logger.warning("PyAV (av) no está instalado; usando codificación en dos fases")
+            except Exception as e:
+                logger.error(f"No se pudo iniciar la codificación en vivo: {e}; usando dos fases")
+        
+        if segment_seconds or segment_max_mb:
+            logger.warning("La grabación segmentada requiere codificación en vivo; se grabará un único archivo")
+        if use_process:
+            try:
+                return ProcessEncoder(output_video_path, width, height, self.current_fps)
+            except Exception as e:
+                logger.error(f"No se pudo iniciar el proceso codificador: {e}; codificando en este proceso")
+        return XvidFrameWriter(output_video_path, width, height, self.current_fps)
+
+    def _build_pipeline(self) -> CapturePipeline:
+        """
+        Construye el pipeline de etapas de captura, procesamiento y codificación.
+
+        Cada monitor tiene su propia etapa de captura. En modo `separate` cada
+        uno tiene además su procesamiento y su codificación; en modo `canvas`
+        todas las capturas alimentan una única etapa que compone el lienzo.
+        """
+        queue_size = self.config_manager.get("recording.queue_size", 4)
+        drop_policy = self.config_manager.get("recording.drop_policy", DropPolicy.DROP_OLDEST)
+        multi = len(self.sources) > 1
+
+        pipeline = CapturePipeline()
+        self.scheduler = self.sources[0].scheduler
+        self._final_frame_slot = None
+        # Origen común: el mismo slot es el mismo instante en todos los monitores
+        origin = time.perf_counter()
+        self.screen_handler.set_capture_backend(
+            self.config_manager.get("recording.capture_backend", "mss")
+        )
+
+        # Con cámara superpuesta cada frame cambia, así que no se omite nada
+        skip_static = self.config_manager.get("recording.skip_static_frames", True)
+        show_cursor = self.config_manager.get("recording.show_cursor", True)
+        cursor_style = self.config_manager.get("recording.cursor_style", CursorStyle.DEFAULT)
+        for source in self.sources:
+            # El sprite se reduce como la pantalla (en el lienzo lo reduce el escalado final)
+            source.pointer = create_pointer_source(cursor_style) if show_cursor else None
+            cursor_scale = 1.0
+            if self.monitor_mode != MonitorMode.CANVAS:
+                cursor_scale = min(source.output_size[0] / source.size[0], source.output_size[1] / source.size[1])
+            source.cursor_overlay = CursorOverlay(cursor_style, cursor_scale) if source.pointer else None
+            source.static_detector = StaticFrameDetector() if skip_static and not self.capture_camera else None
+            # Un buffer por plaza de cada cola más uno en curso por etapa
+            width, height = source.size
+            source.scaler = None
+            source.output_pool = None
+            if source.tracker is not None:
+                # La ventana puede cambiar de tamaño: se ajusta ya en la captura a un lienzo fijo
+                out_width, out_height = source.output_size
+                source.fitter = LetterboxFitter(source.output_size)
+                source.frame_pool = FramePool((out_height, out_width, 3), count=2 * queue_size + 3)
+                continue
+            source.frame_pool = FramePool((height, width, 3), count=2 * queue_size + 3)
+            # Escalado a la resolución de salida: los frames reducidos van a su propio pool
+            if self.monitor_mode != MonitorMode.CANVAS and source.output_size != source.size:
+                out_width, out_height = source.output_size
+                source.scaler = FrameScaler(source.size, source.output_size)
+                source.output_pool = FramePool((out_height, out_width, 3), count=2 * queue_size + 3)
+
+        # Región de la cámara calculada una vez por sesión (monitor principal o lienzo)
+        out_width, out_height = self.output_size
+        self.webcam_overlay = (
+            WebcamOverlay(out_width, out_height)
+            if self.webcam_reader is not None else None
+        )
+
+        if self.monitor_mode == MonitorMode.CANVAS:
+            self.compositor = CanvasCompositor([source.bbox for source in self.sources])
+            # El lienzo se sigue modificando mientras el frame espera en la cola,
+            # así que siempre se copia (o escala) a un buffer propio
+            self.canvas_scaler = FrameScaler(self.compositor.size, self.output_size)
+            self.canvas_pool = FramePool((out_height, out_width, 3), count=2 * queue_size + 3)
+            process_queue = pipeline.add_queue(FrameQueue("process", queue_size, drop_policy))
+            encode_queue = pipeline.add_queue(FrameQueue("encode", queue_size, drop_policy))
+            for source in self.sources:
+                pipeline.add_stage(self._grab_stage_for(source, process_queue, origin, multi))
+            pipeline.add_stage(PipelineStage(
+                "compose", self._compose_stage,
+                input_queue=process_queue,
+                output_queue=encode_queue,
+                teardown=partial(self._flush_canvas, encode_queue)
+            ))
+            pipeline.add_stage(PipelineStage(
+                "encode", partial(self._encode_stage, self.sources[0]),
+                input_queue=encode_queue,
+                teardown=partial(self._finish_encoding, self.sources[0])
+            ))
+            return pipeline
+
+        # Las etapas se detienen en orden de inserción: todas las capturas primero
+        suffix = lambda source: f"-{source.index + 1}" if multi else ""
+        queues = []
+        for source in self.sources:
+            process_queue = pipeline.add_queue(FrameQueue(f"process{suffix(source)}", queue_size, drop_policy))
+            encode_queue = pipeline.add_queue(FrameQueue(f"encode{suffix(source)}", queue_size, drop_policy))
+            queues.append((process_queue, encode_queue))
+            pipeline.add_stage(self._grab_stage_for(source, process_queue, origin, multi))
+        for source, (process_queue, encode_queue) in zip(self.sources, queues):
+            pipeline.add_stage(PipelineStage(
+                f"process{suffix(source)}", partial(self._process_stage, source),
+                input_queue=process_queue,
+                output_queue=encode_queue
+            ))
+        for source, (_, encode_queue) in zip(self.sources, queues):
+            pipeline.add_stage(PipelineStage(
+                f"encode{suffix(source)}", partial(self._encode_stage, source),
+                input_queue=encode_queue,
+                teardown=partial(self._finish_encoding, source)
+            ))
+        return pipeline
+
+    def _grab_stage_for(
+        self,
+        source: CaptureSource,
+        output_queue: FrameQueue,
+        origin: float,
+        multi: bool
+    ) -> PipelineStage:
+        """Etapa de captura de un monitor, con su backend abierto en su propio hilo."""
+        return PipelineStage(
+            f"grab-{source.index + 1}" if multi else "grab",
+            partial(self._grab_stage, source),
+            output_queue=output_queue,
+            setup=partial(self._open_grabber, source, origin),
+            teardown=source.close
+        )
+
+    def _open_grabber(self, source: CaptureSource, origin: float) -> None:
+        """Crea el backend de captura dentro del hilo de captura y arranca el reloj de frames."""
+        source.open(self.screen_handler.create_backend(), origin)
+
+    def _grab_stage(self, source: CaptureSource) -> Optional[CapturedFrame]:
+        """Etapa de captura: respeta el ritmo de FPS y toma la pantalla."""
+        if self.state == RecorderState.PAUSED:
+            time.sleep(0.01)
+            return None
+        if self.state == RecorderState.IDLE:
+            return None
+
+        # Esperar al plazo absoluto del siguiente slot (sin espera activa)
+        slot = source.scheduler.wait_next()
+        if self.state != RecorderState.RECORDING:
+            return None
+
+        # El backend puede reutilizar su buffer entre capturas, así que la
+        # conversión a BGR se hace aquí, antes de la siguiente captura
+        bbox = source.bbox
+        if source.tracker is not None:
+            # Ventana minimizada o cerrada: el escritor repite el último frame
+            bbox = source.tracker.current_bbox()
+            if bbox is None:
+                return None
+
+        started = time.perf_counter()
+        raw = source.grabber.grab(bbox)
+        grabbed = time.perf_counter()
+        self.stats.record(StageTimings.GRAB, grabbed - started)
+        # El puntero se consulta en el mismo instante que la captura
+        sample = source.pointer.query() if source.pointer is not None else None
+        cursor_key = None
+        if sample is not None:
+            x, y = sample.x - bbox['left'], sample.y - bbox['top']
+            if 0 <= x < bbox['width'] and 0 <= y < bbox['height']:
+                cursor_key = (x, y, sample.serial)
+        cursor_changed = cursor_key != source.last_cursor
+        source.last_cursor = cursor_key
+
+        # Pantalla sin cambios: no convertir ni codificar; el escritor lo
+        # trata como repetición del frame anterior (o como hueco VFR). Si el
+        # cursor se movió el frame sí cuenta, aunque la pantalla no cambie
+        if (
+            source.static_detector is not None
+            and not cursor_changed
+            and source.static_detector.is_static(raw)
+        ):
+            return None
+
+        if source.fitter is not None:
+            frame = source.fitter.fit(raw, source.frame_pool.acquire())
+        else:
+            frame = bgra_to_bgr(raw, source.frame_pool.acquire())
+        self.stats.record(StageTimings.CONVERT, time.perf_counter() - grabbed)
+
+        cursor = None
+        if cursor_key is not None:
+            x, y = cursor_key[0], cursor_key[1]
+            if source.fitter is not None:
+                x, y = source.fitter.map_point(x, y)
+            cursor = (x, y, sample)
+        return CapturedFrame(slot, time.monotonic(), frame, source.index, cursor)
+
+    def _process_stage(self, source: CaptureSource, item: CapturedFrame) -> CapturedFrame:
+        """Etapa de procesamiento: escalado a la resolución de salida, cursor y superposición de cámara."""
+        if source.scaler is not None:
+            started = time.perf_counter()
+            item.frame = source.scaler.scale(item.frame, source.output_pool.acquire())
+            self.stats.record(StageTimings.SCALE, time.perf_counter() - started)
+        self._apply_cursor(source, item)
+        # La cámara se superpone solo en el monitor principal
+        if source.index == 0:
+            self._apply_webcam(item.frame)
+        return item
+
+    def _compose_stage(self, item: CapturedFrame) -> Optional[CapturedFrame]:
+        """
+        Etapa de composición (modo lienzo): pega cada monitor en su región.
+
+        El lienzo de un slot se emite cuando llega el primer frame de un slot
+        posterior; un monitor atrasado aparece en el siguiente frame emitido.
+        """
+        output = None
+        pending = self.compositor.pending_slot
+        if pending is not None and item.index > pending:
+            output = self._emit_canvas()
+        self._apply_cursor(self.sources[item.source], item)
+        self.compositor.paste(item.source, item.frame, item.index)
+        return output
+
+    def _emit_canvas(self) -> CapturedFrame:
+        """Copia el lienzo (escalado a la salida) a un buffer propio y superpone la cámara."""
+        slot = self.compositor.take_slot()
+        started = time.perf_counter()
+        frame = self.canvas_scaler.scale(self.compositor.canvas, self.canvas_pool.acquire())
+        if self.canvas_scaler.active:
+            self.stats.record(StageTimings.SCALE, time.perf_counter() - started)
+        self._apply_webcam(frame)
+        return CapturedFrame(slot, time.monotonic(), frame)
+
+    def _flush_canvas(self, encode_queue: FrameQueue) -> None:
+        """Entrega el último lienzo pendiente al detener la composición."""
+        if self.compositor is not None and self.compositor.pending_slot is not None:
+            encode_queue.put(self._emit_canvas())
+
+    def _apply_cursor(self, source: CaptureSource, item: CapturedFrame) -> None:
+        """Dibuja el cursor capturado con el frame, en la escala actual del frame."""
+        if item.cursor is None or source.cursor_overlay is None:
+            return
+        started = time.perf_counter()
+        x, y, sample = item.cursor
+        if source.scaler is not None and item.frame.shape[:2] != (source.size[1], source.size[0]):
+            x = x * source.output_size[0] / source.size[0]
+            y = y * source.output_size[1] / source.size[1]
+        if source.cursor_overlay.apply(item.frame, int(x), int(y), sample):
+            self.stats.record(StageTimings.CURSOR, time.perf_counter() - started)
+
+    def _apply_webcam(self, frame: np.ndarray) -> None:
+        """Superpone el último frame de la cámara, si hay cámara."""
+        if self.webcam_overlay is None:
+            return
+
+        # Último frame publicado por el lector de cámara (no bloquea); solo se
+        # redimensiona si cambió la secuencia, si no es una copia de la región
+        started = time.perf_counter()
+        sequence, webcam_frame = self.webcam_reader.latest()
+        if self.webcam_overlay.apply(frame, sequence, webcam_frame):
+            self.stats.record(StageTimings.OVERLAY, time.perf_counter() - started)
+
+    def _encode_stage(self, source: CaptureSource, item: CapturedFrame) -> None:
+        """
+        Etapa de codificación: escribe el frame en su slot.
+
+        El escritor se encarga de los slots sin frame (captura tardía o
+        descartes en cola) para que el video conserve la duración real.
+        """
+        if source.writer:
+            started = time.perf_counter()
+            source.writer.write_frame(item.frame, item.index)
+            self.stats.record(StageTimings.WRITE, time.perf_counter() - started)
+
+    def _finish_encoding(self, source: CaptureSource) -> None:
+        """Completa el video con el último frame hasta el instante de parada."""
+        if source.writer:
+            source.writer.finish(self._final_frame_slot)
+
+    def _writers(self) -> List[FrameWriter]:
+        """Escritores distintos de la sesión (uno, o uno por monitor)."""
+        writers = []
+        for source in self.sources:
+            if source.writer is not None and all(source.writer is not w for w in writers):
+                writers.append(source.writer)
+        return writers
+
+    def _source_counters(self) -> Dict[str, int]:
+        """Suma los contadores de puntualidad y pantalla estática de todos los monitores."""
+        counters = {"late_frames": 0, "skipped_slots": 0, "static_frames_skipped": 0}
+        for source in self.sources:
+            scheduler_stats = source.scheduler.get_stats()
+            counters["late_frames"] += scheduler_stats["late_frames"]
+            counters["skipped_slots"] += scheduler_stats["skipped_slots"]
+            if source.static_detector is not None:
+                counters["static_frames_skipped"] += source.static_detector.static_frames
+        return counters
+
+    def get_scheduler_stats(self) -> Dict[str, Any]:
+        """Retorna estadísticas de puntualidad de la última sesión."""
+        if self.scheduler is None:
+            return {}
+        stats = self.scheduler.get_stats()
+        writers = self._writers()
+        if writers:
+            self._writer_stats = {}
+            for writer in writers:
+                for key, value in writer.get_stats().items():
+                    self._writer_stats[key] = self._writer_stats.get(key, 0) + value
+        stats.update(self._writer_stats)
+        stats.update(self._source_counters())
+        if len(self.sources) > 1:
+            stats["monitors"] = len(self.sources)
+        tracker = self.sources[0].tracker if self.sources else None
+        if tracker is not None:
+            stats.update(window_moves=tracker.moves, window_resizes=tracker.resizes, window_closed=tracker.closed)
+        return stats
+
+    def _refresh_stats_counters(self) -> None:
+        """Copia a las estadísticas los contadores del planificador, colas y audio."""
+        if self.stats is None:
+            return
+        counters = {
+            "audio_overflows": self.audio_handler.overflow_count,
+            "audio_blocks_dropped": self.audio_handler.ring_buffer.overruns if self.audio_handler.ring_buffer else 0,
+        }
+        if self.sources:
+            counters.update(self._source_counters())
+        if self.pipeline is not None:
+            counters["dropped_frames"] = sum(q["dropped"] for q in self.pipeline.get_queue_stats().values())
+        writers = self._writers()
+        if writers:
+            counters["duplicated_frames"] = sum(w.get_stats()["duplicated_frames"] for w in writers)
+        # Frames del video: cada slot entregado por el planificador acaba en el
+        # archivo (los estáticos y atrasados los repite el escritor al llegar el
+        # siguiente frame), así que cuenta aunque el escritor aún no los tenga
+        timelines = [w.next_slot for w in writers]
+        timelines += [source.scheduler.get_stats()["slots"] for source in self.sources]
+        if timelines:
+            counters["output_frames"] = max(timelines)
+        self.stats.update_counters(**counters)
+
+    def get_live_stats(self) -> str:
+        """Resumen de rendimiento de la grabación en curso (vacío si no hay sesión)."""
+        if self.stats is None:
+            return ""
+        self._refresh_stats_counters()
+        return self.stats.format_summary()
+
+    def get_session_summary(self) -> Dict[str, Any]:
+        """Estadísticas de la última sesión como diccionario (vacío si no hay sesión)."""
+        if self.stats is None:
+            return {}
+        self._refresh_stats_counters()
+        return self.stats.summary()
+
+    def save_session_stats(self, output_path: str, extra: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Guarda las estadísticas de la última sesión junto al archivo de salida.
+        
+        Args:
+            output_path: Ruta del archivo final de la grabación
+            extra: Datos adicionales a incluir en el JSON
+            
+        Returns:
+            Ruta del JSON o None si no se pudo guardar
+        """
+        if self.stats is None:
+            return None
+        data = {"output": output_path}
+        if self.last_combine_report:
+            data["finalize"] = self.last_combine_report
+        if extra:
+            data.update(extra)
+        path = stats_path_for(output_path)
+        return path if self.stats.save(path, data) else None
+
+    def get_queue_depths(self) -> Dict[str, int]:
+        """Retorna la profundidad de cada cola del pipeline (vacío si no hay grabación)."""
+        if self.pipeline is None:
+            return {}
+        return self.pipeline.get_queue_depths()
+
     def write_frame(self, frame: np.ndarray) -> bool:
         """
         Escribe un frame de video.
@@ -250,6 +870,11 @@ class ScreenRecorder:
         try:
             if self.state == RecorderState.RECORDING:
                 self.pause_time = time.time()
+                for source in self.sources:
+                    source.scheduler.pause()
+                if self.stats is not None:
+                    self.stats.pause()
+                self.audio_handler.paused = True
                 self.set_state(RecorderState.PAUSED)
                 logger.info("Grabación pausada")
                 return True
@@ -264,6 +889,11 @@ class ScreenRecorder:
             if self.state == RecorderState.PAUSED and self.pause_time:
                 paused_duration = time.time() - self.pause_time
                 self.total_paused_time += paused_duration
+                for source in self.sources:
+                    source.scheduler.resume()
+                if self.stats is not None:
+                    self.stats.resume()
+                self.audio_handler.paused = False
                 self.set_state(RecorderState.RECORDING)
                 logger.info(f"Grabación reanudada (pausa: {paused_duration:.1f}s)")
                 return True
@@ -281,38 +911,79 @@ class ScreenRecorder:
         """
         try:
             # 1. Cambiar estado a IDLE primero para detener el bucle de captura en el otro hilo
+            for source in self.sources:
+                source.scheduler.resume()
+            if self.scheduler:
+                self._final_frame_slot = self.scheduler.current_slot() + 1
             self.set_state(RecorderState.IDLE)
             
-            # Dar un breve momento para que el bucle de captura termine su iteración actual
-            time.sleep(0.1)
+            # Detener el pipeline: cada etapa vacía su cola antes de terminar
+            if self.pipeline is not None:
+                queue_stats = self.pipeline.get_queue_stats()
+                self.pipeline.stop()
+                self._refresh_stats_counters()
+                self.pipeline = None
+                logger.info(f"Estadísticas de colas: {queue_stats}")
+                logger.info(f"Estadísticas de frames: {self.get_scheduler_stats()}")
+            for source in self.sources:
+                source.frame_pool = None
+                source.output_pool = None
+                source.scaler = None
+                source.fitter = None
+                source.cursor_overlay = None
+            self.compositor = None
+            self.canvas_scaler = None
+            self.canvas_pool = None
 
-            # 2. Liberar video writer
+            # 2. Detener grabación de audio (vacía el buffer del modo callback,
+            # que en modo en vivo todavía se entrega al codificador, y cierra el WAV)
+            streamed_audio = self.audio_handler.wav_writer is not None
+            self.audio_handler.stop_recording()
+            self.audio_handler.set_audio_sink(None)
+
+            # 3. Liberar video writer (en modo en vivo: vaciar y cerrar el archivo final)
+            # Con segmentos solo queda por cerrar el último; el resto ya se cerró en segundo plano
             if self.video_writer:
-                self.video_writer.release()
+                for writer in self._writers():
+                    if isinstance(writer, ProcessEncoder) and self.stop_progress_callback is not None:
+                        writer.drain_callback = self._report_drain
+                    writer.release()
+                if isinstance(self.video_writer, SegmentedWriter):
+                    self.segment_paths = list(self.video_writer.segments)
                 self.video_writer = None
-
-            # 3. Guardar audio
+                for source in self.sources:
+                    source.writer = None
+            
+            # 4. Guardar audio (en modo en vivo ya está dentro del video)
             audio_path = self.output_audio_path or ""
-            if audio_path and self.audio_handler.audio_frames:
+            if self.output_is_final:
+                audio_path = ""
+            elif streamed_audio:
+                logger.info(f"Audio escrito en streaming: {audio_path}")
+            elif audio_path and self.audio_handler.audio_frames:
                 logger.info(f"Guardando {len(self.audio_handler.audio_frames)} frames de audio...")
                 self.audio_handler.save_audio(audio_path, self.audio_handler.audio_frames)
             else:
                 logger.warning("No hay frames de audio para guardar")
             
-            # 4. Detener grabación de audio
-            self.audio_handler.stop_recording()
-            
             elapsed = self.get_elapsed_time()
             logger.info(f"Grabación detenida. Tiempo total: {self.format_time(elapsed)}")
+            if self.stats is not None:
+                self._refresh_stats_counters()
+                logger.info(f"Rendimiento: {self.stats.format_summary()}")
             
             # 5. Liberar cámara si la abrimos nosotros
+            if self.webcam_reader is not None:
+                self.webcam_reader.stop()
+                self.webcam_reader = None
             if hasattr(self, 'webcam') and self.webcam is not None:
                 if not getattr(self, 'webcam_callback', None):
                     self.webcam.release()
                 self.webcam = None
 
-            # 6. Retornar las rutas guardadas (usando self para evitar NameError)
-            video_path = self.output_video_path or ""
+            # 6. Retornar las rutas guardadas (usando self para evitar NameError);
+            # con segmentos, la del primero (finalize_live_output los une)
+            video_path = self.segment_paths[0] if self.segment_paths else self.output_video_path or ""
             return video_path, audio_path
         except Exception as e:
             logger.error(f"Error deteniendo grabación: {e}")
@@ -320,6 +991,160 @@ class ScreenRecorder:
             logger.error(traceback.format_exc())
             return "", ""
 
+    def _report_drain(self, pending: int) -> None:
+        try:
+            self.stop_progress_callback(f"Terminando de codificar: {pending} frames pendientes")
+        except Exception as e:
+            logger.debug(f"Error notificando el vaciado del codificador: {e}")
+
+    def finalize_live_output(self, video_path: str, output_path: str) -> str:
+        """
+        Lleva la salida de la codificación en vivo a su ubicación final.
+
+        Sin segmentos mueve el archivo. Con segmentos los une sin recodificar
+        (`recording.segment_join` = "concat") o los conserva junto a una lista
+        .m3u ("playlist"); si la unión falla también se usa la lista.
+
+        Args:
+            video_path: Archivo retornado por stop_recording
+            output_path: Ruta final de la grabación
+
+        Returns:
+            Ruta del archivo final (video o lista de reproducción)
+        """
+        segments = [p for p in self.segment_paths if os.path.exists(p)]
+        if len(segments) <= 1:
+            self._move_into_place(segments[0] if segments else video_path, output_path)
+            return output_path
+
+        join_mode = self.config_manager.get("recording.segment_join", SegmentJoin.CONCAT)
+        if join_mode == SegmentJoin.CONCAT:
+            started = time.perf_counter()
+            # Se une en un archivo aparte: el final solo aparece completo
+            partial = _partial_path(output_path)
+            if self.concat_segments(segments, partial):
+                os.replace(partial, output_path)
+                logger.info(f"{len(segments)} segmentos unidos en {time.perf_counter() - started:.2f}s")
+                for path in segments:
+                    try:
+                        os.remove(path)
+                    except OSError as e:
+                        logger.warning(f"No se pudo eliminar el segmento {path}: {e}")
+                return output_path
+            if os.path.exists(partial):
+                os.remove(partial)
+            logger.warning("No se pudieron unir los segmentos; se conservan con una lista de reproducción")
+        return self.write_segment_playlist(segments, output_path)
+
+    @staticmethod
+    def _move_into_place(source: str, output_path: str) -> None:
+        """Mueve un archivo de forma que el destino nunca quede a medias."""
+        try:
+            # Mismo sistema de archivos: renombrar es atómico
+            os.replace(source, output_path)
+        except OSError:
+            partial = _partial_path(output_path)
+            shutil.copy2(source, partial)
+            os.replace(partial, output_path)
+            os.remove(source)
+
+    def write_segment_playlist(self, segments: List[str], output_path: str) -> str:
+        """
+        Mueve los segmentos junto a `output_path` y escribe una lista .m3u.
+
+        Returns:
+            Ruta de la lista de reproducción
+        """
+        playlist_path = str(Path(output_path).with_suffix(".m3u"))
+        lines = ["#EXTM3U"]
+        for number, path in enumerate(segments, start=1):
+            target = segment_path(output_path, number)
+            shutil.move(path, target)
+            duration = self.probe_media(target).get("duration", -1)
+            lines.append(f"#EXTINF:{int(round(duration))},{Path(target).stem}")
+            lines.append(Path(target).name)
+        with open(playlist_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        logger.info(f"Lista de segmentos guardada: {playlist_path}")
+        return playlist_path
+
+    def concat_segments(self, segments: List[str], output_file: str) -> bool:
+        """
+        Une segmentos con los mismos parámetros copiando los paquetes.
+
+        Usa PyAV y, si no está disponible o falla, el demuxer concat de FFmpeg.
+        """
+        if self._concat_with_pyav(segments, output_file):
+            return True
+        return self._concat_with_ffmpeg(segments, output_file)
+
+    def _concat_with_pyav(self, segments: List[str], output_file: str) -> bool:
+        """Concatena desplazando los timestamps de cada segmento tras el anterior."""
+        try:
+            import av
+            logger.info(f"Uniendo {len(segments)} segmentos con PyAV en '{output_file}'")
+
+            with av.open(output_file, 'w') as output:
+                out_streams = None
+                offsets = None
+                for path in segments:
+                    with av.open(path) as source:
+                        in_streams = [s for s in source.streams if s.type in ('video', 'audio')]
+                        if out_streams is None:
+                            out_streams = [self._add_stream_from_template(output, s) for s in in_streams]
+                            offsets = [0.0] * len(in_streams)
+                        ends = list(offsets)
+                        for packet in source.demux(in_streams):
+                            if packet.dts is None or packet.pts is None:
+                                continue
+                            i = in_streams.index(packet.stream)
+                            shift = int(round(offsets[i] / packet.time_base))
+                            packet.pts += shift
+                            packet.dts += shift
+                            ends[i] = max(ends[i], float((packet.pts + (packet.duration or 0)) * packet.time_base))
+                            packet.stream = out_streams[i]
+                            output.mux(packet)
+                        # El siguiente segmento empieza donde terminó el más largo de sus streams
+                        offsets = [max(ends)] * len(ends)
+            return True
+
+        except ImportError:
+            logger.warning("PyAV (av) no está instalado. Ejecute 'pip install av'")
+            return False
+        except Exception as e:
+            logger.error(f"Error uniendo segmentos con PyAV: {e}")
+            return False
+
+    def _concat_with_ffmpeg(self, segments: List[str], output_file: str) -> bool:
+        """Concatena con el demuxer concat de FFmpeg (-c copy)."""
+        list_file = None
+        try:
+            with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as f:
+                for path in segments:
+                    escaped = os.path.abspath(path).replace("'", "'\\''")
+                    f.write(f"file '{escaped}'\n")
+                list_file = f.name
+            cmd = [
+                self._find_ffmpeg_tool("ffmpeg"),
+                '-f', 'concat', '-safe', '0',
+                '-i', list_file,
+                '-c', 'copy',
+                '-y', output_file
+            ]
+            logger.info(f"Comando FFmpeg: {' '.join(cmd)}")
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+            if result.returncode != 0:
+                logger.error(f"Error uniendo segmentos con FFmpeg (código {result.returncode})")
+                logger.error(f"STDERR: {result.stderr}")
+                return False
+            return True
+        except Exception as e:
+            logger.error(f"Error uniendo segmentos con FFmpeg: {e}")
+            return False
+        finally:
+            if list_file and os.path.exists(list_file):
+                os.remove(list_file)
+
     def combine_audio_video(
         self,
         video_file: str,
@@ -330,6 +1155,12 @@ class ScreenRecorder:
         """
         Combina video y audio usando PyAV, FFmpeg o imageio.
         
+        Si el video ya está en el códec de destino del contenedor se copian
+        los paquetes sin decodificar ni recodificar (remux). La ruta usada y
+        su duración quedan en `self.last_combine_report`. El avance (frames,
+        FPS de codificación y tiempo restante) se informa a
+        `self.progress_callback` mientras se procesa.
+        
         Args:
             video_file: Ruta del archivo de video
             audio_file: Ruta del archivo de audio
@@ -338,7 +1169,21 @@ class ScreenRecorder:
             
         Returns:
             True si se combina exitosamente
+
+        Raises:
+            ProcessingCancelled: Si el callback de progreso pidió cancelar
         """
+        started = time.perf_counter()
+        self.last_combine_report = {}
+        
+        def report(path: str) -> bool:
+            self.last_combine_report = {
+                "path": path,
+                "seconds": round(time.perf_counter() - started, 2),
+            }
+            logger.info(f"Combinación por '{path}' en {self.last_combine_report['seconds']}s")
+            return True
+        
         try:
             self.set_state(RecorderState.PROCESSING)
             
@@ -353,22 +1198,44 @@ class ScreenRecorder:
                 import shutil
                 shutil.copy(video_file, output_file)
                 logger.info(f"Video copiado sin audio: {output_file}")
-                return True
+                return report("copy")
+            
+            # Intento 0: Remux sin recodificar si los streams son compatibles con el contenedor
+            video_info = self.probe_media(video_file)
+            audio_info = self.probe_media(audio_file)
+            if self._can_remux_video(video_info, video_format):
+                copy_audio = audio_info.get("audio_codec") in COPYABLE_AUDIO_CODECS.get(video_format, ())
+                logger.info(
+                    f"Video en '{video_info.get('video_codec')}' compatible con {video_format}: "
+                    f"remux sin recodificar (audio: {'copia' if copy_audio else 'AAC'})"
+                )
+                if self._remux_with_pyav(video_file, audio_file, output_file, copy_audio, video_info):
+                    return report("remux_pyav")
+                try:
+                    if self._remux_with_ffmpeg(video_file, audio_file, output_file, copy_audio, video_info):
+                        return report("remux_ffmpeg")
+                except ProcessingCancelled:
+                    raise
+                except (FileNotFoundError, Exception) as e:
+                    logger.warning(f"Remux con FFmpeg no disponible o falló: {e}")
             
             # Intento 1: Usar PyAV (Nativo, no requiere FFmpeg externo)
-            if self._combine_with_pyav(video_file, audio_file, output_file):
-                return True
-                
+            if self._combine_with_pyav(video_file, audio_file, output_file, video_info):
+                return report("pyav")
+            
             # Intento 2: Usar subprocess con FFmpeg como fallback
             try:
-                if self._combine_with_ffmpeg(video_file, audio_file, output_file):
-                    return True
+                if self._combine_with_ffmpeg(video_file, audio_file, output_file, video_info):
+                    return report("ffmpeg")
+            except ProcessingCancelled:
+                raise
             except (FileNotFoundError, Exception) as e:
                 logger.warning(f"FFmpeg no disponible o falló: {e}")
             
             # Intento 3: Usar imageio como último recurso
             try:
-                return self._combine_with_imageio(video_file, audio_file, output_file)
+                if self._combine_with_imageio(video_file, audio_file, output_file):
+                    return report("imageio")
             except Exception as e:
                 logger.warning(f"imageio no disponible: {e}, guardando solo video")
             
@@ -376,27 +1243,305 @@ class ScreenRecorder:
             import shutil
             shutil.copy(video_file, output_file)
             logger.info(f"Video guardado sin audio (sin librerías de combinación funcionando): {output_file}")
-            return True
-            
+            return report("copy")
+        
+        except ProcessingCancelled:
+            logger.info(f"Combinación cancelada: {output_file}")
+            if os.path.exists(output_file):
+                try:
+                    os.remove(output_file)
+                except OSError as e:
+                    logger.warning(f"No se pudo eliminar la salida parcial {output_file}: {e}")
+            raise
         except Exception as e:
             logger.error(f"Error crítico combinando audio y video: {e}")
             return False
         finally:
             self.set_state(RecorderState.IDLE)
+
+    @staticmethod
+    def _find_ffmpeg_tool(name: str = "ffmpeg") -> str:
+        """Retorna la ruta del ejecutable local de FFmpeg/FFprobe o el del sistema."""
+        local_path = f'{name}.exe' if os.name == 'nt' else f'./{name}'
+        return local_path if os.path.exists(local_path) else name
+
+    def _encoding_profile(self, live: bool = False) -> EncodingProfile:
+        """Perfil de x264 según la calidad de la grabación y `recording.speed_mode`."""
+        speed_mode = self.config_manager.get("recording.speed_mode", SpeedMode.BALANCED)
+        return encoding_profile(self.quality, speed_mode, live=live)
+
+    def _progress_tracker(self, label: str, video_info: Optional[Dict[str, Any]]) -> ProgressTracker:
+        """Crea el ProgressTracker de una ruta de combinación."""
+        return ProgressTracker(label, expected_frames(video_info or {}), self.progress_callback)
+
+    def _run_ffmpeg(self, cmd: List[str], label: str, video_info: Optional[Dict[str, Any]]) -> Tuple[int, str]:
+        """
+        Ejecuta FFmpeg leyendo `-progress pipe:1` para informar el avance.
+
+        El tiempo máximo escala con la duración de la entrada en lugar de un
+        límite fijo.
+
+        Args:
+            cmd: Comando FFmpeg sin las opciones de progreso
+            label: Nombre de la ruta para el progreso
+            video_info: Resultado de probe_media del video de entrada
+
+        Returns:
+            Tupla (código de salida, final de stderr)
+
+        Raises:
+            subprocess.TimeoutExpired: Si se superó el tiempo máximo
+            ProcessingCancelled: Si el callback de progreso pidió cancelar
+        """
+        video_info = video_info or {}
+        tracker = self._progress_tracker(label, video_info)
+        duration = video_info.get("duration")
+        fps = video_info.get("fps")
+        timeout = processing_timeout(duration)
+        cmd = cmd[:1] + ['-progress', 'pipe:1', '-nostats'] + cmd[1:]
+        logger.info(f"Comando FFmpeg: {' '.join(cmd)} (tiempo máximo {timeout:.0f}s)")
+
+        # stderr a un archivo para que no se llene la tubería mientras se lee stdout
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file, text=True)
+            timed_out = []
+
+            def kill_on_timeout():
+                timed_out.append(True)
+                process.kill()
+
+            # readline bloquea si FFmpeg se cuelga: un timer lo termina al vencer el plazo
+            watchdog = Timer(timeout, kill_on_timeout)
+            watchdog.daemon = True
+            watchdog.start()
+            try:
+                for line in process.stdout:
+                    key, _, value = line.strip().partition("=")
+                    if key == "frame" and value.isdigit():
+                        tracker.update(int(value))
+                    elif key == "out_time_us" and value.isdigit() and fps and not tracker.total:
+                        tracker.update(int(int(value) / 1_000_000 * fps))
+                    elif key == "progress" and value == "end":
+                        tracker.finish()
+                process.wait()
+            except ProcessingCancelled:
+                process.kill()
+                process.wait()
+                raise
+            finally:
+                watchdog.cancel()
+
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode("utf-8", errors="replace")[-2000:]
+        if timed_out:
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        return process.returncode, stderr
+
+    def probe_media(self, path: str) -> Dict[str, Any]:
+        """
+        Obtiene códecs, dimensiones y duración de un archivo multimedia.
+        
+        Usa PyAV y, si no está disponible, ffprobe.
+        
+        Args:
+            path: Ruta del archivo
+            
+        Returns:
+            Dict con 'video_codec', 'audio_codec', 'width', 'height', 'fps',
+            'frames' y 'duration' (solo las claves que se pudieron obtener)
+        """
+        info: Dict[str, Any] = {}
+        try:
+            import av
+            with av.open(path) as container:
+                if container.duration:
+                    info["duration"] = container.duration / 1_000_000
+                if container.streams.video:
+                    stream = container.streams.video[0]
+                    info["video_codec"] = stream.codec_context.name
+                    info["width"] = stream.codec_context.width
+                    info["height"] = stream.codec_context.height
+                    rate = stream.average_rate or stream.base_rate
+                    info["fps"] = float(rate) if rate else None
+                    info["frames"] = stream.frames or None
+                if container.streams.audio:
+                    stream = container.streams.audio[0]
+                    info["audio_codec"] = stream.codec_context.name
+                    info["sample_rate"] = stream.rate
+                    info["channels"] = stream.channels
+            return info
+        except ImportError:
+            pass
+        except Exception as e:
+            logger.warning(f"PyAV no pudo analizar {path}: {e}")
+            return info
+        
+        try:
+            import json
+            result = subprocess.run(
+                [self._find_ffmpeg_tool("ffprobe"), '-v', 'error', '-print_format', 'json',
+                 '-show_streams', '-show_format', path],
+                capture_output=True, text=True, timeout=30
+            )
+            data = json.loads(result.stdout or "{}")
+            if data.get("format", {}).get("duration"):
+                info["duration"] = float(data["format"]["duration"])
+            for stream in data.get("streams", []):
+                if stream.get("codec_type") == "video" and "video_codec" not in info:
+                    info["video_codec"] = stream.get("codec_name")
+                    info["width"] = stream.get("width")
+                    info["height"] = stream.get("height")
+                    num, _, den = (stream.get("avg_frame_rate") or "0/1").partition("/")
+                    info["fps"] = float(num) / float(den) if float(den or 0) else None
+                    info["frames"] = int(stream["nb_frames"]) if stream.get("nb_frames") else None
+                elif stream.get("codec_type") == "audio" and "audio_codec" not in info:
+                    info["audio_codec"] = stream.get("codec_name")
+                    info["sample_rate"] = int(stream.get("sample_rate") or 0)
+                    info["channels"] = stream.get("channels")
+        except Exception as e:
+            logger.warning(f"No se pudo analizar {path} con ffprobe: {e}")
+        return info
+
+    @staticmethod
+    def _can_remux_video(video_info: Dict[str, Any], video_format: str) -> bool:
+        """True si el códec de video ya es el de destino para el contenedor."""
+        codec = video_info.get("video_codec")
+        return bool(codec) and codec in REMUX_VIDEO_CODECS.get(video_format, ())
+
+    @staticmethod
+    def _add_stream_from_template(container, stream):
+        """Crea un stream de salida con los parámetros de `stream` (PyAV < 14 y >= 14)."""
+        if hasattr(container, 'add_stream_from_template'):
+            return container.add_stream_from_template(stream)
+        return container.add_stream(template=stream)
+
+    def _remux_with_pyav(
+        self,
+        video_file: str,
+        audio_file: str,
+        output_file: str,
+        copy_audio: bool,
+        video_info: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Copia los paquetes de video sin recodificar; el audio se copia o se codifica a AAC."""
+        try:
+            import av
+            logger.info(f"Remux con PyAV: '{video_file}' + '{audio_file}'")
+            tracker = self._progress_tracker("remux_pyav", video_info)
+            
+            with av.open(video_file) as input_video, av.open(audio_file) as input_audio, \
+                    av.open(output_file, 'w') as output:
+                in_video_stream = input_video.streams.video[0]
+                out_video_stream = self._add_stream_from_template(output, in_video_stream)
+                
+                in_audio_stream = input_audio.streams.audio[0]
+                if copy_audio:
+                    out_audio_stream = self._add_stream_from_template(output, in_audio_stream)
+                else:
+                    out_audio_stream = output.add_stream('aac', rate=in_audio_stream.rate)
+                    out_audio_stream.layout = in_audio_stream.layout
+                
+                v_packets = 0
+                for packet in input_video.demux(in_video_stream):
+                    if packet.dts is None:
+                        continue
+                    packet.stream = out_video_stream
+                    output.mux(packet)
+                    v_packets += 1
+                    tracker.update(v_packets)
+                
+                a_frames = 0
+                if copy_audio:
+                    for packet in input_audio.demux(in_audio_stream):
+                        if packet.dts is None:
+                            continue
+                        packet.stream = out_audio_stream
+                        output.mux(packet)
+                        a_frames += 1
+                else:
+                    resampler = av.AudioResampler(
+                        format='fltp',
+                        layout=in_audio_stream.layout,
+                        rate=in_audio_stream.rate,
+                    )
+                    for packet in input_audio.demux(in_audio_stream):
+                        for frame in packet.decode():
+                            for r_frame in resampler.resample(frame):
+                                r_frame.pts = None
+                                for out_packet in out_audio_stream.encode(r_frame):
+                                    output.mux(out_packet)
+                                    a_frames += 1
+                    for out_packet in out_audio_stream.encode():
+                        output.mux(out_packet)
+            
+            tracker.finish()
+            logger.info(f"Remux PyAV completado. Paquetes de video: {v_packets}, audio: {a_frames}")
+            return True
+        
+        except ImportError:
+            logger.warning("PyAV (av) no está instalado. Ejecute 'pip install av'")
+            return False
+        except ProcessingCancelled:
+            raise
+        except Exception as e:
+            logger.error(f"Error en remux con PyAV: {e}", exc_info=True)
+            return False
+
+    def _remux_with_ffmpeg(
+        self,
+        video_file: str,
+        audio_file: str,
+        output_file: str,
+        copy_audio: bool,
+        video_info: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Remux con FFmpeg copiando el video (-c:v copy)."""
+        logger.info(f"Remux con FFmpeg: '{video_file}' + '{audio_file}'")
+        cmd = [
+            self._find_ffmpeg_tool("ffmpeg"),
+            '-i', video_file,
+            '-i', audio_file,
+            '-map', '0:v:0',
+            '-map', '1:a:0',
+            '-c:v', 'copy',
+            '-c:a', 'copy' if copy_audio else 'aac',
+        ]
+        if not copy_audio:
+            cmd += ['-b:a', '192k']
+        cmd += ['-shortest', '-y', output_file]
+        returncode, stderr = self._run_ffmpeg(cmd, "remux_ffmpeg", video_info)
+        if returncode != 0:
+            logger.error(f"Error en remux FFmpeg (código {returncode})")
+            logger.error(f"STDERR: {stderr}")
+            return False
+        logger.info(f"Video final guardado con remux FFmpeg: {output_file}")
+        return True
     
-    def _combine_with_pyav(self, video_file: str, audio_file: str, output_file: str) -> bool:
+    def _combine_with_pyav(
+        self,
+        video_file: str,
+        audio_file: str,
+        output_file: str,
+        video_info: Optional[Dict[str, Any]] = None
+    ) -> bool:
         """Combina video y audio usando PyAV (no requiere FFmpeg externo)."""
         try:
             import av
-            logger.info(f"Combinando con PyAV: '{video_file}' + '{audio_file}'")
-            
+        except ImportError:
+            logger.warning("PyAV (av) no está instalado. Ejecute 'pip install av'")
+            return False
+        
+        logger.info(f"Combinando con PyAV: '{video_file}' + '{audio_file}'")
+        tracker = self._progress_tracker("pyav", video_info)
+        input_video = input_audio = output = None
+        try:
             # Abrir archivos de entrada
             input_video = av.open(video_file)
             input_audio = av.open(audio_file)
             
             # Crear archivo de salida
             output = av.open(output_file, 'w')
-            
+
             # Configurar stream de video
             try:
                 video_stream = input_video.streams.video[0]
@@ -404,8 +1549,9 @@ class ScreenRecorder:
                 out_video_stream.width = video_stream.width
                 out_video_stream.height = video_stream.height
                 out_video_stream.pix_fmt = 'yuv420p'
-                out_video_stream.options = {'preset': 'fast', 'crf': '23'}
-                logger.info("Stream de video configurado en PyAV")
+                profile = self._encoding_profile()
+                out_video_stream.options = profile.x264_options()
+                logger.info(f"Stream de video configurado en PyAV ({profile})")
             except Exception as ev:
                 logger.error(f"Error configurando video en PyAV: {ev}")
                 return False
@@ -422,16 +1568,19 @@ class ScreenRecorder:
                 logger.error(f"Error configurando audio en PyAV: {ea}")
                 return False
             
-            # Procesar video
+            # Procesar video (el progreso se mide por frames decodificados)
             v_frames = 0
+            decoded = 0
             for packet in input_video.demux(video_stream):
                 for frame in packet.decode():
                     # Es vital resetear timestamps para que empiecen desde 0
-                    frame.pts = None 
+                    frame.pts = None
                     for out_packet in out_video_stream.encode(frame):
                         output.mux(out_packet)
                         v_frames += 1
-            
+                    decoded += 1
+                    tracker.update(decoded)
+
             # Procesar audio
             a_frames = 0
             # AAC suele requerir fltp, creamos un resampler si es necesario
@@ -458,54 +1607,59 @@ class ScreenRecorder:
                 output.mux(out_packet)
             
             # Cerrar archivos
-            input_video.close()
-            input_audio.close()
             output.close()
+            output = None
             
-            logger.info(f"PyAV completado. Frames procesados - Video: {v_frames}, Audio: {a_frames}")
+            report = tracker.finish()
+            logger.info(
+                f"PyAV completado. Frames procesados - Video: {v_frames}, Audio: {a_frames} "
+                f"({report['fps']} fps)"
+            )
             return True
-            
-        except ImportError:
-            logger.warning("PyAV (av) no está instalado. Ejecute 'pip install av'")
-            return False
+        
+        except ProcessingCancelled:
+            raise
         except Exception as e:
             logger.error(f"Error crítico en PyAV: {e}", exc_info=True)
             return False
-    
-    def _combine_with_ffmpeg(self, video_file: str, audio_file: str, output_file: str) -> bool:
+        finally:
+            for container in (output, input_audio, input_video):
+                if container is not None:
+                    try:
+                        container.close()
+                    except Exception:
+                        pass
+
+    def _combine_with_ffmpeg(
+        self,
+        video_file: str,
+        audio_file: str,
+        output_file: str,
+        video_info: Optional[Dict[str, Any]] = None
+    ) -> bool:
         """Combina video y audio usando FFmpeg via subprocess (usa ffmpeg.exe local si existe)."""
         logger.info(f"Combinando con FFmpeg: '{video_file}' + '{audio_file}'")
-        import os
-        ffmpeg_path = 'ffmpeg.exe' if os.name == 'nt' else './ffmpeg'
-        if not os.path.exists(ffmpeg_path):
-            ffmpeg_path = 'ffmpeg'  # fallback al sistema
+        ffmpeg_path = self._find_ffmpeg_tool("ffmpeg")
         cmd = [
             ffmpeg_path,
             '-i', video_file,
             '-i', audio_file,
             '-c:v', 'libx264',      # Re-encodear con H.264 en lugar de copiar
-            '-preset', 'fast',       # Preset rápido para no tardar mucho
-            '-crf', '23',            # Calidad constante (18-28, menor = mejor calidad)
+            *self._encoding_profile().ffmpeg_args(),  # CRF, preset y tune según calidad y modo
             '-c:a', 'aac',
             '-b:a', '192k',          # Bitrate de audio
             '-shortest',             # Terminar cuando el stream más corto termine
             '-y',                    # Sobrescribir archivo de salida
             output_file
         ]
-        logger.info(f"Comando FFmpeg: {' '.join(cmd)}")
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=300
-        )
-        if result.returncode != 0:
-            logger.error(f"Error en FFmpeg (código {result.returncode})")
-            logger.error(f"STDERR: {result.stderr}")
+        returncode, stderr = self._run_ffmpeg(cmd, "ffmpeg", video_info)
+        if returncode != 0:
+            logger.error(f"Error en FFmpeg (código {returncode})")
+            logger.error(f"STDERR: {stderr}")
             return False
         # Mostrar salida de FFmpeg para diagnóstico
-        if result.stderr:
-            logger.info(f"FFmpeg output: {result.stderr[-500:]}")  # Últimos 500 caracteres
+        if stderr:
+            logger.info(f"FFmpeg output: {stderr[-500:]}")  # Últimos 500 caracteres
         logger.info(f"Video final guardado con FFmpeg: {output_file}")
         return True
     
@@ -525,7 +1679,10 @@ class ScreenRecorder:
         audio_data, sr = sf.read(audio_file)
         
         # Crear writer con audio
-        writer = imageio.get_writer(output_file, fps=fps, codec='libx264', pixelformat='yuv420p')
+        writer = imageio.get_writer(
+            output_file, fps=fps, codec='libx264', pixelformat='yuv420p',
+            output_params=self._encoding_profile().ffmpeg_args()
+        )
         
         try:
             # Escribir frames
@@ -0,0 +1,240 @@
+"""
+Estadísticas de rendimiento de una sesión de grabación.
+
+Cada etapa del pipeline registra cuánto tarda por frame (captura, conversión
+de color, escalado, cursor, superposición de cámara y escritura) en un histograma con cubetas
+fijas, de modo que registrar un tiempo no reserva memoria. Junto con los
+contadores de frames descartados, tardíos y overflows de audio permite saber
+por qué una grabación no alcanzó los FPS pedidos.
+"""
+
+import json
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores de las cubetas en milisegundos (la última es abierta)
+HISTOGRAM_BUCKETS_MS = (0.5, 1, 2, 4, 8, 16, 33, 66, 133, 266)
+
+
+class StageTimings:
+    """Etapas del hot path que se cronometran."""
+    GRAB = "grab"
+    CONVERT = "convert"
+    SCALE = "scale"
+    CURSOR = "cursor"
+    OVERLAY = "overlay"
+    WRITE = "write"
+
+    ALL = (GRAB, CONVERT, SCALE, CURSOR, OVERLAY, WRITE)
+
+
+class LatencyHistogram:
+    """Histograma de duraciones con cubetas fijas en milisegundos."""
+
+    def __init__(self, buckets_ms=HISTOGRAM_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Agrega una muestra en segundos."""
+        ms = seconds * 1000
+        index = 0
+        for limit in self.buckets_ms:
+            if ms <= limit:
+                break
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Estima un percentil a partir de las cubetas.
+
+        Args:
+            fraction: Percentil entre 0 y 1
+
+        Returns:
+            Límite superior (ms) de la cubeta que contiene el percentil
+        """
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        accumulated = 0
+        for index, bucket_count in enumerate(self.counts):
+            accumulated += bucket_count
+            if accumulated >= target:
+                if index < len(self.buckets_ms):
+                    return float(self.buckets_ms[index])
+                break
+        return round(self.max * 1000, 2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={limit}ms" for limit in self.buckets_ms] + [f">{self.buckets_ms[-1]}ms"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total * 1000 / self.count, 3) if self.count else 0.0,
+            "p95_ms": self.percentile(0.95),
+            "max_ms": round(self.max * 1000, 2),
+            "histogram": dict(zip(labels, self.counts)),
+        }
+
+
+class RecordingStats:
+    """Tiempos por etapa y contadores de una sesión de grabación."""
+
+    def __init__(self, fps: float):
+        """
+        Args:
+            fps: FPS objetivo de la sesión
+        """
+        self.fps = fps
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self._pause_started: Optional[float] = None
+        self._paused = 0.0
+        self._lock = Lock()
+        self.stages = {stage: LatencyHistogram() for stage in StageTimings.ALL}
+        self.counters: Dict[str, int] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Registra la duración de una etapa para un frame."""
+        with self._lock:
+            self.stages[stage].record(seconds)
+
+    def update_counters(self, **counters: int) -> None:
+        """Actualiza contadores absolutos (frames tardíos, descartes, overflows...)."""
+        with self._lock:
+            self.counters.update(counters)
+
+    def pause(self) -> None:
+        """Marca el inicio de una pausa (no cuenta como tiempo grabado)."""
+        with self._lock:
+            if self._pause_started is None:
+                self._pause_started = time.perf_counter()
+
+    def resume(self) -> None:
+        """Marca el fin de la pausa en curso."""
+        with self._lock:
+            if self._pause_started is not None:
+                self._paused += time.perf_counter() - self._pause_started
+                self._pause_started = None
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+    def paused_time(self) -> float:
+        """Segundos en pausa, incluida la pausa en curso."""
+        paused = self._paused
+        if self._pause_started is not None:
+            paused += time.perf_counter() - self._pause_started
+        return paused
+
+    def recorded_time(self) -> float:
+        """Segundos grabados: tiempo de la sesión sin las pausas."""
+        return max(0.0, self.elapsed() - self.paused_time())
+
+    def effective_fps(self) -> float:
+        """
+        FPS del video producido sobre el tiempo grabado.
+
+        Usa el contador `output_frames` (frames del video, incluidos los
+        duplicados CFR y los frames estáticos omitidos, que el escritor
+        repite); sin él, solo los frames que pasaron por la escritura.
+        """
+        recorded = self.recorded_time()
+        frames = self.counters.get("output_frames", self.stages[StageTimings.WRITE].count)
+        return frames / recorded if recorded > 0 else 0.0
+
+    def bottleneck(self) -> Optional[str]:
+        """Etapa con mayor tiempo medio por frame."""
+        with self._lock:
+            means = {
+                stage: histogram.total / histogram.count
+                for stage, histogram in self.stages.items() if histogram.count
+            }
+        return max(means, key=means.get) if means else None
+
+    def summary(self) -> Dict[str, Any]:
+        """Retorna todas las estadísticas en un diccionario serializable."""
+        with self._lock:
+            stages = {stage: histogram.to_dict() for stage, histogram in self.stages.items()}
+            counters = dict(self.counters)
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "duration_s": round(self.recorded_time(), 2),
+            "paused_s": round(self.paused_time(), 2),
+            "target_fps": self.fps,
+            "effective_fps": round(self.effective_fps(), 2),
+            "bottleneck": self.bottleneck(),
+            "stages": stages,
+            "counters": counters,
+        }
+
+    def format_summary(self) -> str:
+        """Resumen de una línea para mostrar en la interfaz."""
+        summary = self.summary()
+        stages = " | ".join(
+            f"{stage} {data['mean_ms']:.1f}/{data['p95_ms']:.0f}ms"
+            for stage, data in summary["stages"].items() if data["count"]
+        )
+        counters = summary["counters"]
+        return (
+            f"{summary['effective_fps']:.1f}/{self.fps} FPS | {stages or 'sin datos'} | "
+            f"tardíos {counters.get('late_frames', 0)}, "
+            f"descartados {counters.get('dropped_frames', 0)}, "
+            f"overflows audio {counters.get('audio_overflows', 0)}"
+        )
+
+    def save(self, path: str, extra: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Guarda las estadísticas en JSON.
+
+        Args:
+            path: Ruta del archivo JSON
+            extra: Datos adicionales de la sesión (rutas, combinación...)
+
+        Returns:
+            True si se guardó exitosamente
+        """
+        data = self.summary()
+        if extra:
+            data.update(extra)
+        return write_stats_file(path, data)
+
+
+def write_stats_file(path: str, data: Dict[str, Any]) -> bool:
+    """
+    Escribe un resumen de estadísticas en JSON.
+
+    Args:
+        path: Ruta del archivo JSON
+        data: Resumen (RecordingStats.summary() más datos de la sesión)
+
+    Returns:
+        True si se guardó exitosamente
+    """
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+        logger.info(f"Estadísticas de grabación guardadas: {path}")
+        return True
+    except Exception as e:
+        logger.error(f"Error guardando estadísticas: {e}")
+        return False
+
+
+def stats_path_for(output_path: str) -> str:
+    """Ruta del JSON de estadísticas junto al archivo de salida."""
+    return str(Path(output_path).with_suffix(".stats.json"))
@@ -0,0 +1,151 @@
+"""
+Recuperación de grabaciones interrumpidas.
+
+Si la aplicación o el equipo se cierran a mitad de una grabación quedan en
+`grabaciones/tmp` los archivos `tmp_<timestamp>_video*` y
+`tmp_<timestamp>_audio.wav` (y `tmp_<timestamp>_video_monN*` si se grababa
+un archivo por monitor). El video temporal se escribe en Matroska (o MP4
+fragmentado en modo en vivo) y el WAV se vuelca a disco periódicamente, así
+que ambos siguen siendo legibles: este módulo los agrupa por timestamp y los
+convierte en la grabación final. Cada monitor adicional se recupera como
+una grabación aparte; el WAV (modo en dos fases) solo se combina con el
+monitor principal.
+"""
+
+import logging
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import List, Optional
+
+from .wav_writer import repair_wav_header
+
+logger = logging.getLogger(__name__)
+
+VIDEO_EXTENSIONS = (".mkv", ".mp4", ".mov", ".avi")
+
+_TMP_FILE_RE = re.compile(
+    r"^tmp_(?P<key>\d{8}_\d{6})_(?P<kind>video|audio)(?P<monitor>_mon\d+)?(?P<part>_part\d{3})?(?P<ext>\.\w+)$"
+)
+
+
+class OrphanedRecording:
+    """Archivos temporales de una grabación que no llegó a finalizarse."""
+
+    def __init__(self, key: str):
+        """
+        Args:
+            key: Timestamp de la grabación (YYYYmmdd_HHMMSS), con sufijo `_monN`
+                para los monitores adicionales
+        """
+        self.key = key
+        self.video_paths: List[str] = []
+        self.audio_path: Optional[str] = None
+
+    def size_bytes(self) -> int:
+        paths = self.video_paths + ([self.audio_path] if self.audio_path else [])
+        return sum(os.path.getsize(p) for p in paths if os.path.exists(p))
+
+    def describe(self) -> str:
+        parts = f"{len(self.video_paths)} segmentos" if len(self.video_paths) > 1 else "video"
+        audio = " + audio" if self.audio_path else ""
+        return f"{self.key}: {parts}{audio} ({self.size_bytes() / (1024 * 1024):.1f} MB)"
+
+
+def find_orphaned_recordings(tmp_dir: str = "grabaciones/tmp") -> List[OrphanedRecording]:
+    """
+    Busca grabaciones sin finalizar en la carpeta temporal.
+
+    Args:
+        tmp_dir: Carpeta de archivos temporales
+
+    Returns:
+        Grabaciones con al menos un archivo de video, ordenadas por timestamp
+    """
+    folder = Path(tmp_dir)
+    if not folder.is_dir():
+        return []
+
+    found = {}
+    for entry in folder.iterdir():
+        match = _TMP_FILE_RE.match(entry.name)
+        if not match or entry.stat().st_size == 0:
+            continue
+        key = match.group("key") + (match.group("monitor") or "")
+        orphan = found.setdefault(key, OrphanedRecording(key))
+        if match.group("kind") == "audio" and match.group("ext").lower() == ".wav":
+            orphan.audio_path = str(entry)
+        elif match.group("ext").lower() in VIDEO_EXTENSIONS:
+            orphan.video_paths.append(str(entry))
+
+    orphans = []
+    for key in sorted(found):
+        orphan = found[key]
+        if orphan.video_paths:
+            orphan.video_paths.sort()
+            orphans.append(orphan)
+    return orphans
+
+
+def recover_recording(
+    orphan: OrphanedRecording,
+    recorder,
+    output_dir: str = "grabaciones",
+    video_format: str = ".mp4"
+) -> Optional[str]:
+    """
+    Convierte los temporales de una grabación interrumpida en el archivo final.
+
+    - Segmentos: se unen sin recodificar.
+    - Video con audio (codificación en vivo): se remultiplexa para reconstruir
+      el índice del contenedor.
+    - Video + WAV (dos fases): se repara la cabecera del WAV y se combinan.
+
+    Args:
+        orphan: Grabación encontrada por find_orphaned_recordings
+        recorder: ScreenRecorder usado para unir y combinar
+        output_dir: Carpeta de grabaciones
+        video_format: Contenedor final para la ruta en dos fases
+
+    Returns:
+        Ruta del archivo recuperado o None si falló
+    """
+    logger.info(f"Recuperando grabación {orphan.describe()}")
+    video_path = orphan.video_paths[0]
+    info = recorder.probe_media(video_path)
+    live = bool(info.get("audio_codec"))
+
+    extension = Path(video_path).suffix if live else video_format
+    output_path = str(Path(output_dir) / f"recuperado_{orphan.key}{extension}")
+
+    if live:
+        # Remux (también con un único segmento) para reescribir índices truncados
+        if not recorder.concat_segments(orphan.video_paths, output_path):
+            if len(orphan.video_paths) > 1:
+                return None
+            shutil.copy(video_path, output_path)
+            logger.warning(f"No se pudo remultiplexar; se copia el archivo tal cual: {output_path}")
+        temp_files = list(orphan.video_paths)
+    else:
+        if len(orphan.video_paths) > 1:
+            joined = str(Path(video_path).with_name(f"tmp_{orphan.key}_video_joined{Path(video_path).suffix}"))
+            if not recorder.concat_segments(orphan.video_paths, joined):
+                return None
+            video_path = joined
+        audio_path = orphan.audio_path or ""
+        if audio_path and repair_wav_header(audio_path) is None:
+            logger.warning(f"WAV no recuperable, se guarda solo el video: {audio_path}")
+            audio_path = ""
+        if not recorder.combine_audio_video(video_path, audio_path, output_path, video_format):
+            return None
+        temp_files = list(orphan.video_paths) + [video_path] + ([orphan.audio_path] if orphan.audio_path else [])
+
+    for path in set(temp_files):
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            logger.warning(f"No se pudo eliminar el temporal {path}: {e}")
+    logger.info(f"Grabación recuperada: {output_path}")
+    return output_path
@@ -0,0 +1,149 @@
+"""
+Escalado de frames a la resolución de salida (`recording.resolution`).
+
+Codificar a la resolución nativa de un monitor 4K es muy costoso; la etapa
+de procesamiento reduce cada frame antes de la superposición y la
+codificación, así que ambas trabajan con menos píxeles. Las reducciones a la
+mitad exacta (o a un cuarto) usan `cv2.pyrDown`; el resto, `INTER_AREA`
+sobre un buffer reservado de antemano.
+"""
+
+import logging
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Alturas de los objetivos con nombre (se conserva la relación de aspecto)
+RESOLUTION_HEIGHTS = {
+    "2160p": 2160,
+    "1440p": 1440,
+    "1080p": 1080,
+    "720p": 720,
+    "480p": 480,
+}
+
+FULL_RESOLUTION = "Full"
+
+# Niveles de pirámide como máximo (1/2, 1/4, 1/8)
+_MAX_PYRAMID_LEVELS = 3
+
+
+class ScaleMethod:
+    """Método de escalado elegido para una sesión."""
+    NONE = "none"
+    PYRAMID = "pyramid"
+    AREA = "area"
+
+
+def _even(value: float) -> int:
+    # yuv420p necesita dimensiones pares
+    return max(2, int(value) // 2 * 2)
+
+
+def output_size(width: int, height: int, resolution: Optional[str]) -> Tuple[int, int]:
+    """
+    Dimensiones de salida para una región capturada.
+
+    Args:
+        width, height: Dimensiones de la captura
+        resolution: "Full", "1080p"/"720p"/..., "50%" o "1280x720"
+            (caja en la que debe caber); nunca se amplía
+
+    Returns:
+        Tupla (ancho, alto); la captura original si no hay que escalar
+    """
+    value = str(resolution or FULL_RESOLUTION).strip()
+    if value.lower() in ("", "full", "native"):
+        return width, height
+
+    try:
+        if value.endswith("%"):
+            factor = float(value[:-1]) / 100
+        elif value.lower() in RESOLUTION_HEIGHTS:
+            factor = RESOLUTION_HEIGHTS[value.lower()] / height
+        elif "x" in value.lower():
+            box_w, box_h = (int(v) for v in value.lower().split("x", 1))
+            factor = min(box_w / width, box_h / height)
+        else:
+            raise ValueError(value)
+    except (ValueError, ZeroDivisionError):
+        logger.warning(f"Resolución desconocida '{resolution}', se graba a resolución completa")
+        return width, height
+
+    if factor <= 0 or factor >= 1:
+        return width, height
+    return _even(width * factor), _even(height * factor)
+
+
+def _pyramid_levels(src: Tuple[int, int], dst: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+    """Tamaños de cada nivel de pyrDown hasta `dst`, o None si no es una potencia de 1/2."""
+    sizes = []
+    width, height = src
+    for _ in range(_MAX_PYRAMID_LEVELS):
+        # pyrDown admite |2 * destino - origen| <= 2 en cada eje
+        if abs(dst[0] * 2 - width) <= 2 and abs(dst[1] * 2 - height) <= 2:
+            return sizes + [dst]
+        width, height = (width + 1) // 2, (height + 1) // 2
+        if width < dst[0] or height < dst[1]:
+            return None
+        sizes.append((width, height))
+    return None
+
+
+class FrameScaler:
+    """Reduce frames de un tamaño fijo a otro, sin reservar memoria por frame."""
+
+    def __init__(self, src_size: Tuple[int, int], dst_size: Tuple[int, int], channels: int = 3):
+        """
+        Args:
+            src_size: (ancho, alto) de la captura
+            dst_size: (ancho, alto) de salida
+            channels: Canales de los frames
+        """
+        self.src_size = tuple(src_size)
+        self.dst_size = tuple(dst_size)
+        self._levels: List[Tuple[int, int]] = []
+        self._intermediate: List[np.ndarray] = []
+
+        if self.src_size == self.dst_size:
+            self.method = ScaleMethod.NONE
+        else:
+            levels = _pyramid_levels(self.src_size, self.dst_size)
+            if levels:
+                self.method = ScaleMethod.PYRAMID
+                self._levels = levels
+                self._intermediate = [
+                    np.empty((h, w, channels), dtype=np.uint8) for w, h in levels[:-1]
+                ]
+            else:
+                self.method = ScaleMethod.AREA
+        logger.info(f"Escalado {self.src_size} -> {self.dst_size} ({self.method})")
+
+    @property
+    def active(self) -> bool:
+        return self.method != ScaleMethod.NONE
+
+    def scale(self, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        """
+        Escala `src` sobre `dst`.
+
+        Args:
+            src: Frame de tamaño src_size
+            dst: Buffer de tamaño dst_size
+
+        Returns:
+            El propio `dst`
+        """
+        if self.method == ScaleMethod.NONE:
+            np.copyto(dst, src)
+        elif self.method == ScaleMethod.PYRAMID:
+            current = src
+            for size, buffer in zip(self._levels, self._intermediate + [dst]):
+                cv2.pyrDown(current, dst=buffer, dstsize=size)
+                current = buffer
+        else:
+            cv2.resize(src, self.dst_size, dst=dst, interpolation=cv2.INTER_AREA)
+        return dst
@@ -2,38 +2,121 @@
 Gestor de captura de pantalla con soporte para región personalizada.
 """
 
-import mss
 import cv2
 import numpy as np
-from typing import Tuple, Optional
+from typing import Dict, Tuple, Optional
 import logging
 
+from .frame_pool import bgra_to_bgr
+from .capture_backends import CAPTURE_BACKENDS, CaptureBackend, MssBackend, create_capture_backend
+
 logger = logging.getLogger(__name__)
 
+# Tamaño mínimo de una región personalizada
+MIN_REGION_SIZE = 100
+
+
+def align_region(region: dict, bounds: Optional[dict] = None) -> dict:
+    """
+    Ajusta una región a dimensiones pares (yuv420p submuestrea el color 2x2).
+
+    Args:
+        region: Región {'left', 'top', 'width', 'height'}
+        bounds: Si se indica, la región se recorta a este rectángulo
+
+    Returns:
+        Región nueva con ancho y alto pares
+    """
+    left, top = region['left'], region['top']
+    right, bottom = left + region['width'], top + region['height']
+    if bounds is not None:
+        left = max(left, bounds['left'])
+        top = max(top, bounds['top'])
+        right = min(right, bounds['left'] + bounds['width'])
+        bottom = min(bottom, bounds['top'] + bounds['height'])
+    width = max(0, right - left) // 2 * 2
+    height = max(0, bottom - top) // 2 * 2
+    return {'left': left, 'top': top, 'width': width, 'height': height}
+
 
 class ScreenHandler:
     """Maneja la captura de pantalla, incluyendo regiones personalizadas."""
 
-    def __init__(self):
-        """Inicializa el gestor de pantalla."""
-        self.sct = mss.mss()
+    def __init__(self, backend_name: str = MssBackend.name):
+        """
+        Inicializa el gestor de pantalla.
+        
+        Args:
+            backend_name: Backend de captura (ver CAPTURE_BACKENDS)
+        """
+        self.backend_name = backend_name
+        self.backend: Optional[CaptureBackend] = None
         self.region: Optional[dict] = None
 
-    def capture_frame(self, bbox: dict) -> Optional[np.ndarray]:
+    def set_capture_backend(self, backend_name: str) -> None:
+        """
+        Cambia el backend de captura usado por capture_frame.
+        
+        Args:
+            backend_name: Nombre del backend
+        """
+        if backend_name == self.backend_name and self.backend is not None:
+            return
+        if self.backend is not None:
+            self.backend.close()
+            self.backend = None
+        self.backend_name = backend_name
+
+    def create_backend(self) -> CaptureBackend:
+        """Crea un backend nuevo del tipo configurado (uno por hilo de captura)."""
+        return create_capture_backend(self.backend_name)
+
+    def measure_backends(self, bbox: dict, duration: float = 1.0) -> Dict[str, float]:
+        """
+        Mide las capturas por segundo alcanzables con cada backend disponible.
+        
+        Args:
+            bbox: Región a capturar
+            duration: Duración de la medición por backend
+            
+        Returns:
+            Dict {nombre_backend: capturas_por_segundo}
+        """
+        rates = {}
+        for name, backend_cls in CAPTURE_BACKENDS.items():
+            backend = backend_cls()
+            try:
+                backend.open()
+                rates[name] = round(backend.measure_grab_rate(bbox, duration), 1)
+            except Exception as e:
+                logger.info(f"Backend '{name}' no disponible: {e}")
+            finally:
+                try:
+                    backend.close()
+                except Exception:
+                    pass
+        logger.info(f"Tasa de captura por backend: {rates}")
+        return rates
+
+    def capture_frame(self, bbox: dict, dst: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
         """
         Captura un frame de la pantalla.
         
         Args:
             bbox: Bounding box {'left', 'top', 'width', 'height'}
+            dst: Buffer BGR (alto, ancho, 3) donde escribir el frame; si es None
+                se reserva uno nuevo
             
         Returns:
             Frame capturado como array numpy o None si falla
         """
         try:
-            img = self.sct.grab(bbox)
-            frame = np.array(img)
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
-            return frame
+            if self.backend is None:
+                self.backend = self.create_backend()
+            frame = self.backend.grab(bbox)
+            if dst is not None:
+                return bgra_to_bgr(frame, dst)
+            return cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
         except Exception as e:
             logger.error(f"Error capturando pantalla: {e}")
             return None
@@ -55,29 +138,38 @@ class ScreenHandler:
             'height': monitor.height
         }
 
-    def set_custom_region(self, x1: int, y1: int, x2: int, y2: int) -> None:
+    def set_custom_region(
+        self, x1: int, y1: int, x2: int, y2: int, bounds: Optional[dict] = None
+    ) -> Optional[dict]:
         """
         Establece una región personalizada para grabación.
         
+        La región se ajusta a dimensiones pares para que el codificador no
+        tenga que recortar ni rellenar cada frame.
+        
         Args:
-            x1, y1: Coordenadas superior izquierda
-            x2, y2: Coordenadas inferior derecha
+            x1, y1: Coordenadas de una esquina (píxeles físicos)
+            x2, y2: Coordenadas de la esquina opuesta
+            bounds: Escritorio virtual al que recortar la región
+            
+        Returns:
+            La región establecida o None si es demasiado pequeña
         """
-        width = abs(x2 - x1)
-        height = abs(y2 - y1)
+        region = align_region({
+            'left': min(x1, x2),
+            'top': min(y1, y2),
+            'width': abs(x2 - x1),
+            'height': abs(y2 - y1)
+        }, bounds)
         
         # Validar límites mínimos
-        if width < 100 or height < 100:
-            logger.warning("Región muy pequeña (mín 100x100)")
-            return
+        if region['width'] < MIN_REGION_SIZE or region['height'] < MIN_REGION_SIZE:
+            logger.warning(f"Región muy pequeña (mín {MIN_REGION_SIZE}x{MIN_REGION_SIZE})")
+            return None
         
-        self.region = {
-            'left': min(x1, x2),
-            'top': min(y1, y2),
-            'width': width,
-            'height': height
-        }
+        self.region = region
         logger.info(f"Región personalizada establecida: {self.region}")
+        return self.region
 
     def clear_custom_region(self) -> None:
         """Limpia la región personalizada."""
@@ -117,28 +209,3 @@ class ScreenHandler:
         except Exception as e:
             logger.error(f"Error redimensionando frame: {e}")
             return frame
-
-    @staticmethod
-    def apply_quality_filter(frame: np.ndarray, quality: int = 85) -> np.ndarray:
-        """
-        Aplica filtro de calidad básico.
-        
-        Args:
-            frame: Frame a procesar
-            quality: Calidad (1-100)
-            
-        Returns:
-            Frame procesado
-        """
-        try:
-            if quality < 100:
-                # Aplicar ligera compresión para calidad
-                factor = quality / 100
-                # Pequeño blur gaussiano para reducir ruido
-                kernel_size = 3 if quality < 50 else 1
-                if kernel_size > 1:
-                    frame = cv2.GaussianBlur(frame, (kernel_size, kernel_size), 0)
-            return frame
-        except Exception as e:
-            logger.error(f"Error aplicando filtro de calidad: {e}")
-            return frame
@@ -0,0 +1,237 @@
+"""
+Grabación segmentada.
+
+SegmentedWriter reparte la sesión en archivos consecutivos cuando se cumple la
+duración o el tamaño configurado. El segmento saliente se cierra en segundo
+plano mientras la captura sigue en el nuevo, y el siguiente se prepara por
+adelantado; al detener solo queda por cerrar el último segmento. Cada
+segmento es un archivo completo, así que un cierre inesperado pierde como
+mucho el segmento en curso.
+"""
+
+import logging
+import os
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .encoders import FrameWriter
+
+logger = logging.getLogger(__name__)
+
+
+class SegmentJoin:
+    """Qué hacer con los segmentos al detener."""
+    CONCAT = "concat"        # Unir sin recodificar en un único archivo
+    PLAYLIST = "playlist"    # Conservar los segmentos y escribir una lista .m3u
+
+    ALL = (CONCAT, PLAYLIST)
+
+
+def segment_path(path: str, number: int) -> str:
+    """Ruta del segmento `number` (desde 1) de `path`."""
+    p = Path(path)
+    return str(p.with_name(f"{p.stem}_part{number:03d}{p.suffix}"))
+
+
+class SegmentedWriter(FrameWriter):
+    """Escritor que rota el archivo de salida por duración o tamaño."""
+
+    # Cada cuántos frames se consulta el tamaño del segmento en disco
+    SIZE_CHECK_INTERVAL = 30
+    # Segundos antes de reintentar preparar el siguiente segmento tras un fallo
+    PREPARE_RETRY_SECONDS = 5
+    # El segmento en curso guarda su propia copia del último frame
+    KEEPS_LAST_FRAME = False
+
+    def __init__(
+        self,
+        path: str,
+        width: int,
+        height: int,
+        fps: float,
+        writer_factory: Callable[[str], FrameWriter],
+        segment_seconds: float = 0,
+        segment_max_bytes: int = 0
+    ):
+        """
+        Args:
+            path: Ruta base; los segmentos se llaman `<nombre>_partNNN<ext>`
+            width, height: Dimensiones del video
+            fps: Frames por segundo
+            writer_factory: Crea el escritor de un segmento a partir de su ruta
+            segment_seconds: Duración máxima de cada segmento (0 = sin límite)
+            segment_max_bytes: Tamaño máximo de cada segmento (0 = sin límite)
+        """
+        super().__init__(path, width, height, fps)
+        self.writer_factory = writer_factory
+        self.segment_frames = int(segment_seconds * fps) if segment_seconds > 0 else 0
+        self.segment_max_bytes = segment_max_bytes
+        self.segments: List[str] = []
+
+        self._lock = Lock()
+        self._finalizers: List[Thread] = []
+        self._closed_stats: List[Dict[str, int]] = []
+        self._next: Optional[FrameWriter] = None
+        self._next_thread: Optional[Thread] = None
+        self._next_error: Optional[Exception] = None
+        self._prepare_failures = 0
+        self._retry_slot = 0
+        self._segment_start = 0
+        self._frames_since_check = 0
+
+        # El primer segmento se crea aquí para que los errores lleguen al llamador
+        self._current = self._open_segment()
+        self._prepare_next()
+        logger.info(
+            f"Grabación segmentada: {self.segment_frames / fps if self.segment_frames else '-'} s, "
+            f"{segment_max_bytes // (1024 * 1024) if segment_max_bytes else '-'} MB por segmento"
+        )
+
+    def _open_segment(self) -> FrameWriter:
+        path = segment_path(self.path, len(self.segments) + 1)
+        writer = self.writer_factory(path)
+        self.segments.append(path)
+        return writer
+
+    def _prepare_next(self) -> None:
+        """Crea el escritor del siguiente segmento en un hilo (abrir un codificador puede tardar)."""
+        path = segment_path(self.path, len(self.segments) + 1)
+
+        def prepare():
+            try:
+                self._next = self.writer_factory(path)
+            except Exception as e:
+                self._next_error = e
+
+        self._next = None
+        self._next_error = None
+        self._next_thread = Thread(target=prepare, name="segment-prepare", daemon=True)
+        self._next_thread.start()
+
+    def _take_next(self, index: int) -> Optional[FrameWriter]:
+        """
+        Recoge el escritor preparado para el siguiente segmento.
+
+        Returns:
+            El escritor, o None si no se pudo crear; en ese caso se sigue
+            escribiendo en el segmento actual y se reintenta más tarde
+        """
+        self._next_thread.join()
+        self._next_thread = None
+        if self._next_error is not None:
+            self._prepare_failures += 1
+            if self._prepare_failures == 1:
+                logger.error(f"No se pudo preparar el siguiente segmento; se continúa en el actual: {self._next_error}")
+            else:
+                logger.debug(f"Reintento {self._prepare_failures} del siguiente segmento fallido: {self._next_error}")
+            self._next_error = None
+            self._retry_slot = index + max(1, int(self.PREPARE_RETRY_SECONDS * self.fps))
+            return None
+        if self._prepare_failures:
+            logger.info(f"Siguiente segmento preparado tras {self._prepare_failures} intentos fallidos")
+            self._prepare_failures = 0
+        self.segments.append(segment_path(self.path, len(self.segments) + 1))
+        return self._next
+
+    def _should_rotate(self, index: int) -> bool:
+        if self._next_thread is None:
+            # La preparación anterior falló: reintentar pasado el plazo sin bloquear
+            if index >= self._retry_slot:
+                self._prepare_next()
+            return False
+        if self._next_thread.is_alive():
+            # El siguiente segmento aún no está listo: el actual se alarga un poco
+            return False
+        if self.segment_frames and index - self._segment_start >= self.segment_frames:
+            return True
+        if self.segment_max_bytes:
+            self._frames_since_check += 1
+            if self._frames_since_check >= self.SIZE_CHECK_INTERVAL:
+                self._frames_since_check = 0
+                try:
+                    return os.path.getsize(self.segments[-1]) >= self.segment_max_bytes
+                except OSError:
+                    return False
+        return False
+
+    def _rotate(self, index: int) -> None:
+        """Cierra el segmento actual en `index` y continúa en el siguiente."""
+        incoming = self._take_next(index)
+        if incoming is None:
+            return
+        outgoing = self._current
+        # El segmento saliente dura exactamente hasta el slot de corte
+        outgoing.finish(index - self._segment_start)
+        with self._lock:
+            self._current = incoming
+            self._segment_start = index
+        self._frames_since_check = 0
+
+        finalizer = Thread(target=self._finalize, args=(outgoing, self.segments[-2]), daemon=True)
+        finalizer.start()
+        self._finalizers.append(finalizer)
+        self._prepare_next()
+
+    def _finalize(self, writer: FrameWriter, path: str) -> None:
+        try:
+            writer.close()
+            self._closed_stats.append(writer.get_stats())
+            logger.info(f"Segmento finalizado: {path}")
+        except Exception as e:
+            logger.error(f"Error finalizando segmento {path}: {e}")
+
+    def _write(self, frame: np.ndarray, index: int) -> None:
+        if self._should_rotate(index):
+            self._rotate(index)
+        self._current.write_frame(frame, index - self._segment_start)
+
+    def write_audio(self, data: bytes) -> None:
+        """Entrega el audio al segmento en curso."""
+        with self._lock:
+            writer = self._current
+            if writer is not None and hasattr(writer, 'write_audio'):
+                writer.write_audio(data)
+
+    def finish(self, final_slot: Optional[int] = None) -> None:
+        if final_slot is None or final_slot <= self.next_slot:
+            return
+        self._current.finish(final_slot - self._segment_start)
+        self.next_slot = final_slot
+
+    def close(self) -> None:
+        with self._lock:
+            writer, self._current = self._current, None
+        if writer is None:
+            return
+        self._finalize(writer, self.segments[-1])
+
+        # Descartar el segmento preparado que no llegó a usarse
+        if self._next_thread is not None:
+            self._next_thread.join()
+            if self._next is not None:
+                unused = segment_path(self.path, len(self.segments) + 1)
+                try:
+                    self._next.close()
+                    os.remove(unused)
+                except Exception as e:
+                    logger.warning(f"No se pudo eliminar el segmento sin usar {unused}: {e}")
+            self._next = None
+
+        for finalizer in self._finalizers:
+            finalizer.join()
+        self._finalizers = []
+        logger.info(f"Grabación segmentada cerrada: {len(self.segments)} segmentos")
+
+    def get_stats(self) -> Dict[str, int]:
+        stats = [dict(s) for s in self._closed_stats]
+        writer = self._current
+        if writer is not None:
+            stats.append(writer.get_stats())
+        return {
+            "written_frames": sum(s.get("written_frames", 0) for s in stats),
+            "duplicated_frames": sum(s.get("duplicated_frames", 0) for s in stats),
+            "segments": len(self.segments),
+        }
@@ -0,0 +1,177 @@
+"""
+Escritor WAV incremental.
+
+Escribe el audio en disco a medida que se captura y ajusta los tamaños de la
+cabecera al cerrar. Reserva un chunk JUNK de 28 bytes tras la cabecera RIFF
+para poder convertirlo en chunk ds64 (formato RF64) si el archivo supera los
+4 GB que admite WAV.
+"""
+
+import os
+import struct
+import logging
+from threading import Lock
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_MAX_RIFF_SIZE = 0xFFFFFFFF
+_DS64_SIZE = 28  # riffSize(8) + dataSize(8) + sampleCount(8) + tableLength(4)
+
+
+class StreamingWavWriter:
+    """Escribe PCM en un archivo WAV/RF64 sin acumularlo en memoria."""
+
+    def __init__(self, path: str, channels: int, sample_rate: int, sample_width: int = 2):
+        """
+        Args:
+            path: Ruta del archivo WAV
+            channels: Número de canales
+            sample_rate: Frecuencia de muestreo
+            sample_width: Bytes por muestra (2 = 16 bits)
+        """
+        self.path = path
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.data_bytes = 0
+        self._lock = Lock()
+        self._file = open(path, 'wb')
+        self._write_header()
+
+    def _write_header(self) -> None:
+        block_align = self.channels * self.sample_width
+        fmt_chunk = struct.pack(
+            '<HHIIHH',
+            1,                                   # PCM
+            self.channels,
+            self.sample_rate,
+            self.sample_rate * block_align,      # Bytes por segundo
+            block_align,
+            self.sample_width * 8
+        )
+        header = b''.join([
+            b'RIFF', struct.pack('<I', 0), b'WAVE',
+            b'JUNK', struct.pack('<I', _DS64_SIZE), b'\x00' * _DS64_SIZE,
+            b'fmt ', struct.pack('<I', len(fmt_chunk)), fmt_chunk,
+            b'data', struct.pack('<I', 0),
+        ])
+        self._file.write(header)
+        self._data_size_offset = len(header) - 4
+        self._header_size = len(header)
+
+    def write(self, data: bytes) -> None:
+        """Agrega un bloque PCM al final del archivo."""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(data)
+            self.data_bytes += len(data)
+
+    def checkpoint(self) -> None:
+        """
+        Actualiza la cabecera con los tamaños actuales y vacía a disco.
+
+        Así un archivo truncado por un cierre inesperado sigue siendo legible.
+        """
+        with self._lock:
+            if self._file is None:
+                return
+            self._patch_header()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _patch_header(self) -> None:
+        riff_size = self._header_size - 8 + self.data_bytes
+        position = self._file.tell()
+
+        if riff_size > _MAX_RIFF_SIZE:
+            # RF64: los tamaños reales van en el chunk ds64
+            frame_count = self.data_bytes // (self.channels * self.sample_width)
+            self._file.seek(0)
+            self._file.write(b'RF64' + struct.pack('<I', _MAX_RIFF_SIZE) + b'WAVE')
+            self._file.write(b'ds64' + struct.pack('<I', _DS64_SIZE))
+            self._file.write(struct.pack('<QQQI', riff_size, self.data_bytes, frame_count, 0))
+            self._file.seek(self._data_size_offset)
+            self._file.write(struct.pack('<I', _MAX_RIFF_SIZE))
+        else:
+            self._file.seek(4)
+            self._file.write(struct.pack('<I', riff_size))
+            self._file.seek(self._data_size_offset)
+            self._file.write(struct.pack('<I', self.data_bytes))
+
+        self._file.seek(position)
+
+    def close(self) -> None:
+        """Ajusta la cabecera y cierra el archivo."""
+        with self._lock:
+            if self._file is None:
+                return
+            self._patch_header()
+            self._file.close()
+            self._file = None
+        logger.info(f"Audio guardado en disco: {self.path} ({self.data_bytes} bytes de datos)")
+
+
+def repair_wav_header(path: str) -> Optional[int]:
+    """
+    Ajusta los tamaños de la cabecera de un WAV al tamaño real del archivo.
+
+    Sirve para recuperar el audio de una grabación interrumpida: la cabecera
+    solo refleja el último checkpoint, pero los datos escritos después siguen
+    en el archivo.
+
+    Args:
+        path: Ruta del archivo WAV/RF64
+
+    Returns:
+        Bytes de datos de audio tras la reparación, o None si no es un WAV válido
+    """
+    try:
+        file_size = os.path.getsize(path)
+        with open(path, 'r+b') as f:
+            riff = f.read(12)
+            if len(riff) < 12 or riff[:4] not in (b'RIFF', b'RF64') or riff[8:12] != b'WAVE':
+                return None
+
+            block_align = 1
+            ds64_offset = None
+            while True:
+                chunk_offset = f.tell()
+                chunk = f.read(8)
+                if len(chunk) < 8:
+                    return None
+                chunk_id, chunk_size = chunk[:4], struct.unpack('<I', chunk[4:])[0]
+                if chunk_id == b'data':
+                    data_offset = f.tell()
+                    break
+                if chunk_id in (b'ds64', b'JUNK') and chunk_size == _DS64_SIZE:
+                    ds64_offset = chunk_offset
+                elif chunk_id == b'fmt ':
+                    fmt = f.read(chunk_size)
+                    block_align = struct.unpack('<H', fmt[12:14])[0] or 1
+                f.seek(chunk_offset + 8 + chunk_size + (chunk_size & 1))
+
+            data_bytes = file_size - data_offset
+            data_bytes -= data_bytes % block_align
+            riff_size = data_offset - 8 + data_bytes
+
+            if riff_size > _MAX_RIFF_SIZE and ds64_offset is not None:
+                frame_count = data_bytes // block_align
+                f.seek(0)
+                f.write(b'RF64' + struct.pack('<I', _MAX_RIFF_SIZE))
+                f.seek(ds64_offset)
+                f.write(b'ds64' + struct.pack('<I', _DS64_SIZE))
+                f.write(struct.pack('<QQQI', riff_size, data_bytes, frame_count, 0))
+                f.seek(data_offset - 4)
+                f.write(struct.pack('<I', _MAX_RIFF_SIZE))
+            else:
+                f.seek(4)
+                f.write(struct.pack('<I', min(riff_size, _MAX_RIFF_SIZE)))
+                f.seek(data_offset - 4)
+                f.write(struct.pack('<I', min(data_bytes, _MAX_RIFF_SIZE)))
+        logger.info(f"Cabecera WAV reparada: {path} ({data_bytes} bytes de datos)")
+        return data_bytes
+    except Exception as e:
+        logger.error(f"Error reparando WAV {path}: {e}")
+        return None
@@ -0,0 +1,104 @@
+"""
+Lector asíncrono de la cámara web.
+
+`VideoCapture.read()` bloquea hasta que la cámara entrega el siguiente frame
+(unos 33 ms a 30 FPS). Este lector lo llama en su propio hilo y publica solo
+el frame más reciente en un slot, de modo que la superposición lo toma sin
+esperar y la captura de pantalla no queda limitada al ritmo de la cámara.
+"""
+
+import logging
+import time
+from threading import Event, Lock, Thread
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class WebcamReader:
+    """Lee la cámara en un hilo y conserva el último frame con su número de secuencia."""
+
+    def __init__(
+        self,
+        capture,
+        preview_callback: Optional[Callable[[np.ndarray], None]] = None,
+        preview_fps: float = 10
+    ):
+        """
+        Args:
+            capture: cv2.VideoCapture ya abierto
+            preview_callback: Función que recibe frames para el preview de la UI
+            preview_fps: Frecuencia máxima de llamadas a `preview_callback`
+        """
+        self.capture = capture
+        self.preview_callback = preview_callback
+        self.preview_interval = 1.0 / preview_fps if preview_fps > 0 else 0.0
+        self.frames_read = 0
+        self.read_errors = 0
+        self._frame: Optional[np.ndarray] = None
+        self._sequence = 0
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self._last_preview = 0.0
+
+    def start(self) -> None:
+        """Inicia el hilo de lectura."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="webcam", daemon=True)
+        self._thread.start()
+        logger.info("Lector de cámara iniciado")
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Detiene el hilo de lectura (no libera la cámara)."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+        logger.info(f"Lector de cámara detenido: {self.frames_read} frames leídos, {self.read_errors} errores")
+
+    def latest(self) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        Retorna el último frame sin bloquear.
+
+        Returns:
+            Tupla (secuencia, frame); la secuencia cambia con cada frame nuevo
+            y el frame es None si todavía no llegó ninguno
+        """
+        with self._lock:
+            return self._sequence, self._frame
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                ret, frame = self.capture.read()
+            except Exception as e:
+                logger.error(f"Error leyendo webcam: {e}")
+                ret, frame = False, None
+
+            if not ret or frame is None:
+                # Evitar un bucle activo si la cámara deja de entregar frames
+                self.read_errors += 1
+                self._stop.wait(0.01)
+                continue
+
+            # read() entrega un array nuevo en cada llamada, así que publicar
+            # la referencia es seguro: nadie lo modifica después
+            with self._lock:
+                self._frame = frame
+                self._sequence += 1
+            self.frames_read += 1
+
+            if self.preview_callback is not None:
+                now = time.monotonic()
+                if now - self._last_preview >= self.preview_interval:
+                    self._last_preview = now
+                    try:
+                        self.preview_callback(frame)
+                    except Exception as e:
+                        logger.error(f"Error en preview de cámara: {e}")
@@ -0,0 +1,281 @@
+"""
+Captura de una ventana concreta en X11.
+
+La ventana se elige entre las que publica el gestor de ventanas (EWMH,
+`_NET_CLIENT_LIST`) y su posición se consulta por xcb mientras se graba: la
+región capturada sigue a la ventana cuando se mueve o cambia de tamaño y no
+incluye nada fuera de ella (ni el resto del monitor ni las decoraciones).
+
+El video tiene un tamaño fijo (el de la ventana al empezar, escalado a
+`recording.resolution`); si la ventana cambia de tamaño su contenido se
+reescala dentro de ese lienzo con franjas negras en lugar de reiniciar el
+escritor. Requiere `xcffib`.
+"""
+
+import logging
+import os
+import struct
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .frame_pool import bgra_to_bgr
+from .screen_handler import align_region
+
+logger = logging.getLogger(__name__)
+
+# Segundos entre consultas de la geometría de la ventana
+DEFAULT_POLL_INTERVAL = 0.2
+
+# Estado "visible" de GetWindowAttributes (xcb_map_state_t)
+_MAP_STATE_VIEWABLE = 2
+
+
+def is_supported() -> bool:
+    """Indica si se puede seguir ventanas (sesión X11 con xcffib instalado)."""
+    if os.name == 'nt' or not os.environ.get("DISPLAY"):
+        return False
+    try:
+        import xcffib  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class WindowInfo:
+    """Ventana de nivel superior publicada por el gestor de ventanas."""
+
+    def __init__(self, window_id: int, title: str):
+        """
+        Args:
+            window_id: Identificador X11 de la ventana cliente
+            title: Título de la ventana
+        """
+        self.window_id = window_id
+        self.title = title
+
+    def __repr__(self) -> str:
+        return f"WindowInfo(0x{self.window_id:x}, {self.title!r})"
+
+
+class _X11Connection:
+    """Conexión xcb con utilidades de propiedades EWMH."""
+
+    def __init__(self, display: Optional[str] = None):
+        import xcffib
+        import xcffib.xproto
+
+        self.xproto = xcffib.xproto
+        self.conn = xcffib.connect(display=display)
+        screen = self.conn.get_setup().roots[self.conn.pref_screen]
+        self.root = screen.root
+        self.root_bbox = {'left': 0, 'top': 0, 'width': screen.width_in_pixels, 'height': screen.height_in_pixels}
+        self._atoms: Dict[str, int] = {}
+
+    def atom(self, name: str) -> int:
+        if name not in self._atoms:
+            self._atoms[name] = self.conn.core.InternAtom(False, len(name), name).reply().atom
+        return self._atoms[name]
+
+    def get_property(self, window: int, name: str, prop_type: int, length: int = 1024) -> bytes:
+        reply = self.conn.core.GetProperty(False, window, self.atom(name), prop_type, 0, length).reply()
+        return reply.value.buf() if reply.value_len else b""
+
+    def get_windows(self, window: int, name: str) -> List[int]:
+        data = self.get_property(window, name, self.xproto.Atom.WINDOW)
+        return list(struct.unpack(f"{len(data) // 4}I", data))
+
+    def get_title(self, window: int) -> str:
+        title = self.get_property(window, "_NET_WM_NAME", self.atom("UTF8_STRING"))
+        if not title:
+            title = self.get_property(window, "WM_NAME", self.xproto.Atom.STRING)
+        return title.decode("utf-8", errors="replace")
+
+    def geometry(self, window: int) -> Optional[Dict[str, int]]:
+        """Región de la ventana en coordenadas de la raíz, o None si no es visible."""
+        attributes = self.conn.core.GetWindowAttributes(window).reply()
+        if attributes.map_state != _MAP_STATE_VIEWABLE:
+            return None
+        size = self.conn.core.GetGeometry(window).reply()
+        position = self.conn.core.TranslateCoordinates(window, self.root, 0, 0).reply()
+        return {'left': position.dst_x, 'top': position.dst_y, 'width': size.width, 'height': size.height}
+
+    def disconnect(self) -> None:
+        self.conn.disconnect()
+
+
+def list_windows(display: Optional[str] = None) -> List[WindowInfo]:
+    """
+    Lista las ventanas de aplicación visibles.
+
+    Args:
+        display: Display de X11 (None usa $DISPLAY)
+
+    Returns:
+        Ventanas con título, en el orden del gestor de ventanas
+    """
+    x11 = _X11Connection(display)
+    try:
+        windows = []
+        for window_id in x11.get_windows(x11.root, "_NET_CLIENT_LIST"):
+            try:
+                title = x11.get_title(window_id)
+                if title and x11.geometry(window_id) is not None:
+                    windows.append(WindowInfo(window_id, title))
+            except Exception as e:
+                # La ventana puede cerrarse mientras se recorre la lista
+                logger.debug(f"Ventana 0x{window_id:x} omitida: {e}")
+        return windows
+    finally:
+        x11.disconnect()
+
+
+class WindowTracker:
+    """
+    Sigue la posición y el tamaño de una ventana durante la grabación.
+
+    La geometría se consulta como mucho cada `poll_interval` segundos; entre
+    consultas se reutiliza la última. La conexión se abre en el hilo de
+    captura, igual que los backends.
+    """
+
+    def __init__(
+        self,
+        window_id: int,
+        display: Optional[str] = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL
+    ):
+        """
+        Args:
+            window_id: Identificador X11 de la ventana
+            display: Display de X11 (None usa $DISPLAY)
+            poll_interval: Segundos entre consultas de geometría
+        """
+        self.window_id = window_id
+        self.display = display
+        self.poll_interval = poll_interval
+        self.closed = False
+        self.moves = 0
+        self.resizes = 0
+        self._x11: Optional[_X11Connection] = None
+        self._bbox: Optional[Dict[str, int]] = None
+        self._next_poll = 0.0
+
+    def open(self) -> None:
+        self._x11 = _X11Connection(self.display)
+
+    def close(self) -> None:
+        if self._x11 is not None:
+            self._x11.disconnect()
+            self._x11 = None
+
+    def query_bbox(self) -> Optional[Dict[str, int]]:
+        """
+        Consulta la región visible de la ventana.
+
+        Returns:
+            Región recortada a la pantalla, o None si la ventana está
+            minimizada, fuera de pantalla o se cerró
+        """
+        if self._x11 is None:
+            self.open()
+        try:
+            geometry = self._x11.geometry(self.window_id)
+        except Exception as e:
+            if not self.closed:
+                logger.warning(f"La ventana 0x{self.window_id:x} ya no existe: {e}")
+            self.closed = True
+            return None
+        if geometry is None:
+            return None
+        bbox = align_region(geometry, self._x11.root_bbox)
+        if bbox['width'] < 2 or bbox['height'] < 2:
+            return None
+        return bbox
+
+    def current_bbox(self) -> Optional[Dict[str, int]]:
+        """Región actual de la ventana, consultando al servidor X si toca."""
+        if self.closed:
+            return None
+        now = time.monotonic()
+        if now < self._next_poll:
+            return self._bbox
+        self._next_poll = now + self.poll_interval
+
+        bbox = self.query_bbox()
+        previous = self._bbox
+        if bbox is not None and previous is not None:
+            if (bbox['width'], bbox['height']) != (previous['width'], previous['height']):
+                self.resizes += 1
+                logger.info(f"Ventana redimensionada a {bbox['width']}x{bbox['height']}")
+            elif (bbox['left'], bbox['top']) != (previous['left'], previous['top']):
+                self.moves += 1
+        self._bbox = bbox
+        return bbox
+
+
+class LetterboxFitter:
+    """
+    Ajusta frames BGRA de tamaño variable a un lienzo BGR fijo.
+
+    El contenido se reduce conservando la relación de aspecto (nunca se
+    amplía) y se centra con franjas negras. La distribución se recalcula
+    solo cuando cambia el tamaño de la ventana.
+    """
+
+    def __init__(self, canvas_size: Tuple[int, int]):
+        """
+        Args:
+            canvas_size: (ancho, alto) del video
+        """
+        self.canvas_size = tuple(canvas_size)
+        self._src_size: Optional[Tuple[int, int]] = None
+        self._rect = (0, 0, 0, 0)
+        self._factor = 1.0
+        self._resized: Optional[np.ndarray] = None
+
+    def _layout(self, width: int, height: int) -> None:
+        canvas_w, canvas_h = self.canvas_size
+        factor = min(canvas_w / width, canvas_h / height, 1.0)
+        fit_w = min(canvas_w, max(1, round(width * factor)))
+        fit_h = min(canvas_h, max(1, round(height * factor)))
+        self._rect = ((canvas_w - fit_w) // 2, (canvas_h - fit_h) // 2, fit_w, fit_h)
+        self._factor = factor
+        self._resized = np.empty((fit_h, fit_w, 4), dtype=np.uint8) if factor < 1.0 else None
+        self._src_size = (width, height)
+
+    def fit(self, raw: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        """
+        Escribe `raw` (BGRA) centrado en `dst` (BGR del tamaño del lienzo).
+
+        Returns:
+            El propio `dst`
+        """
+        height, width = raw.shape[:2]
+        if (width, height) == self.canvas_size:
+            self._src_size = None
+            return bgra_to_bgr(raw, dst)
+        if (width, height) != self._src_size:
+            self._layout(width, height)
+
+        x, y, fit_w, fit_h = self._rect
+        # El buffer viene del pool con contenido anterior: limpiar las franjas
+        dst[:y] = 0
+        dst[y + fit_h:] = 0
+        dst[y:y + fit_h, :x] = 0
+        dst[y:y + fit_h, x + fit_w:] = 0
+
+        source = raw
+        if self._resized is not None:
+            # Reducir antes de quitar el alfa: la conversión toca menos píxeles
+            source = cv2.resize(raw, (fit_w, fit_h), dst=self._resized, interpolation=cv2.INTER_AREA)
+        np.copyto(dst[y:y + fit_h, x:x + fit_w], source[..., :3])
+        return dst
+
+    def map_point(self, x: float, y: float) -> Tuple[float, float]:
+        """Convierte un punto de la ventana al lienzo, según el último `fit`."""
+        if self._src_size is None:
+            return x, y
+        return self._rect[0] + x * self._factor, self._rect[1] + y * self._factor
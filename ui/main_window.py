@@ -3,7 +3,7 @@ Ventana principal de la aplicación.
 """
 
 from PyQt6 import QtWidgets, QtCore
-from PyQt6.QtWidgets import QMainWindow, QVBoxLayout, QWidget, QTabWidget, QMessageBox
+from PyQt6.QtWidgets import QMainWindow, QVBoxLayout, QWidget, QTabWidget, QMessageBox, QInputDialog
 from PyQt6.QtGui import QIcon, QShortcut, QKeySequence
 from PyQt6.QtCore import Qt, pyqtSignal, QObject, QTimer
 from screeninfo import get_monitors
@@ -13,6 +13,11 @@ from threading import Thread
 from datetime import datetime
 from pathlib import Path
 
+from logic import window_tracker
+from logic.job_queue import JobKind, JobPriority, JobQueue, JobStatus, PostProcessJob, build_finalize_job
+from logic.multi_monitor import virtual_bbox
+from logic.recovery import find_orphaned_recordings
+from ui.region_selector import RegionSelector
 from ui.tabs import RecordingTab, SettingsTab, LogsTab
 from ui.styles import WINDOW_WIDTH, WINDOW_HEIGHT
 
@@ -27,6 +32,8 @@ class Communicate(QObject):
     recording_state_signal = pyqtSignal(bool)
     paused_state_signal = pyqtSignal(bool)
     webcam_frame_signal = pyqtSignal(object)  # Nueva señal para frames de cámara
+    job_signal = pyqtSignal(object)  # Copia de un PostProcessJob actualizado
+    recording_stopped_signal = pyqtSignal(object)  # Resultado de detener la grabación (dict)
 
 
 class MainWindow(QMainWindow):
@@ -52,9 +59,11 @@ class MainWindow(QMainWindow):
         
         # Variables para control de grabación
         self.recording_thread = None
+        self.stop_thread = None  # Detiene la grabación fuera del hilo de la interfaz
         self.recording_active = False
         self.current_video_path = None
         self.current_audio_path = None
+        self.selected_window = None  # Ventana X11 a seguir (WindowInfo)
 
         # Conectar señales
         self.comm.log_signal.connect(self.log)
@@ -62,17 +71,39 @@ class MainWindow(QMainWindow):
         self.comm.status_signal.connect(self.update_status)
         self.comm.recording_state_signal.connect(self.on_recording_state_changed)
         self.comm.paused_state_signal.connect(self.on_paused_state_changed)
+        self.comm.job_signal.connect(self.on_job_updated)
+        self.comm.recording_stopped_signal.connect(self.on_recording_stopped)
+
+        # Cola de postprocesamiento (combinar, unir segmentos, recuperar)
+        self.job_queue = JobQueue(
+            state_file="grabaciones/jobs.json",
+            workers=config_manager.get("processing.workers", 1),
+            config_file=str(config_manager.config_file),
+            on_update=lambda job: self.comm.job_signal.emit(PostProcessJob.from_dict(job.to_dict()))
+        )
 
         # Timer para actualizar contador
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_elapsed_time)
 
+        # Timer para el resumen de rendimiento en la pestaña de registro
+        self.stats_timer = QTimer()
+        self.stats_timer.timeout.connect(self.update_live_stats)
+
         # Obtener monitores
         self.monitors = get_monitors()
 
         # Crear interfaz
         self.init_ui()
 
+        # Mostrar la cola guardada y retomar los trabajos pendientes
+        for job in self.job_queue.get_jobs():
+            self.logs_tab.update_job(job.id, job.format_status())
+        self.job_queue.start()
+
+        # Buscar grabaciones interrumpidas cuando la ventana ya está visible
+        QTimer.singleShot(500, self.check_orphaned_recordings)
+
         logger.info("Aplicación iniciada")
 
     def init_ui(self):
@@ -103,12 +134,18 @@ class MainWindow(QMainWindow):
         self.recording_tab.screen_selected.connect(self.on_screen_selected)
         self.recording_tab.recording_toggled.connect(self.on_recording_toggled)
         self.recording_tab.paused_toggled.connect(self.on_paused_toggled)
+        self.recording_tab.set_monitor_mode(self.config_manager.get("recording.monitor_mode", "single"))
+        self.recording_tab.monitor_mode_changed.connect(self.on_monitor_mode_changed)
+        self.recording_tab.region_requested.connect(self.on_region_requested)
+        self.recording_tab.region_cleared.connect(self.on_region_cleared)
+        self.recording_tab.window_requested.connect(self.on_window_requested)
 
         self.settings_tab = SettingsTab(self.config_manager, self.audio_handler)
         self.settings_tab.fps_changed.connect(self.on_fps_changed)
         self.settings_tab.location_selected.connect(self.on_location_selected)
 
         self.logs_tab = LogsTab()
+        self.logs_tab.cancel_job_requested.connect(self.on_cancel_job)
 
         self.tabs.addTab(self.recording_tab, "🎥 Grabación")
         self.tabs.addTab(self.settings_tab, "⚙️ Configuración")
@@ -166,10 +203,70 @@ class MainWindow(QMainWindow):
         time_str = self.recorder.format_time(elapsed)
         self.comm.timer_signal.emit(time_str)
 
+    def update_live_stats(self):
+        """Actualiza el resumen de rendimiento de la grabación."""
+        self.logs_tab.update_stats(self.recorder.get_live_stats())
+
     def on_screen_selected(self, monitor, button):
         """Se ejecuta cuando se selecciona una pantalla."""
         logger.info(f"Pantalla seleccionada: {monitor.name}")
 
+    def on_monitor_mode_changed(self, mode: str):
+        """Guarda el modo de grabación con varios monitores."""
+        self.config_manager.set("recording.monitor_mode", mode)
+
+    def on_region_requested(self):
+        """Oculta la ventana y abre el selector de región."""
+        self.hide()
+        self.region_selector = RegionSelector()
+        self.region_selector.region_selected.connect(self.on_region_selected)
+        self.region_selector.selection_cancelled.connect(self.showNormal)
+        # Dar tiempo a que la ventana desaparezca antes de cubrir la pantalla
+        QTimer.singleShot(200, self.region_selector.start)
+
+    def on_region_selected(self, x1: int, y1: int, x2: int, y2: int):
+        """Guarda la región elegida en el gestor de pantalla."""
+        self.showNormal()
+        self.region_selector = None
+        desktop = (
+            virtual_bbox([self.screen_handler.get_screen_bbox(m) for m in self.monitors])
+            if self.monitors else None
+        )
+        region = self.screen_handler.set_custom_region(x1, y1, x2, y2, bounds=desktop)
+        if region is None:
+            QMessageBox.warning(self, "Región", "La región es demasiado pequeña (mínimo 100x100)")
+            return
+        self.selected_window = None
+        self.recording_tab.set_region(region)
+        self.comm.log_signal.emit(f"Región de grabación: {region['width']}x{region['height']}")
+
+    def on_window_requested(self):
+        """Lista las ventanas de X11 y elige la que se seguirá al grabar."""
+        try:
+            windows = window_tracker.list_windows()
+        except Exception as e:
+            logger.error(f"Error listando ventanas: {e}")
+            QMessageBox.warning(self, "Ventana", f"No se pudieron listar las ventanas: {e}")
+            return
+        if not windows:
+            QMessageBox.information(self, "Ventana", "No hay ventanas visibles")
+            return
+        titles = [f"{w.title} (0x{w.window_id:x})" for w in windows]
+        choice, accepted = QInputDialog.getItem(self, "Grabar ventana", "Ventana:", titles, 0, False)
+        if not accepted:
+            return
+        self.selected_window = windows[titles.index(choice)]
+        self.screen_handler.clear_custom_region()
+        self.recording_tab.set_window(self.selected_window.title)
+        self.comm.log_signal.emit(f"Ventana a grabar: {self.selected_window.title}")
+
+    def on_region_cleared(self):
+        """Vuelve a grabar la pantalla completa."""
+        self.screen_handler.clear_custom_region()
+        self.selected_window = None
+        self.recording_tab.set_region(None)
+        self.comm.log_signal.emit("Grabación de pantalla completa")
+
     def on_recording_toggled(self, start: bool):
         """Se ejecuta cuando se inicia/detiene grabación."""
         if start:
@@ -207,6 +304,9 @@ class MainWindow(QMainWindow):
 
     def start_recording(self):
         """Inicia la grabación."""
+        if self.stop_thread is not None and self.stop_thread.is_alive():
+            self.comm.log_signal.emit("Espera a que termine de detenerse la grabación anterior")
+            return
         try:
             # Seleccionar pantalla
             monitor = self.recording_tab.get_selected_monitor()
@@ -227,8 +327,9 @@ class MainWindow(QMainWindow):
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = settings.get("filename", "grabacion") or "grabacion"
 
-            # Rutas temporales en carpeta grabaciones/tmp
-            video_path = str(tmp_dir / f"tmp_{timestamp}_video.mp4")
+            # Rutas temporales en carpeta grabaciones/tmp (Matroska sigue siendo
+            # legible si la grabación se interrumpe)
+            video_path = str(tmp_dir / f"tmp_{timestamp}_video.mkv")
             audio_path = str(tmp_dir / f"tmp_{timestamp}_audio.wav")
 
             # Guardar rutas actuales
@@ -243,6 +344,19 @@ class MainWindow(QMainWindow):
                 'height': monitor.height
             }
 
+            # Una región personalizada sustituye a la pantalla completa
+            region = self.screen_handler.get_custom_region()
+            if region:
+                bbox = dict(region)
+
+            # Regiones de todos los monitores para los modos multimonitor
+            target_window = self.selected_window
+            monitor_mode = "single" if region or target_window else self.recording_tab.get_monitor_mode()
+            monitors = [
+                {'left': m.x, 'top': m.y, 'width': m.width, 'height': m.height}
+                for m in self.monitors
+            ]
+
             # Obtener dispositivo de micrófono seleccionado
             mic_device = settings.get("mic_device_index", 0)
             logger.info(f"Usando dispositivo de micrófono: {mic_device}")
@@ -265,7 +379,14 @@ class MainWindow(QMainWindow):
             # Iniciar grabación en thread
             self.recording_active = True
             self.recording_tab.set_recording_state(True)
-            self.comm.log_signal.emit(f"Iniciando grabación de {monitor.name}...")
+            if target_window:
+                self.comm.log_signal.emit(f"Iniciando grabación de la ventana '{target_window.title}'...")
+            elif region:
+                self.comm.log_signal.emit(f"Iniciando grabación de la región {region['width']}x{region['height']}...")
+            elif monitor_mode == "single":
+                self.comm.log_signal.emit(f"Iniciando grabación de {monitor.name}...")
+            else:
+                self.comm.log_signal.emit(f"Iniciando grabación de {len(monitors)} pantallas ({monitor_mode})...")
 
             self.recording_thread = Thread(
                 target=self.recorder.start_recording,
@@ -275,7 +396,11 @@ class MainWindow(QMainWindow):
                     "quality": settings.get("quality", 85),
                     "capture_camera": capture_camera,
                     "webcam_object": webcam_obj,
-                    "webcam_callback": lambda frame: self.comm.webcam_frame_signal.emit(frame)
+                    "webcam_callback": lambda frame: self.comm.webcam_frame_signal.emit(frame),
+                    "video_format": settings.get("format", ".mp4"),
+                    "monitors": monitors,
+                    "monitor_mode": monitor_mode,
+                    "window_id": target_window.window_id if target_window else None
                 },
                 daemon=True
             )
@@ -283,6 +408,7 @@ class MainWindow(QMainWindow):
             
             # Iniciar timer para actualizar contador
             self.timer.start(100)
+            self.stats_timer.start(1000)
             self.comm.recording_state_signal.emit(True)
             self.comm.log_signal.emit("Grabación iniciada")
 
@@ -299,16 +425,53 @@ class MainWindow(QMainWindow):
                 return
             
             self.timer.stop()
+            self.stats_timer.stop()
             self.recording_active = False
             self.comm.log_signal.emit("⏹ Deteniendo grabación...")
-            
-            # Detener la grabación en el recorder
+
+            # Vaciar el pipeline y los codificadores puede tardar bajo carga:
+            # se hace en otro hilo y el resultado llega por recording_stopped_signal
+            self.recorder.stop_progress_callback = self.comm.status_signal.emit
+            self.stop_thread = Thread(target=self._stop_recorder, name="stop-recording", daemon=True)
+            self.stop_thread.start()
+
+        except Exception as e:
+            self.comm.log_signal.emit(f"Error deteniendo grabación: {e}")
+            logger.error(f"Error: {e}", exc_info=True)
+            self.recording_active = False
+            self.recording_tab.set_recording_state(False)
+
+    def _stop_recorder(self):
+        """Detiene el grabador (hilo aparte) y publica las rutas resultantes."""
+        result = {"video_path": "", "audio_path": ""}
+        try:
             video_path, audio_path = self.recorder.stop_recording()
-            logger.info(f"Paths from recorder: video={video_path}, audio={audio_path}")
-            
+            result = {
+                "video_path": video_path,
+                "audio_path": audio_path,
+                "already_muxed": self.recorder.output_is_final,
+                "segments": list(self.recorder.segment_paths),
+                "monitor_videos": list(self.recorder.monitor_video_paths[1:]),
+                "session_stats": self.recorder.get_session_summary(),
+            }
+        except Exception as e:
+            logger.error(f"Error deteniendo grabación: {e}", exc_info=True)
+        finally:
+            self.recorder.stop_progress_callback = None
+            self.comm.recording_stopped_signal.emit(result)
+
+    def on_recording_stopped(self, result: dict):
+        """Se ejecuta en el hilo de la interfaz cuando la grabación terminó de detenerse."""
+        try:
+            video_path = result["video_path"]
+            audio_path = result["audio_path"]
+            already_muxed = result.get("already_muxed", False)
+            self.update_live_stats()
+            logger.info(f"Paths from recorder: video={video_path}, audio={audio_path}, final={already_muxed}")
+
             # Ya no esperamos a que termine el thread de grabación aquí para evitar deadlock/cierre inesperado
             # El thread de grabación terminará solo cuando vea el estado IDLE
-            
+
             self.recording_tab.set_recording_state(False)
             self.comm.recording_state_signal.emit(False)
             
@@ -322,16 +485,13 @@ class MainWindow(QMainWindow):
                 # Pequeño delay para dejar que el hilo de grabación libere el control
                 QTimer.singleShot(100, self.recording_tab.start_camera_preview)
             
-            # Procesar y combinar video con audio en un thread
+            # Encolar el procesamiento; corre en otro proceso sin bloquear la interfaz
             if video_path and os.path.exists(video_path):
-                self.comm.log_signal.emit("Procesando video y audio...")
                 settings = self.settings_tab.get_settings()
-                process_thread = Thread(
-                    target=self.process_recording,
-                    args=(video_path, audio_path, settings),
-                    daemon=True
+                self.enqueue_processing(
+                    video_path, audio_path, settings, already_muxed,
+                    result.get("segments"), result.get("session_stats"), result.get("monitor_videos")
                 )
-                process_thread.start()
             else:
                 self.comm.log_signal.emit("Error: No se generó archivo de video")
 
@@ -341,41 +501,94 @@ class MainWindow(QMainWindow):
             self.recording_active = False
             self.recording_tab.set_recording_state(False)
     
-    def process_recording(self, video_path: str, audio_path: str, settings: dict):
-        """Procesa y finaliza la grabación (corre en thread)."""
-        try:
-            recordings_dir = Path("grabaciones")
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = settings.get("filename", "grabacion") or "grabacion"
-            video_format = settings.get("format", ".mp4")
+    def enqueue_processing(
+        self,
+        video_path: str,
+        audio_path: str,
+        settings: dict,
+        already_muxed: bool = False,
+        segments: list = None,
+        session_stats: dict = None,
+        monitor_videos: list = None
+    ):
+        """
+        Encola la finalización de la grabación en la cola de trabajos.
 
-            # Crear nombre del archivo final
-            output_path = str(recordings_dir / f"{filename}_{timestamp}{video_format}")
-            self.comm.log_signal.emit(f"Combinando audio y video...")
-            
-            if self.recorder.combine_audio_video(video_path, audio_path, output_path, video_format):
-                self.comm.log_signal.emit(f"✓ Grabación completada: {output_path}")
-                logger.info(f"Grabación completada en: {output_path}")
-                
-                # Limpiar archivos temporales
-                self.comm.log_signal.emit("Limpiando archivos temporales...")
-                self.recorder.cleanup_temp_files(video_path, audio_path)
-            else:
-                # Si la combinación falla, copiar al menos el video
-                import shutil
-                try:
-                    final_video = str(recordings_dir / f"{filename}_{timestamp}_video{video_format}")
-                    shutil.copy(video_path, final_video)
-                    self.comm.log_signal.emit(f"⚠ Video guardado sin audio: {final_video}")
-                    
-                    # Limpiar archivos temporales
-                    self.recorder.cleanup_temp_files(video_path, audio_path)
-                except Exception as copy_e:
-                    self.comm.log_signal.emit(f"Error: {copy_e}")
-                    logger.error(f"Error copiando video: {copy_e}")
+        Con un archivo por monitor, `monitor_videos` son los temporales de los
+        monitores adicionales; se finalizan en el mismo trabajo.
+        """
+        job = build_finalize_job(
+            video_path,
+            audio_path,
+            filename=settings.get("filename", "grabacion"),
+            video_format=settings.get("format", ".mp4"),
+            quality=settings.get("quality", 85),
+            already_muxed=already_muxed,
+            segments=segments,
+            session_stats=session_stats,
+            monitor_videos=monitor_videos
+        )
+        self.job_queue.submit(job)
+        self.comm.log_signal.emit(f"Procesamiento encolado: {job.description} [{job.id}]")
+
+    def on_job_updated(self, job: PostProcessJob):
+        """Refleja en la interfaz el estado de un trabajo de la cola."""
+        self.logs_tab.update_job(job.id, job.format_status())
+        if job.status == JobStatus.DONE:
+            report = job.result.get("finalize")
+            if report:
+                self.comm.log_signal.emit(f"Finalizado por '{report['path']}' en {report['seconds']}s")
+            for output in job.result.get("outputs", [job.result.get("output")]):
+                self.comm.log_signal.emit(f"✓ Grabación completada: {output}")
+            if job.result.get("stats"):
+                self.comm.log_signal.emit(f"Estadísticas de la sesión: {job.result['stats']}")
+        elif job.status == JobStatus.FAILED:
+            self.comm.log_signal.emit(f"⚠ Falló el trabajo {job.id}: {job.error}; los temporales se conservan")
+        elif job.status == JobStatus.CANCELLED:
+            self.comm.log_signal.emit(f"Trabajo cancelado: {job.id}")
+
+    def on_cancel_job(self, job_id: str):
+        """Cancela un trabajo de la cola."""
+        if not self.job_queue.cancel(job_id):
+            self.comm.log_signal.emit(f"El trabajo {job_id} ya había terminado")
+
+    def check_orphaned_recordings(self):
+        """Ofrece recuperar las grabaciones que quedaron sin finalizar en grabaciones/tmp."""
+        try:
+            orphans = find_orphaned_recordings("grabaciones/tmp")
         except Exception as e:
-            self.comm.log_signal.emit(f"Error procesando grabación: {e}")
-            logger.error(f"Error procesando: {e}", exc_info=True)
+            logger.error(f"Error buscando grabaciones interrumpidas: {e}")
+            return
+        # Los temporales de trabajos encolados no están huérfanos
+        active = set(self.job_queue.active_paths())
+        orphans = [o for o in orphans if not any(os.path.abspath(p) in active for p in o.video_paths)]
+        if not orphans:
+            return
+
+        details = "\n".join(f"• {orphan.describe()}" for orphan in orphans)
+        self.comm.log_signal.emit(f"Se encontraron {len(orphans)} grabaciones sin finalizar")
+        reply = QMessageBox.question(
+            self,
+            "Grabaciones interrumpidas",
+            f"Se encontraron grabaciones que no se finalizaron:\n\n{details}\n\n"
+            "¿Desea recuperarlas en segundo plano?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            self.comm.log_signal.emit("Recuperación pospuesta; los temporales se conservan en grabaciones/tmp")
+            return
+
+        video_format = self.settings_tab.get_settings().get("format", ".mp4")
+        for orphan in orphans:
+            params = {
+                "key": orphan.key,
+                "video_paths": orphan.video_paths,
+                "audio_path": orphan.audio_path,
+                "output_dir": "grabaciones",
+                "video_format": video_format,
+            }
+            job = PostProcessJob(JobKind.RECOVER, params, JobPriority.LOW, description=f"Recuperar {orphan.key}")
+            self.job_queue.submit(job)
 
     def pause_recording(self):
         """Pausa la grabación."""
@@ -429,6 +642,13 @@ class MainWindow(QMainWindow):
                 event.ignore()
                 return
 
+        # Una grabación que se está deteniendo debe cerrar sus archivos antes de salir
+        if self.stop_thread is not None and self.stop_thread.is_alive():
+            logger.info("Esperando a que termine de detenerse la grabación...")
+            self.stop_thread.join()
+
+        # Los trabajos en curso se retoman al volver a abrir la aplicación
+        self.job_queue.stop()
         self.config_manager.save()
         logger.info("Aplicación cerrada")
         event.accept()
@@ -0,0 +1,147 @@
+"""
+Selector interactivo de región de pantalla.
+
+Cubre el escritorio virtual con una capa semitransparente; el usuario arrastra
+un rectángulo y la región se entrega en píxeles físicos (los que usan los
+backends de captura), con las dimensiones que tendrá el video.
+"""
+
+import logging
+from typing import Optional
+
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import Qt, QPoint, QRect, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QGuiApplication, QPainter, QPen
+
+from logic.screen_handler import MIN_REGION_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+def to_physical(point: QPoint) -> QPoint:
+    """
+    Convierte un punto global de Qt (píxeles lógicos) a píxeles físicos.
+
+    Con escalado de pantalla cada monitor conserva su origen nativo y escala
+    su tamaño, así que la conversión se hace respecto al monitor del punto.
+    """
+    screen = QGuiApplication.screenAt(point) or QGuiApplication.primaryScreen()
+    origin = screen.geometry().topLeft()
+    ratio = screen.devicePixelRatio()
+    return QPoint(
+        origin.x() + round((point.x() - origin.x()) * ratio),
+        origin.y() + round((point.y() - origin.y()) * ratio)
+    )
+
+
+class RegionSelector(QWidget):
+    """Capa a pantalla completa para elegir una región arrastrando el ratón."""
+
+    # Señales
+    region_selected = pyqtSignal(int, int, int, int)  # x1, y1, x2, y2 en píxeles físicos
+    selection_cancelled = pyqtSignal()
+
+    def __init__(self):
+        super().__init__(None)
+        self.setWindowFlags(
+            Qt.WindowType.FramelessWindowHint
+            | Qt.WindowType.WindowStaysOnTopHint
+            | Qt.WindowType.Tool
+        )
+        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self.setCursor(Qt.CursorShape.CrossCursor)
+        self.setMouseTracking(True)
+
+        # Unión de todas las pantallas
+        desktop = QRect()
+        for screen in QGuiApplication.screens():
+            desktop = desktop.united(screen.geometry())
+        self.setGeometry(desktop)
+
+        self._origin: Optional[QPoint] = None
+        self._current: Optional[QPoint] = None
+
+    def start(self) -> None:
+        """Muestra el selector y toma el foco del teclado."""
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        self.setFocus()
+
+    def selection(self) -> QRect:
+        """Rectángulo seleccionado en coordenadas del widget."""
+        if self._origin is None or self._current is None:
+            return QRect()
+        return QRect(self._origin, self._current).normalized()
+
+    def _physical_corners(self):
+        rect = self.selection()
+        top_left = to_physical(self.mapToGlobal(rect.topLeft()))
+        bottom_right = to_physical(self.mapToGlobal(rect.bottomRight() + QPoint(1, 1)))
+        return top_left, bottom_right
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(0, 0, 0, 110))
+
+        rect = self.selection()
+        if rect.isEmpty():
+            painter.setPen(QColor(255, 255, 255))
+            painter.setFont(QFont("Arial", 14))
+            painter.drawText(
+                self.rect(), Qt.AlignmentFlag.AlignCenter,
+                "Arrastra para seleccionar la región a grabar (Esc para cancelar)"
+            )
+            return
+
+        # La región elegida se ve sin oscurecer
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Clear)
+        painter.fillRect(rect, Qt.GlobalColor.transparent)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+        painter.setPen(QPen(QColor("#3498db"), 2))
+        painter.drawRect(rect)
+
+        # Tamaño del video resultante (pares, en píxeles físicos)
+        top_left, bottom_right = self._physical_corners()
+        width = abs(bottom_right.x() - top_left.x()) // 2 * 2
+        height = abs(bottom_right.y() - top_left.y()) // 2 * 2
+        too_small = width < MIN_REGION_SIZE or height < MIN_REGION_SIZE
+        painter.setPen(QColor("#e74c3c") if too_small else QColor(255, 255, 255))
+        painter.setFont(QFont("Arial", 11))
+        painter.drawText(rect.topLeft() + QPoint(4, -6), f"{width} x {height}")
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._origin = event.position().toPoint()
+            self._current = self._origin
+            self.update()
+        elif event.button() == Qt.MouseButton.RightButton:
+            self._cancel()
+
+    def mouseMoveEvent(self, event):
+        if self._origin is not None:
+            self._current = event.position().toPoint()
+            self.update()
+
+    def mouseReleaseEvent(self, event):
+        if event.button() != Qt.MouseButton.LeftButton or self._origin is None:
+            return
+        self._current = event.position().toPoint()
+        if self.selection().width() < 2 or self.selection().height() < 2:
+            # Un clic sin arrastrar no es una región
+            self._origin = self._current = None
+            self.update()
+            return
+        top_left, bottom_right = self._physical_corners()
+        logger.info(f"Región seleccionada: {top_left.x()},{top_left.y()} - {bottom_right.x()},{bottom_right.y()}")
+        self.close()
+        self.region_selected.emit(top_left.x(), top_left.y(), bottom_right.x(), bottom_right.y())
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key.Key_Escape:
+            self._cancel()
+
+    def _cancel(self) -> None:
+        self.close()
+        self.selection_cancelled.emit()
@@ -61,17 +61,26 @@ DEFAULT_FPS = 15
 MIN_FPS = 10
 MAX_FPS = 60
 
-# Resoluciones predefinidas
-RESOLUTIONS = {
-    "Full": (1920, 1080),
-    "1280x720": (1280, 720),
-    "1024x768": (1024, 768),
-    "800x600": (800, 600),
-}
+# Resoluciones de salida (recording.resolution); se conserva la relación de aspecto
+RESOLUTIONS = ["Full", "1080p", "720p", "480p", "50%"]
 
 # Formatos de video soportados
 VIDEO_FORMATS = [".mp4", ".avi", ".mov"]
 
+# Modos de velocidad de codificación (etiqueta -> recording.speed_mode)
+SPEED_MODES = {
+    "Tiempo real": "realtime",
+    "Equilibrado": "balanced",
+    "Archivo (más compacto)": "archival",
+}
+
+# Modos de grabación con varios monitores (etiqueta -> recording.monitor_mode)
+MONITOR_MODES = {
+    "Solo la pantalla seleccionada": "single",
+    "Todas: un archivo por pantalla": "separate",
+    "Todas: lienzo único": "canvas",
+}
+
 # Codecs de video
 VIDEO_CODEC = {
     ".mp4": "libx264",
@@ -2,7 +2,7 @@
 Pestaña de registro de eventos (logs).
 """
 
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QTextEdit, QHBoxLayout
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QTextEdit, QHBoxLayout, QLabel, QListWidget, QListWidgetItem
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QIcon
 import qtawesome as qta
@@ -12,15 +12,42 @@ import time
 class LogsTab(QWidget):
     """Pestaña de registro de eventos."""
 
+    # Señal con el id del trabajo a cancelar
+    cancel_job_requested = pyqtSignal(str)
+
     def __init__(self):
         """Inicializa la pestaña de logs."""
         super().__init__()
+        self.job_items = {}
         self.init_ui()
 
     def init_ui(self):
         """Inicializa la interfaz."""
         layout = QVBoxLayout()
 
+        # Resumen de rendimiento de la grabación en curso
+        self.stats_label = QLabel("Sin grabación en curso")
+        self.stats_label.setWordWrap(True)
+        self.stats_label.setStyleSheet("""
+            QLabel {
+                font-family: "Courier New", monospace;
+                font-size: 11px;
+            }
+        """)
+        layout.addWidget(self.stats_label)
+
+        # Cola de trabajos de postprocesamiento
+        jobs_layout = QHBoxLayout()
+        self.jobs_list = QListWidget()
+        self.jobs_list.setMaximumHeight(90)
+        jobs_layout.addWidget(self.jobs_list)
+
+        self.cancel_job_button = QPushButton("Cancelar")
+        self.cancel_job_button.setIcon(QIcon(qta.icon('fa.stop')))
+        self.cancel_job_button.clicked.connect(self.cancel_selected_job)
+        jobs_layout.addWidget(self.cancel_job_button, alignment=Qt.AlignmentFlag.AlignTop)
+        layout.addLayout(jobs_layout)
+
         # Área de texto de logs
         self.log_text = QTextEdit()
         self.log_text.setReadOnly(True)
@@ -66,6 +93,38 @@ class LogsTab(QWidget):
         formatted_message = f"[{timestamp}] {message}"
         self.log_text.append(formatted_message)
 
+    def update_stats(self, summary: str):
+        """
+        Muestra el resumen de rendimiento de la grabación.
+
+        Args:
+            summary: Texto del resumen (vacío = sin grabación)
+        """
+        self.stats_label.setText(summary or "Sin grabación en curso")
+
+    def update_job(self, job_id: str, text: str):
+        """
+        Agrega o actualiza un trabajo en la lista de la cola.
+
+        Args:
+            job_id: Identificador del trabajo
+            text: Estado formateado del trabajo
+        """
+        item = self.job_items.get(job_id)
+        if item is None:
+            item = QListWidgetItem(text)
+            item.setData(Qt.ItemDataRole.UserRole, job_id)
+            self.jobs_list.insertItem(0, item)
+            self.job_items[job_id] = item
+        else:
+            item.setText(text)
+
+    def cancel_selected_job(self):
+        """Pide cancelar el trabajo seleccionado."""
+        item = self.jobs_list.currentItem()
+        if item is not None:
+            self.cancel_job_requested.emit(item.data(Qt.ItemDataRole.UserRole))
+
     def clear_logs(self):
         """Limpia todos los logs."""
         self.log_text.clear()
@@ -3,7 +3,7 @@ Pestaña de grabación de pantalla.
 """
 
 from PyQt6 import QtWidgets, QtCore, QtGui
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QPushButton, QLabel
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QPushButton, QLabel, QComboBox
 from PyQt6.QtCore import Qt, pyqtSignal, QSize
 from PyQt6.QtGui import QIcon, QFont, QPixmap, QImage
 import qtawesome as qta
@@ -11,9 +11,11 @@ import mss
 import numpy as np
 from threading import Thread
 
+from logic import window_tracker
+
 from ui.styles import (
     ICON_SIZE_NORMAL, FONT_SIZE_LARGE, PADDING_NORMAL,
-    MARGIN_NORMAL
+    MARGIN_NORMAL, MONITOR_MODES
 )
 
 
@@ -84,6 +86,10 @@ class RecordingTab(QWidget):
     recording_toggled = pyqtSignal(bool)  # True = iniciar, False = detener
     paused_toggled = pyqtSignal(bool)  # True = pausar, False = reanudar
     stop_recording = pyqtSignal()  # Nueva señal para detener
+    monitor_mode_changed = pyqtSignal(str)  # recording.monitor_mode
+    region_requested = pyqtSignal()  # Abrir el selector de región
+    region_cleared = pyqtSignal()  # Volver a grabar la pantalla completa
+    window_requested = pyqtSignal()  # Elegir una ventana a seguir (X11)
 
     def __init__(self, monitors):
         """
@@ -96,6 +102,7 @@ class RecordingTab(QWidget):
         self.monitors = monitors
         self.screen_buttons = []
         self.selected_button = None
+        self.selected_monitor = monitors[0] if monitors else None
         self.camera = None
         self.camera_in_use = False
         self.init_ui()
@@ -136,6 +143,41 @@ class RecordingTab(QWidget):
             btn.setStyleSheet("border: 3px solid #3498db; border-radius: 5px;")
             self.selected_button = btn
         screen_preview_layout.addLayout(self.screen_grid)
+
+        # Con varios monitores se pueden grabar todos a la vez
+        self.monitor_mode_combo = QComboBox()
+        for label, mode in MONITOR_MODES.items():
+            self.monitor_mode_combo.addItem(label, mode)
+        self.monitor_mode_combo.setFixedHeight(30)
+        self.monitor_mode_combo.currentIndexChanged.connect(
+            lambda index: self.monitor_mode_changed.emit(self.monitor_mode_combo.itemData(index))
+        )
+        self.monitor_mode_combo.setVisible(len(self.monitors) > 1)
+        screen_preview_layout.addWidget(self.monitor_mode_combo)
+
+        # Región personalizada: solo se captura y codifica ese rectángulo
+        region_layout = QHBoxLayout()
+        self.region_button = QPushButton("Seleccionar región")
+        self.region_button.setIcon(QIcon(qta.icon('fa.crop')))
+        self.region_button.setFixedHeight(30)
+        self.region_button.clicked.connect(self.region_requested.emit)
+        region_layout.addWidget(self.region_button)
+        self.window_button = QPushButton("Seleccionar ventana")
+        self.window_button.setIcon(QIcon(qta.icon('fa.window-maximize')))
+        self.window_button.setFixedHeight(30)
+        self.window_button.clicked.connect(self.window_requested.emit)
+        self.window_button.setVisible(window_tracker.is_supported())
+        region_layout.addWidget(self.window_button)
+        self.clear_region_button = QPushButton("Pantalla completa")
+        self.clear_region_button.setFixedHeight(30)
+        self.clear_region_button.setEnabled(False)
+        self.clear_region_button.clicked.connect(self.region_cleared.emit)
+        region_layout.addWidget(self.clear_region_button)
+        screen_preview_layout.addLayout(region_layout)
+        self.region_label = QLabel("")
+        self.region_label.setAlignment(Qt.AlignCenter)
+        self.region_label.setVisible(False)
+        screen_preview_layout.addWidget(self.region_label)
         screen_preview_layout.setAlignment(Qt.AlignCenter)
         preview_layout.addLayout(screen_preview_layout)
 
@@ -213,6 +255,7 @@ class RecordingTab(QWidget):
             self.selected_button.setStyleSheet("")
         
         self.selected_button = button
+        self.selected_monitor = monitor
         button.setStyleSheet("border: 3px solid #3498db; border-radius: 5px;")
         
         self.screen_selected.emit(monitor, button)
@@ -229,6 +272,8 @@ class RecordingTab(QWidget):
     def set_recording_state(self, recording: bool):
         """Cambia el estado de los botones según grabación."""
         self.record_button.setEnabled(not recording)
+        self.region_button.setEnabled(not recording)
+        self.window_button.setEnabled(not recording)
         self.pause_button.setEnabled(recording)
         self.resume_button.setEnabled(False)
         self.stop_button.setEnabled(recording)
@@ -240,9 +285,41 @@ class RecordingTab(QWidget):
         self.stop_button.setEnabled(True)  # Siempre habilitado durante grabación
 
     def get_selected_monitor(self):
-        """Retorna el monitor seleccionado."""
-        # Implementar lógica para obtener monitor seleccionado
-        return self.monitors[0] if self.monitors else None
+        """Retorna el monitor seleccionado (el primero si no se eligió ninguno)."""
+        return self.selected_monitor
+
+    def set_region(self, region):
+        """Muestra la región personalizada activa (None = pantalla completa)."""
+        self._show_capture_target(
+            f"Región: {region['width']}x{region['height']} en ({region['left']}, {region['top']})"
+            if region else None
+        )
+
+    def set_window(self, title):
+        """Muestra la ventana que se seguirá al grabar (None = pantalla completa)."""
+        self._show_capture_target(f"Ventana: {title}" if title else None)
+
+    def _show_capture_target(self, text):
+        if text:
+            self.region_label.setText(text)
+        self.region_label.setVisible(bool(text))
+        self.clear_region_button.setEnabled(bool(text))
+        # Con región o ventana no se combinan monitores
+        self.monitor_mode_combo.setEnabled(not text)
+
+    def get_monitor_mode(self) -> str:
+        """Retorna el modo de grabación con varios monitores."""
+        if len(self.monitors) < 2:
+            return "single"
+        return self.monitor_mode_combo.currentData()
+
+    def set_monitor_mode(self, mode: str):
+        """Selecciona el modo de varios monitores sin emitir la señal de cambio."""
+        index = self.monitor_mode_combo.findData(mode)
+        self.monitor_mode_combo.blockSignals(True)
+        self.monitor_mode_combo.setCurrentIndex(index if index >= 0 else 0)
+        self.monitor_mode_combo.blockSignals(False)
+
     def load_monitor_thumbnail(self, button: QPushButton, monitor):
         """
         Carga una miniatura del monitor y la muestra en el botón, cubriendo todo el tamaño (sin franjas).
@@ -15,7 +15,7 @@ from pathlib import Path
 
 from ui.styles import (
     ICON_SIZE_NORMAL, VIDEO_FORMATS, DEFAULT_FPS, MIN_FPS, MAX_FPS,
-    CURSOR_STYLES, DEFAULT_FILENAME
+    CURSOR_STYLES, DEFAULT_FILENAME, SPEED_MODES, RESOLUTIONS
 )
 
 
@@ -193,6 +193,37 @@ class SettingsTab(QWidget):
         
         video_settings_layout.addStretch()
         layout.addLayout(video_settings_layout)
+        
+        # Modo de velocidad: CPU por frame frente a tamaño de archivo
+        speed_mode_layout = QHBoxLayout()
+        speed_mode_layout.addWidget(QLabel("Velocidad de codificación:"))
+        self.speed_mode_combo = QComboBox()
+        for label, mode in SPEED_MODES.items():
+            self.speed_mode_combo.addItem(label, mode)
+        current_mode = self.config_manager.get("recording.speed_mode", "balanced")
+        index = self.speed_mode_combo.findData(current_mode)
+        self.speed_mode_combo.setCurrentIndex(index if index >= 0 else 1)
+        self.speed_mode_combo.setFixedWidth(250)
+        self.speed_mode_combo.setFixedHeight(35)
+        self.speed_mode_combo.currentIndexChanged.connect(self.on_speed_mode_changed)
+        speed_mode_layout.addWidget(self.speed_mode_combo)
+
+        speed_mode_layout.addSpacing(20)
+
+        # Resolución de salida (se escala antes de codificar)
+        speed_mode_layout.addWidget(QLabel("Resolución:"))
+        self.resolution_combo = QComboBox()
+        self.resolution_combo.addItems(RESOLUTIONS)
+        current_resolution = self.config_manager.get("recording.resolution", "Full")
+        if self.resolution_combo.findText(current_resolution) < 0:
+            self.resolution_combo.addItem(current_resolution)
+        self.resolution_combo.setCurrentText(current_resolution)
+        self.resolution_combo.setFixedWidth(120)
+        self.resolution_combo.setFixedHeight(35)
+        self.resolution_combo.currentTextChanged.connect(self.on_resolution_changed)
+        speed_mode_layout.addWidget(self.resolution_combo)
+        speed_mode_layout.addStretch()
+        layout.addLayout(speed_mode_layout)
 
         layout.addSpacing(20)
 
@@ -250,7 +281,8 @@ class SettingsTab(QWidget):
         # ========== Mostrar cursor ========== 
         # Checkbox mostrar cursor
         self.show_cursor_checkbox = QCheckBox("Mostrar cursor")
-        self.show_cursor_checkbox.setChecked(True)
+        self.show_cursor_checkbox.setChecked(self.config_manager.get("recording.show_cursor", True))
+        self.show_cursor_checkbox.toggled.connect(self.on_show_cursor_toggled)
         layout.addWidget(self.show_cursor_checkbox)
 
         # ========== Capturar cámara ========== 
@@ -268,6 +300,10 @@ class SettingsTab(QWidget):
         self.cursor_style_combo.setFixedWidth(250)
         self.cursor_style_combo.setFixedHeight(35)
         self.cursor_style_combo.addItems(CURSOR_STYLES)
+        self.cursor_style_combo.setCurrentText(
+            self.config_manager.get("recording.cursor_style", CURSOR_STYLES[0])
+        )
+        self.cursor_style_combo.currentTextChanged.connect(self.on_cursor_style_changed)
         cursor_style_layout.addWidget(self.cursor_style_combo)
         cursor_style_layout.addStretch()
         layout.addLayout(cursor_style_layout)
@@ -289,6 +325,19 @@ class SettingsTab(QWidget):
         self.quality_label.setText(f"{value}%")
         self.quality_changed.emit(value)
 
+    def on_speed_mode_changed(self, index: int):
+        self.config_manager.set("recording.speed_mode", self.speed_mode_combo.itemData(index))
+
+    def on_resolution_changed(self, resolution: str):
+        self.config_manager.set("recording.resolution", resolution)
+
+    def on_show_cursor_toggled(self, checked: bool):
+        self.config_manager.set("recording.show_cursor", checked)
+        self.cursor_style_combo.setEnabled(checked)
+
+    def on_cursor_style_changed(self, style: str):
+        self.config_manager.set("recording.cursor_style", style)
+
     def on_mic_volume_changed(self, value: int):
         percentage = int((value / 200) * 100)
         self.mic_volume_label.setText(f"{percentage}%")
@@ -409,6 +458,8 @@ class SettingsTab(QWidget):
             "format": self.format_combo.currentText(),
             "fps": self.fps_spinbox.value(),
             "quality": self.quality_slider.value(),
+            "speed_mode": self.speed_mode_combo.currentData(),
+            "resolution": self.resolution_combo.currentText(),
             "record_mic": True,
             "mic_device_index": mic_device_index,
             "mic_volume": self.mic_volume_slider.value(),